@@ -0,0 +1,72 @@
+"""
+X-Cold-Start reporting for the per-function API handlers.
+
+Mirrors backend/utils/middleware.py's ColdStartMiddleware: the first response
+an instance sends carries ``X-Cold-Start: 1`` and
+``Server-Timing: cold-start;dur=<ms>``, measured from process creation;
+later responses carry ``X-Cold-Start: 0``. ``ColdStartHeaders`` is a mixin
+for the BaseHTTPRequestHandler functions and ``ColdStartMiddleware`` wraps
+the FastAPI ones. Kept free of third-party imports apart from the optional
+psutil, so it adds nothing to a cold start.
+"""
+
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil is in api/requirements.txt
+    psutil = None
+
+_imported_at = time.time()
+_lock = threading.Lock()
+_cold = True
+
+def process_created_at() -> float:
+    """When this process was created, so interpreter start-up and imports count too"""
+    if psutil is not None:
+        try:
+            return psutil.Process(os.getpid()).create_time()
+        except psutil.Error:
+            pass
+    return _imported_at
+
+def cold_start_headers() -> list:
+    """``(name, value)`` headers for the response being sent now"""
+    global _cold
+    with _lock:
+        cold, _cold = _cold, False
+    if not cold:
+        return [("X-Cold-Start", "0")]
+    elapsed = max(0.0, time.time() - process_created_at())
+    return [("X-Cold-Start", "1"), ("Server-Timing", f"cold-start;dur={elapsed * 1000:.1f}")]
+
+class ColdStartHeaders:
+    """BaseHTTPRequestHandler mixin adding the cold-start headers to every response"""
+
+    def end_headers(self):
+        for name, value in cold_start_headers():
+            self.send_header(name, value)
+        super().end_headers()
+
+class ColdStartMiddleware:
+    """ASGI middleware adding the cold-start headers to every response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    *((name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in cold_start_headers())
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
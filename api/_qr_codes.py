@@ -0,0 +1,75 @@
+"""
+QR code rendering and the build-time QR snapshot shared by the API functions.
+
+Kept free of FastAPI and pydantic so the lightweight BaseHTTPRequestHandler
+functions can import it without paying for them on a cold start; models.py
+re-exports it for the FastAPI functions.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Payloads of the sample items' QR codes, snapshotted by backend/build_snapshot.py
+SAMPLE_QR_DATA = {
+    "inv-001": {"id": "inv-001", "name": "HP Laptop"},
+    "inv-002": {"id": "inv-002", "name": "Office Chairs"},
+    "inv-003": {"id": "inv-003", "name": "Printer Cartridges"}
+}
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "asset_snapshot.json")
+
+def generate_qr_code(data: dict) -> str:
+    """Generate QR code for inventory item"""
+    try:
+        import qrcode
+        
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=10,
+            border=4,
+        )
+        qr.add_data(json.dumps(data))
+        qr.make(fit=True)
+        
+        img = qr.make_image(fill_color="black", back_color="white")
+        img_buffer = io.BytesIO()
+        img.save(img_buffer, format='PNG')
+        img_buffer.seek(0)
+        
+        # Convert to base64
+        img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
+        return f"data:image/png;base64,{img_base64}"
+    except Exception as e:
+        logger.error(f"Error generating QR code: {str(e)}")
+        return ""
+
+def qr_code_key(data: dict) -> str:
+    """Snapshot key for a QR code payload; must match backend/utils/asset_snapshot.py"""
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+def load_qr_snapshot() -> Dict[str, str]:
+    try:
+        with open(SNAPSHOT_PATH, encoding="utf-8") as f:
+            return json.load(f).get("qr_codes", {})
+    except (OSError, ValueError):
+        return {}
+
+QR_SNAPSHOT = load_qr_snapshot()
+
+def snapshot_qr_code(data: dict) -> str:
+    """QR code from the build-time snapshot; a missing one is rendered once per instance"""
+    key = qr_code_key(data)
+    qr_code = QR_SNAPSHOT.get(key)
+    if qr_code is None:
+        qr_code = generate_qr_code(data)
+        if qr_code:
+            QR_SNAPSHOT[key] = qr_code
+    return qr_code
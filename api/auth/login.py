@@ -4,6 +4,9 @@ import os
 import jwt
 from datetime import datetime, timedelta
 import logging
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _cold_start import ColdStartHeaders
 
 # JWT Configuration
 JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "uspf-inventory-jwt-secret-key-2025-production-secure")
@@ -35,7 +38,7 @@ def create_refresh_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
-class handler(BaseHTTPRequestHandler):
+class handler(ColdStartHeaders, BaseHTTPRequestHandler):
     def do_POST(self):
         try:
             content_length = int(self.headers['Content-Length'])
@@ -5,6 +5,9 @@ import jwt
 from datetime import datetime, timedelta
 import logging
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _cold_start import ColdStartHeaders
 
 # JWT Configuration
 JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "uspf-inventory-jwt-secret-key-2025-production-secure")
@@ -37,7 +40,7 @@ def verify_token(token: str, token_type: str = "refresh"):
     except (ExpiredSignatureError, InvalidTokenError) as e:
         raise e
 
-class handler(BaseHTTPRequestHandler):
+class handler(ColdStartHeaders, BaseHTTPRequestHandler):
     def do_POST(self):
         try:
             content_length = int(self.headers['Content-Length'])
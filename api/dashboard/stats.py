@@ -4,6 +4,9 @@ import os
 import jwt
 import logging
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _cold_start import ColdStartHeaders
 
 # JWT Configuration
 JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "uspf-inventory-jwt-secret-key-2025-production-secure")
@@ -55,7 +58,7 @@ def authenticate_request(handler):
         logger.error(f"Token validation error: {str(e)}")
         return None, {"detail": "Invalid authentication credentials"}
 
-class handler(BaseHTTPRequestHandler):
+class handler(ColdStartHeaders, BaseHTTPRequestHandler):
     def do_GET(self):
         # Authenticate request
         user, error = authenticate_request(self)
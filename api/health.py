@@ -1,7 +1,11 @@
 from http.server import BaseHTTPRequestHandler
 import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _cold_start import ColdStartHeaders
 
-class handler(BaseHTTPRequestHandler):
+class handler(ColdStartHeaders, BaseHTTPRequestHandler):
     def do_GET(self):
         response = {"status": "healthy", "service": "USPF Inventory Management API"}
         
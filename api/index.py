@@ -0,0 +1,70 @@
+"""
+Single ASGI entry point for every /api/* route (vercel.single-app.json).
+
+Serves backend/server.py's app from one function, so all routes share one
+warm instance with its caches and database client, instead of each route
+bundle paying its own cold start.
+"""
+
+import asyncio
+import os
+import sys
+from typing import Optional
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from server import app as backend_app  # noqa: E402
+
+# Served under /api by the per-function layout, mounted at the root by the backend
+ROOT_ROUTES = {
+    "/api/health": "/health",
+    "/api/health/detailed": "/health/detailed",
+    "/api/health/trends": "/health/trends",
+}
+
+class ServerlessApp:
+    """
+    ASGI wrapper that starts the backend on its first request.
+
+    Serverless runtimes may not send ASGI lifespan events. If no lifespan
+    startup has been seen, the app's startup handlers run once, before the
+    first request is handled; concurrent first requests wait for the same
+    startup. If it fails, those requests fail and the next one retries it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._startup: Optional[asyncio.Future] = None
+
+    async def _ensure_started(self):
+        if self._startup is None:
+            self._startup = asyncio.ensure_future(self.app.router.startup())
+        startup = self._startup
+        try:
+            await asyncio.shield(startup)
+        except BaseException:
+            # A failed startup is retried by the next request; one still running is left alone
+            if startup.done() and self._startup is startup:
+                self._startup = None
+            raise
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            async def lifespan_send(message):
+                if message["type"] == "lifespan.startup.complete" and self._startup is None:
+                    self._startup = asyncio.get_running_loop().create_future()
+                    self._startup.set_result(None)
+                await send(message)
+
+            await self.app(scope, receive, lifespan_send)
+            return
+
+        if scope["type"] == "http":
+            await self._ensure_started()
+            path = ROOT_ROUTES.get(scope["path"])
+            if path is not None:
+                scope = {**scope, "path": path, "raw_path": path.encode()}
+        await self.app(scope, receive, send)
+
+app = ServerlessApp(backend_app)
@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from typing import List
 from datetime import datetime
 from ...models import BinCardEntry, User, get_current_user
+from ..._cold_start import ColdStartMiddleware
 
 app = FastAPI()
 
@@ -13,6 +14,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ColdStartMiddleware)
 
 @app.get("/api/inventory/{item_id}/bin-card", response_model=List[BinCardEntry])
 async def get_bin_card_history(
@@ -6,6 +6,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models import InventoryItem, InventoryItemCreate, User, get_current_user, generate_qr_code
+from _cold_start import ColdStartMiddleware
 
 app = FastAPI()
 
@@ -16,6 +17,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ColdStartMiddleware)
 
 @app.post("/api/inventory", response_model=InventoryItem)
 async def create_inventory_item(
@@ -3,12 +3,13 @@ import json
 import os
 import jwt
 import uuid
-import qrcode
-import io
-import base64
 import logging
 from datetime import datetime
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _qr_codes import generate_qr_code, snapshot_qr_code, SAMPLE_QR_DATA
+from _cold_start import ColdStartHeaders
 
 # JWT Configuration
 JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "uspf-inventory-jwt-secret-key-2025-production-secure")
@@ -60,31 +61,7 @@ def authenticate_request(handler):
         logger.error(f"Token validation error: {str(e)}")
         return None, {"detail": "Invalid authentication credentials"}
 
-def generate_qr_code(data: dict) -> str:
-    """Generate QR code for inventory item"""
-    try:
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(json.dumps(data))
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        img_buffer = io.BytesIO()
-        img.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
-        
-        # Convert to base64
-        img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-        return f"data:image/png;base64,{img_base64}"
-    except Exception as e:
-        logger.error(f"Error generating QR code: {str(e)}")
-        return ""
-
-class handler(BaseHTTPRequestHandler):
+class handler(ColdStartHeaders, BaseHTTPRequestHandler):
     def do_GET(self):
         # Authenticate request
         user, error = authenticate_request(self)
@@ -109,7 +86,7 @@ class handler(BaseHTTPRequestHandler):
                     "unit_cost": 150000.0,
                     "reorder_level": 5,
                     "department": "Information Technology Project",
-                    "qr_code": generate_qr_code({"id": "inv-001", "name": "HP Laptop"}),
+                    "qr_code": snapshot_qr_code(SAMPLE_QR_DATA["inv-001"]),
                     "created_at": datetime.now().isoformat()
                 },
                 {
@@ -121,7 +98,7 @@ class handler(BaseHTTPRequestHandler):
                     "unit_cost": 25000.0,
                     "reorder_level": 10,
                     "department": "Corporate Services",
-                    "qr_code": generate_qr_code({"id": "inv-002", "name": "Office Chairs"}),
+                    "qr_code": snapshot_qr_code(SAMPLE_QR_DATA["inv-002"]),
                     "created_at": datetime.now().isoformat()
                 }
             ]
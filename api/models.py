@@ -5,19 +5,22 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import os
-import json
 import uuid
-import qrcode
-import io
-import base64
-from supabase import create_client, Client
 
 # Environment variables
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY) if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY else None
+# Created on first use and kept for the life of the instance
+_supabase = None
+
+def get_supabase():
+    """Supabase client, or None when it is not configured"""
+    global _supabase
+    if _supabase is None and SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
+        from supabase import create_client
+        _supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return _supabase
 
 # Security
 security = HTTPBearer(auto_error=False)
@@ -106,28 +109,8 @@ class User(BaseModel):
     full_name: Optional[str] = None
 
 # Helper Functions
-def generate_qr_code(data: dict) -> str:
-    """Generate QR code for inventory item"""
-    try:
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(json.dumps(data))
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        img_buffer = io.BytesIO()
-        img.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
-        
-        # Convert to base64
-        img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-        return f"data:image/png;base64,{img_base64}"
-    except Exception as e:
-        return ""
+# QR rendering and the QR snapshot live in _qr_codes.py, importable without FastAPI
+from _qr_codes import generate_qr_code, snapshot_qr_code, SAMPLE_QR_DATA  # noqa: E402
 
 async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> User:
     """Get current user from token"""
@@ -178,7 +161,7 @@ SAMPLE_INVENTORY = [
         unit_cost=150000.0,
         reorder_level=5,
         department="Information Technology Project",
-        qr_code=generate_qr_code({"id": "inv-001", "name": "HP Laptop"}),
+        qr_code=snapshot_qr_code(SAMPLE_QR_DATA["inv-001"]),
         created_at=datetime.now()
     ),
     InventoryItem(
@@ -190,7 +173,7 @@ SAMPLE_INVENTORY = [
         unit_cost=25000.0,
         reorder_level=10,
         department="Corporate Services",
-        qr_code=generate_qr_code({"id": "inv-002", "name": "Office Chairs"}),
+        qr_code=snapshot_qr_code(SAMPLE_QR_DATA["inv-002"]),
         created_at=datetime.now()
     )
 ]
@@ -5,7 +5,8 @@ from datetime import datetime
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from models import InventoryItem, User, get_current_user, generate_qr_code
+from models import InventoryItem, User, get_current_user, snapshot_qr_code, SAMPLE_QR_DATA
+from _cold_start import ColdStartMiddleware
 
 app = FastAPI()
 
@@ -16,6 +17,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ColdStartMiddleware)
 
 @app.get("/api/reports/low-stock", response_model=List[InventoryItem])
 async def get_low_stock_items(current_user: User = Depends(get_current_user)):
@@ -31,7 +33,7 @@ async def get_low_stock_items(current_user: User = Depends(get_current_user)):
                 unit_cost=15000.0,
                 reorder_level=10,
                 department="Corporate Services",
-                qr_code=generate_qr_code({"id": "inv-003", "name": "Printer Cartridges"}),
+                qr_code=snapshot_qr_code(SAMPLE_QR_DATA["inv-003"]),
                 created_at=datetime.now()
             )
         ]
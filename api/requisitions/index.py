@@ -2,8 +2,12 @@ from http.server import BaseHTTPRequestHandler
 import json
 import uuid
 from datetime import datetime
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _cold_start import ColdStartHeaders
 
-class handler(BaseHTTPRequestHandler):
+class handler(ColdStartHeaders, BaseHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
         # Sample requisitions data
         self.sample_requisitions = [
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Build the asset snapshots loaded at import on a cold start.
+
+Renders the QR codes of the backend's seed inventory into
+backend/asset_snapshot.json, and those of the sample data in api/_qr_codes.py
+into api/asset_snapshot.json. Re-run it after changing the seed data (or
+as a build step); a stale snapshot only costs the QR codes it is missing.
+
+Usage:
+    python backend/build_snapshot.py
+"""
+
+import asyncio
+import os
+import runpy
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "api")
+
+def build_backend_snapshot() -> int:
+    sys.path.insert(0, BACKEND_DIR)
+    # Importing the server seeds the store; nothing here talks to the database
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "snapshot-build")
+    from server import generate_qr_code
+    from utils.asset_snapshot import AssetSnapshot, DEFAULT_SNAPSHOT_PATH
+    from utils.inventory_import import qr_code_payload
+    from utils.inventory_store import inventory_store
+
+    snapshot = AssetSnapshot(DEFAULT_SNAPSHOT_PATH)
+    for item in asyncio.run(inventory_store.list_items()):
+        payload = qr_code_payload(item)
+        qr_code = generate_qr_code(payload)
+        if qr_code:
+            snapshot.add_qr_code(payload, qr_code)
+    snapshot.save()
+    return len(snapshot.qr_codes)
+
+def build_api_snapshot() -> int:
+    from utils.asset_snapshot import AssetSnapshot
+
+    qr_codes = runpy.run_path(os.path.join(API_DIR, "_qr_codes.py"))
+    snapshot = AssetSnapshot(qr_codes["SNAPSHOT_PATH"])
+    for payload in qr_codes["SAMPLE_QR_DATA"].values():
+        qr_code = qr_codes["generate_qr_code"](payload)
+        if qr_code:
+            snapshot.add_qr_code(payload, qr_code)
+    snapshot.save()
+    return len(snapshot.qr_codes)
+
+if __name__ == "__main__":
+    print(f"backend/asset_snapshot.json: {build_backend_snapshot()} QR codes")
+    print(f"api/asset_snapshot.json: {build_api_snapshot()} QR codes")
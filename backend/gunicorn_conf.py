@@ -0,0 +1,80 @@
+"""
+Gunicorn configuration for multi-worker deployments outside Vercel.
+
+    gunicorn -c gunicorn_conf.py server:app    (or: python serve.py)
+
+Every setting can be overridden from the environment; defaults suit a
+container behind a load balancer.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+host = os.environ.get("HOST", "0.0.0.0")
+port = _env_int("PORT", 8001)
+bind = f"{host}:{port}"
+
+# Async workers are not blocked by I/O, so one per core keeps every core busy
+workers = _env_int("WEB_CONCURRENCY", max(1, multiprocessing.cpu_count()))
+# Uses uvloop and httptools when they are installed (loop="auto", http="auto")
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master; workers fork with it already loaded
+preload_app = os.environ.get("PRELOAD_APP", "true").lower() != "false"
+
+# Longer than the usual 60s load balancer idle timeout, so the balancer
+# (not us) closes idle connections and never reuses one we just dropped
+keepalive = _env_int("KEEPALIVE_SECONDS", 75)
+
+# Recycle workers after a jittered number of requests to contain slow leaks
+# without restarting them all at once
+max_requests = _env_int("MAX_REQUESTS", 10000)
+max_requests_jitter = _env_int("MAX_REQUESTS_JITTER", 1000)
+
+# Above TimeoutMiddleware's 25s so gunicorn only kills truly stuck workers;
+# graceful_timeout covers the drain in GracefulShutdown.shutdown
+timeout = _env_int("WORKER_TIMEOUT_SECONDS", 60)
+graceful_timeout = _env_int("GRACEFUL_TIMEOUT_SECONDS", 30)
+backlog = _env_int("BACKLOG", 2048)
+
+# Heartbeat files on tmpfs avoid stalls on slow container disks
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# Requests are logged by RequestLoggingMiddleware
+accesslog = None
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info")
+
+# Workers publish metric snapshots here so /metrics covers all of them;
+# set before the app is imported so utils.metrics picks it up
+os.environ.setdefault("METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), f"uspf-metrics-{port}"))
+# Rate limits, error counts and the health report cache shared by all workers
+os.environ.setdefault("SHARED_STATE_PATH", os.path.join(tempfile.gettempdir(), f"uspf-state-{port}.db"))
+# Inventory, requisitions and BIN cards, shared by all workers and kept
+# across restarts; point it at a persistent volume in containers
+os.environ.setdefault("INVENTORY_DB_PATH", os.path.join(tempfile.gettempdir(), f"uspf-inventory-{port}.db"))
+
+def on_starting(server):
+    # Start from clean counters and caches (the inventory database is kept);
+    # workers reopen their own connections after fork
+    from utils.metrics import worker_metrics
+    from utils.shared_state import shared_state
+    worker_metrics.clear()
+    shared_state.clear()
+
+def post_fork(server, worker):
+    from utils.metrics import mark_worker_start
+    mark_worker_start()
+
+def child_exit(server, worker):
+    from utils.metrics import worker_metrics
+    try:
+        worker_metrics.retire(worker.pid)
+    except OSError as e:
+        server.log.warning(f"Could not retire metrics of worker {worker.pid}: {e}")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Production launcher for non-Vercel deployments.
+
+Runs the app under gunicorn with uvicorn workers using gunicorn_conf.py.
+Where gunicorn is unavailable (e.g. Windows) it falls back to uvicorn's own
+process manager, which cannot recycle workers.
+
+Usage:
+    python serve.py [--workers N] [--port 8001]
+"""
+
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the USPF API with multiple workers")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU core)")
+    parser.add_argument("--host", help="Bind address (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, help="Port (default: 8001)")
+    args = parser.parse_args()
+
+    # gunicorn_conf.py reads its settings from the environment
+    for name, value in (("WEB_CONCURRENCY", args.workers), ("HOST", args.host), ("PORT", args.port)):
+        if value is not None:
+            os.environ[name] = str(value)
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+
+    try:
+        from gunicorn.app.wsgiapp import run
+    except ImportError:
+        import uvicorn
+        # Same settings, and the same shared state paths, as under gunicorn
+        import gunicorn_conf as conf
+        uvicorn.run(
+            "server:app",
+            host=conf.host,
+            port=conf.port,
+            workers=conf.workers,
+            loop="auto",
+            http="auto",
+            timeout_keep_alive=conf.keepalive,
+            access_log=False
+        )
+        return
+
+    sys.argv = ["gunicorn", "--config", os.path.join(BACKEND_DIR, "gunicorn_conf.py"), "server:app"]
+    run()
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, status
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from dotenv import load_dotenv
@@ -10,15 +11,14 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import os
 import uuid
-import qrcode
 import io
 import base64
-from supabase import create_client, Client
 import json
 import jwt
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
 import secrets
 import asyncio
+import tempfile
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
@@ -33,23 +33,82 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from utils.logger import logger, monitor_performance
-    from utils.error_handler import ErrorHandler, graceful_shutdown
+    from utils.logger import logger, monitor_performance, PerformanceMonitor, error_tracker
+    from utils.error_handler import ErrorHandler, graceful_shutdown, circuit_breakers
     from utils.database import db_manager, with_database_retry
-    from utils.health_monitor import health_monitor
+    from utils.health_monitor import health_monitor, resource_sampler
+    from utils.timeseries_store import timeseries_store
+    from utils.deadline import DeadlineExceeded, run_in_executor
+    from utils.shared_state import shared_state
+    from utils.frontend_ingest import frontend_ingestor, PayloadTooLarge
     from utils.middleware import (
         RequestLoggingMiddleware,
         TimeoutMiddleware,
         SecurityHeadersMiddleware,
         RateLimitMiddleware,
-        MemoryMonitoringMiddleware
+        MemoryMonitoringMiddleware,
+        CompressionMiddleware,
+        MetricsMiddleware,
+        ColdStartMiddleware,
+        compression_stats
+    )
+    from utils.metrics import metrics_registry, operation_stats, worker_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+    from utils.inventory_store import inventory_store, RecordWrite, RecordNotFound, VersionConflict
+    from utils.inventory_import import (
+        InventoryImporter,
+        iter_csv_rows,
+        iter_xlsx_rows,
+        import_jobs,
+        qr_code_queue,
+        qr_code_payload
+    )
+    from utils.asset_snapshot import asset_snapshot
+    from utils.inventory_export import (
+        EXPORT_WRITERS,
+        EXPORT_MEDIA_TYPES,
+        ExportFormatError,
+        ensure_export_format,
+        export_columns
+    )
+    from utils.http_cache import conditional_response, make_etag
+    from utils.requisition_workflow import (
+        requisition_workflow,
+        available_quantity,
+        InvalidTransition,
+        InsufficientStock
     )
     UTILS_AVAILABLE = True
 except ImportError as e:
     # Fallback logging for Vercel deployment
     import logging
     logging.basicConfig(level=logging.INFO)
-    logger = logging.getLogger("uspf-inventory")
+    
+    class FallbackLogger:
+        """Plain logging that accepts the structured fields utils.logger takes"""
+        def __init__(self, name):
+            self.logger = logging.getLogger(name)
+        
+        def _log(self, level, message, exc_info=False, **fields):
+            if fields:
+                message = f"{message} {json.dumps(fields, default=str)}"
+            self.logger.log(level, message, exc_info=exc_info)
+        
+        def debug(self, message, **fields):
+            self._log(logging.DEBUG, message, **fields)
+        
+        def info(self, message, **fields):
+            self._log(logging.INFO, message, **fields)
+        
+        def warning(self, message, **fields):
+            self._log(logging.WARNING, message, **fields)
+        
+        def error(self, message, **fields):
+            self._log(logging.ERROR, message, **fields)
+        
+        def critical(self, message, **fields):
+            self._log(logging.CRITICAL, message, **fields)
+    
+    logger = FallbackLogger("uspf-inventory")
     
     # Fallback implementations
     def monitor_performance(name):
@@ -125,6 +184,9 @@ except ImportError as e:
         async def shutdown(self, timeout=20):
             pass
     
+    class DeadlineExceeded(Exception):
+        pass
+    
     db_manager = MockDbManager()
     graceful_shutdown = MockGracefulShutdown()
     
@@ -137,6 +199,9 @@ JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Largest batch accepted by POST /api/requisitions/bulk
+MAX_BULK_TRANSITIONS = 200
+
 # Supabase configuration
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
@@ -158,9 +223,15 @@ app = FastAPI(
 if UTILS_AVAILABLE:
     app.add_middleware(MemoryMonitoringMiddleware)
     app.add_middleware(SecurityHeadersMiddleware)
-    app.add_middleware(RateLimitMiddleware, requests_per_minute=120)
+    app.add_middleware(RateLimitMiddleware, requests_per_minute=int(os.environ.get("RATE_LIMIT_PER_MINUTE", "120")))
     app.add_middleware(TimeoutMiddleware, timeout_seconds=25)
     app.add_middleware(RequestLoggingMiddleware)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+    )
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(ColdStartMiddleware)
 
 # Add CORS middleware (should be last)
 app.add_middleware(
@@ -176,6 +247,8 @@ app.add_exception_handler(RequestValidationError, ErrorHandler.validation_except
 app.add_exception_handler(HTTPException, ErrorHandler.http_exception_handler)
 app.add_exception_handler(StarletteHTTPException, ErrorHandler.starlette_exception_handler)
 app.add_exception_handler(Exception, ErrorHandler.general_exception_handler)
+if UTILS_AVAILABLE:
+    app.add_exception_handler(DeadlineExceeded, ErrorHandler.deadline_exceeded_handler)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -215,6 +288,8 @@ class InventoryItem(BaseModel):
     reorder_level: int = 10
     department: str
     qr_code: Optional[str] = None
+    reserved_quantity: int = 0
+    version: Optional[int] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -256,6 +331,7 @@ class RequisitionRequest(BaseModel):
     requested_by: str
     approved_by: Optional[str] = None
     fulfilled_by: Optional[str] = None
+    version: Optional[int] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -270,6 +346,56 @@ class RequisitionUpdate(BaseModel):
     approved_by: Optional[str] = None
     fulfilled_by: Optional[str] = None
 
+class RequisitionTransition(RequisitionUpdate):
+    requisition_id: str
+
+class BulkRequisitionUpdate(BaseModel):
+    transitions: List[RequisitionTransition]
+    atomic: bool = False  # all-or-nothing instead of per-item results
+
+class BulkTransitionResult(BaseModel):
+    requisition_id: str
+    status: str
+    outcome: str  # applied, failed, skipped
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    requisition: Optional[RequisitionRequest] = None
+
+class BulkRequisitionResponse(BaseModel):
+    success: bool
+    applied: int
+    failed: int
+    skipped: int
+    results: List[BulkTransitionResult]
+
+class InventoryFilters:
+    """Query filters shared by the inventory list and export endpoints"""
+    
+    def __init__(
+        self,
+        search: Optional[str] = None,
+        category: Optional[str] = None,
+        department: Optional[str] = None,
+        low_stock: bool = False
+    ):
+        self.search = search.lower() if search else None
+        self.category = category
+        self.department = department
+        self.low_stock = low_stock
+    
+    def matches(self, item: Dict[str, Any]) -> bool:
+        if self.category and item.get("category") != self.category:
+            return False
+        if self.department and item.get("department") != self.department:
+            return False
+        if self.low_stock and available_quantity(item) > item.get("reorder_level", 0):
+            return False
+        if self.search:
+            haystack = f"{item.get('name') or ''} {item.get('description') or ''}".lower()
+            if self.search not in haystack:
+                return False
+        return True
+
 class User(BaseModel):
     id: str
     username: str
@@ -360,6 +486,8 @@ def verify_token(token: str, token_type: str = "access") -> dict:
 def generate_qr_code(data: dict) -> str:
     """Generate QR code for inventory item with error handling"""
     try:
+        import qrcode  # deferred: pulls in PIL, which only QR rendering needs
+        
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -391,6 +519,18 @@ def generate_qr_code(data: dict) -> str:
         }, exc_info=True)
         return ""
 
+async def render_qr_code(data: dict) -> str:
+    """Render a QR code off the event loop, skipped once the request has timed out"""
+    if not UTILS_AVAILABLE:
+        return generate_qr_code(data)
+    return await run_in_executor(generate_qr_code, data, stage="qr_code_generation")
+
+def transition_actor(updates: RequisitionUpdate, current_user: User) -> str:
+    """Name recorded against an approval, rejection or fulfilment"""
+    if updates.status == "fulfilled":
+        return updates.fulfilled_by or current_user.username
+    return updates.approved_by or current_user.username
+
 @monitor_performance("user_authentication")
 async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> User:
     """Get current user from JWT token with enhanced logging"""
@@ -431,7 +571,7 @@ async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] =
         
         return user
         
-    except HTTPException:
+    except (HTTPException, DeadlineExceeded):
         raise
     except Exception as e:
         logger.error(f"Token validation error: {str(e)}", auth_error={
@@ -444,6 +584,103 @@ async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] =
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+def require_inventory_store():
+    """Answer 503 on inventory and requisition routes when the store could not be imported"""
+    if not UTILS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Inventory storage not available in simplified mode")
+
+# Demo data loaded into the inventory store at import
+def seed_inventory_store(replace: bool = False):
+    """Load the sample inventory, requisitions and BIN card history (into an empty store unless ``replace``)"""
+    now = datetime.now()
+    items = [
+        {
+            "id": "inv-001",
+            "name": "HP Laptop",
+            "description": "HP EliteBook 840 G8",
+            "category": "Electronics",
+            "quantity": 25,
+            "unit_cost": 150000.0,
+            "reorder_level": 5,
+            "department": "Information Technology Project"
+        },
+        {
+            "id": "inv-002",
+            "name": "Office Chairs",
+            "description": "Ergonomic office chairs",
+            "category": "Furniture",
+            "quantity": 50,
+            "unit_cost": 25000.0,
+            "reorder_level": 10,
+            "department": "Corporate Services",
+            "reserved_quantity": 10  # held by approved req-002
+        },
+        {
+            "id": "inv-003",
+            "name": "Printer Cartridges",
+            "description": "HP LaserJet cartridges",
+            "category": "Consumables",
+            "quantity": 3,
+            "unit_cost": 15000.0,
+            "reorder_level": 10,
+            "department": "Corporate Services"
+        }
+    ]
+    for item in items:
+        # Precomputed by build_snapshot.py; misses are rendered in the background after startup
+        item["qr_code"] = asset_snapshot.qr_code(qr_code_payload(item))
+        item["created_at"] = now
+        item["updated_at"] = now
+    
+    requisitions = [
+        {
+            "id": "req-001",
+            "item_id": "inv-001",
+            "department": "Information Technology Project",
+            "requested_quantity": 3,
+            "purpose": "New employee setup",
+            "status": "pending",
+            "requested_by": "John Doe",
+            "approved_by": None,
+            "fulfilled_by": None,
+            "created_at": now,
+            "updated_at": now
+        },
+        {
+            "id": "req-002",
+            "item_id": "inv-002",
+            "department": "Corporate Services",
+            "requested_quantity": 10,
+            "purpose": "Office expansion",
+            "status": "approved",
+            "requested_by": "Jane Smith",
+            "approved_by": "Admin",
+            "fulfilled_by": None,
+            "created_at": now,
+            "updated_at": now
+        }
+    ]
+    
+    bin_card_entries = [
+        {
+            "item_id": item["id"],
+            "transaction_type": "receive",
+            "quantity": item["quantity"],
+            "balance": item["quantity"],
+            "reference_number": f"PO-2024-{index:03d}",
+            "department": "Procurement",
+            "remarks": "Initial stock",
+            "created_at": now
+        }
+        for index, item in enumerate(items, start=1)
+    ]
+    
+    inventory_store.seed(items, requisitions, bin_card_entries, replace=replace)
+
+if UTILS_AVAILABLE:
+    seed_inventory_store()
+    qr_code_queue.generator = generate_qr_code
+
 # API Routes
 
 @api_router.post("/auth/login", response_model=LoginResponse)
@@ -506,7 +743,7 @@ async def login(request: LoginRequest):
                 headers={"WWW-Authenticate": "Bearer"},
             )
             
-    except HTTPException:
+    except (HTTPException, DeadlineExceeded):
         raise
     except Exception as e:
         logger.error("Login system error", login_error={
@@ -574,7 +811,7 @@ async def refresh_token(request: TokenRefreshRequest):
             expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60
         )
         
-    except HTTPException:
+    except (HTTPException, DeadlineExceeded):
         raise
     except Exception as e:
         logger.error("Token refresh system error", refresh_error={
@@ -586,10 +823,15 @@ async def refresh_token(request: TokenRefreshRequest):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-@api_router.get("/inventory", response_model=List[InventoryItem])
+@api_router.get("/inventory", response_model=List[InventoryItem], dependencies=[Depends(require_inventory_store)])
 @monitor_performance("get_inventory")
-async def get_inventory(current_user: User = Depends(get_current_user)):
-    """Get all inventory items with enhanced error handling"""
+async def get_inventory(
+    request: Request,
+    response: Response,
+    filters: InventoryFilters = Depends(),
+    current_user: User = Depends(get_current_user)
+):
+    """Get inventory items, optionally filtered, with enhanced error handling"""
     try:
         logger.info("Inventory retrieval requested", user_context={
             "user_id": current_user.id,
@@ -597,42 +839,27 @@ async def get_inventory(current_user: User = Depends(get_current_user)):
             "department": current_user.department
         })
         
-        # In a real implementation, we'd fetch from Supabase
-        # For now, return sample data with monitoring
-        sample_items = [
-            InventoryItem(
-                id="inv-001",
-                name="HP Laptop",
-                description="HP EliteBook 840 G8",
-                category="Electronics",
-                quantity=25,
-                unit_cost=150000.0,
-                reorder_level=5,
-                department="Information Technology Project",
-                qr_code=generate_qr_code({"id": "inv-001", "name": "HP Laptop"}),
-                created_at=datetime.now()
-            ),
-            InventoryItem(
-                id="inv-002",
-                name="Office Chairs",
-                description="Ergonomic office chairs",
-                category="Furniture",
-                quantity=50,
-                unit_cost=25000.0,
-                reorder_level=10,
-                department="Corporate Services",
-                qr_code=generate_qr_code({"id": "inv-002", "name": "Office Chairs"}),
-                created_at=datetime.now()
-            )
-        ]
+        state = await inventory_store.collection_state("inventory")
+        not_modified = conditional_response(
+            request,
+            response,
+            make_etag("inventory", state.epoch, state.version, request.url.query),
+            state.last_modified
+        )
+        if not_modified:
+            return not_modified
+        
+        items = [InventoryItem(**record) async for record in inventory_store.iter_items(filters.matches)]
         
         logger.info("Inventory retrieved successfully", inventory_info={
-            "item_count": len(sample_items),
+            "item_count": len(items),
             "user": current_user.username
         })
         
-        return sample_items
+        return items
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error("Inventory retrieval failed", inventory_error={
             "user_id": current_user.id,
@@ -643,7 +870,47 @@ async def get_inventory(current_user: User = Depends(get_current_user)):
             detail="Failed to fetch inventory"
         )
 
-@api_router.post("/inventory", response_model=InventoryItem)
+@api_router.get("/inventory/export", dependencies=[Depends(require_inventory_store)])
+@monitor_performance("inventory_export")
+async def export_inventory(
+    format: str = Query("csv", pattern="^(csv|ndjson|xlsx)$"),
+    include_qr: bool = False,
+    filters: InventoryFilters = Depends(),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream inventory with stock valuation as CSV, NDJSON or XLSX.
+
+    Rows are read from the store one at a time and written out in chunks,
+    so memory use stays flat regardless of inventory size. QR code images
+    are left out unless ``include_qr`` is set.
+    """
+    try:
+        ensure_export_format(format)
+    except ExportFormatError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    logger.info("Inventory export requested", inventory_export={
+        "format": format,
+        "include_qr": include_qr,
+        "user": current_user.username
+    })
+    
+    filename = f"inventory-{datetime.utcnow().strftime('%Y%m%d')}.{format}"
+    body = EXPORT_WRITERS[format](
+        inventory_store.iter_items(filters.matches),
+        export_columns(include_qr)
+    )
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@api_router.post("/inventory", response_model=InventoryItem, dependencies=[Depends(require_inventory_store)])
 async def create_inventory_item(
     item: InventoryItemCreate,
     current_user: User = Depends(get_current_user)
@@ -657,25 +924,31 @@ async def create_inventory_item(
             "name": item.name,
             "category": item.category
         }
-        qr_code = generate_qr_code(qr_data)
+        qr_code = await render_qr_code(qr_data)
         
-        new_item = InventoryItem(
-            id=item_id,
-            name=item.name,
-            description=item.description,
-            category=item.category,
-            quantity=item.quantity,
-            unit_cost=item.unit_cost,
-            reorder_level=item.reorder_level,
-            department=item.department,
-            qr_code=qr_code,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
-        )
+        record = {
+            "id": item_id,
+            **item.model_dump(),
+            "qr_code": qr_code,
+            "reserved_quantity": 0
+        }
+        
+        # Opening balance goes on the BIN card as a receipt
+        opening_entries = []
+        if item.quantity > 0:
+            opening_entries.append({
+                "item_id": item_id,
+                "transaction_type": "receive",
+                "quantity": item.quantity,
+                "balance": item.quantity,
+                "department": item.department,
+                "remarks": "Opening stock"
+            })
         
-        # TODO: Save to Supabase database
-        # For now, just return the created item
-        return new_item
+        stored = await inventory_store.insert("inventory", record, opening_entries)
+        return InventoryItem(**stored)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error creating inventory item: {str(e)}")
         raise HTTPException(
@@ -683,7 +956,64 @@ async def create_inventory_item(
             detail="Failed to create inventory item"
         )
 
-@api_router.put("/inventory/{item_id}", response_model=InventoryItem)
+@api_router.post("/inventory/import", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(require_inventory_store)])
+@monitor_performance("inventory_import")
+async def import_inventory(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|xlsx)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import inventory items from a CSV or XLSX upload.
+
+    The upload is spooled to a temporary file and the job id returned at
+    once; rows are then validated against InventoryItemCreate and inserted
+    in batches in the background, followed by QR code rendering. Poll
+    GET /api/inventory/import/{job_id} for progress and the error report.
+    """
+    filename = file.filename or "upload"
+    file_format = format or ("xlsx" if filename.lower().endswith(".xlsx") else "csv")
+    
+    def validate(row: Dict[str, Any]) -> Dict[str, Any]:
+        return InventoryItemCreate(**row).model_dump()
+    
+    # The request closes its upload when it returns, so the job gets its own copy
+    upload = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    while chunk := await file.read(64 * 1024):
+        upload.write(chunk)
+    upload.seek(0)
+    
+    job = await import_jobs.create(filename)
+    logger.info("Inventory import started", inventory_import={
+        "job_id": job.id,
+        "filename": filename,
+        "format": file_format,
+        "user": current_user.username
+    })
+    
+    async def run_import():
+        try:
+            rows = iter_xlsx_rows(upload) if file_format == "xlsx" else iter_csv_rows(upload)
+            await InventoryImporter().run(job, rows, validate)
+        finally:
+            upload.close()
+    
+    import_jobs.run_in_background(job, run_import())
+    return job.to_dict()
+
+@api_router.get("/inventory/import/{job_id}", dependencies=[Depends(require_inventory_store)])
+async def get_inventory_import(job_id: str, current_user: User = Depends(get_current_user)):
+    """Get progress and error report for an inventory import"""
+    # Served from the shared state when another worker runs the import
+    job = await import_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return job
+
+@api_router.put("/inventory/{item_id}", response_model=InventoryItem, dependencies=[Depends(require_inventory_store)])
 async def update_inventory_item(
     item_id: str,
     updates: InventoryItemUpdate,
@@ -691,21 +1021,48 @@ async def update_inventory_item(
 ):
     """Update an inventory item"""
     try:
-        # TODO: Implement actual update logic with Supabase
-        # For now, return a sample updated item
-        updated_item = InventoryItem(
-            id=item_id,
-            name=updates.name or "Updated Item",
-            description=updates.description or "Updated description",
-            category=updates.category or "Updated Category",
-            quantity=updates.quantity or 0,
-            unit_cost=updates.unit_cost or 0.0,
-            reorder_level=updates.reorder_level or 10,
-            department="Information Technology Project",
-            qr_code=generate_qr_code({"id": item_id, "name": updates.name or "Updated Item"}),
-            updated_at=datetime.now()
+        item = await inventory_store.get_item(item_id)
+        if item is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Inventory item not found"
+            )
+        
+        changes = updates.model_dump(exclude_unset=True, exclude_none=True)
+        bin_card_entries = []
+        
+        if "quantity" in changes and changes["quantity"] != item["quantity"]:
+            if changes["quantity"] < item.get("reserved_quantity", 0):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Quantity cannot be reduced below the reserved quantity"
+                )
+            bin_card_entries.append({
+                "item_id": item_id,
+                "transaction_type": "adjustment",
+                "quantity": changes["quantity"] - item["quantity"],
+                "balance": changes["quantity"],
+                "department": item["department"],
+                "remarks": f"Adjusted by {current_user.username}"
+            })
+        
+        item.update(changes)
+        if "name" in changes or "category" in changes:
+            item["qr_code"] = await render_qr_code({
+                "id": item_id,
+                "name": item["name"],
+                "category": item["category"]
+            })
+        
+        result = await inventory_store.commit([RecordWrite("inventory", item)], bin_card_entries)
+        return InventoryItem(**result.records[item_id])
+    except (HTTPException, DeadlineExceeded):
+        raise
+    except VersionConflict:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Inventory item was modified concurrently, please retry"
         )
-        return updated_item
     except Exception as e:
         logger.error(f"Error updating inventory item: {str(e)}")
         raise HTTPException(
@@ -713,39 +1070,34 @@ async def update_inventory_item(
             detail="Failed to update inventory item"
         )
 
-@api_router.get("/inventory/{item_id}/bin-card", response_model=List[BinCardEntry])
+@api_router.get("/inventory/{item_id}/bin-card", response_model=List[BinCardEntry], dependencies=[Depends(require_inventory_store)])
 async def get_bin_card_history(
     item_id: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user)
 ):
     """Get BIN card history for an inventory item"""
     try:
-        # Sample BIN card entries
-        sample_entries = [
-            BinCardEntry(
-                id="bin-001",
-                item_id=item_id,
-                transaction_type="receive",
-                quantity=50,
-                balance=50,
-                reference_number="PO-2024-001",
-                department="Procurement",
-                remarks="Initial stock",
-                created_at=datetime.now()
-            ),
-            BinCardEntry(
-                id="bin-002",
-                item_id=item_id,
-                transaction_type="issue",
-                quantity=5,
-                balance=45,
-                reference_number="SIV-2024-001",
-                department="Information Technology Project",
-                remarks="Issued for project setup",
-                created_at=datetime.now()
+        if await inventory_store.get_item(item_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Inventory item not found"
             )
-        ]
-        return sample_entries
+        
+        state = await inventory_store.collection_state("bin_cards")
+        not_modified = conditional_response(
+            request,
+            response,
+            make_etag("bin_card", state.epoch, item_id, *await inventory_store.bin_card_state(item_id)),
+            state.last_modified
+        )
+        if not_modified:
+            return not_modified
+        
+        return [BinCardEntry(**entry) for entry in await inventory_store.get_bin_card(item_id)]
+    except (HTTPException, DeadlineExceeded):
+        raise
     except Exception as e:
         logger.error(f"Error fetching BIN card history: {str(e)}")
         raise HTTPException(
@@ -753,35 +1105,27 @@ async def get_bin_card_history(
             detail="Failed to fetch BIN card history"
         )
 
-@api_router.get("/requisitions", response_model=List[RequisitionRequest])
-async def get_requisitions(current_user: User = Depends(get_current_user)):
+@api_router.get("/requisitions", response_model=List[RequisitionRequest], dependencies=[Depends(require_inventory_store)])
+async def get_requisitions(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
     """Get all requisition requests"""
     try:
-        # Sample requisitions
-        sample_requisitions = [
-            RequisitionRequest(
-                id="req-001",
-                item_id="inv-001",
-                department="Information Technology Project",
-                requested_quantity=3,
-                purpose="New employee setup",
-                status="pending",
-                requested_by="John Doe",
-                created_at=datetime.now()
-            ),
-            RequisitionRequest(
-                id="req-002",
-                item_id="inv-002",
-                department="Corporate Services",
-                requested_quantity=10,
-                purpose="Office expansion",
-                status="approved",
-                requested_by="Jane Smith",
-                approved_by="Admin",
-                created_at=datetime.now()
-            )
-        ]
-        return sample_requisitions
+        state = await inventory_store.collection_state("requisitions")
+        not_modified = conditional_response(
+            request,
+            response,
+            make_etag("requisitions", state.epoch, state.version),
+            state.last_modified
+        )
+        if not_modified:
+            return not_modified
+        
+        return [RequisitionRequest(**record) for record in await inventory_store.list_requisitions()]
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error fetching requisitions: {str(e)}")
         raise HTTPException(
@@ -789,26 +1133,40 @@ async def get_requisitions(current_user: User = Depends(get_current_user)):
             detail="Failed to fetch requisitions"
         )
 
-@api_router.post("/requisitions", response_model=RequisitionRequest)
+@api_router.post("/requisitions", response_model=RequisitionRequest, dependencies=[Depends(require_inventory_store)])
 async def create_requisition(
     requisition: RequisitionCreate,
     current_user: User = Depends(get_current_user)
 ):
     """Create a new requisition request"""
     try:
-        new_requisition = RequisitionRequest(
-            id=str(uuid.uuid4()),
-            item_id=requisition.item_id,
-            department=current_user.department,
-            requested_quantity=requisition.requested_quantity,
-            purpose=requisition.purpose,
-            status="pending",
-            requested_by=requisition.requested_by,
-            created_at=datetime.now()
-        )
+        if requisition.requested_quantity <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Requested quantity must be positive"
+            )
+        if await inventory_store.get_item(requisition.item_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Inventory item not found"
+            )
         
-        # TODO: Save to Supabase database
-        return new_requisition
+        record = {
+            "id": str(uuid.uuid4()),
+            "item_id": requisition.item_id,
+            "department": current_user.department,
+            "requested_quantity": requisition.requested_quantity,
+            "purpose": requisition.purpose,
+            "status": "pending",
+            "requested_by": requisition.requested_by,
+            "approved_by": None,
+            "fulfilled_by": None
+        }
+        
+        stored = await inventory_store.insert("requisitions", record)
+        return RequisitionRequest(**stored)
+    except (HTTPException, DeadlineExceeded):
+        raise
     except Exception as e:
         logger.error(f"Error creating requisition: {str(e)}")
         raise HTTPException(
@@ -816,7 +1174,64 @@ async def create_requisition(
             detail="Failed to create requisition"
         )
 
-@api_router.put("/requisitions/{requisition_id}", response_model=RequisitionRequest)
+@api_router.post("/requisitions/bulk", response_model=BulkRequisitionResponse, dependencies=[Depends(require_inventory_store)])
+@monitor_performance("bulk_requisition_update")
+async def bulk_update_requisitions(
+    request: BulkRequisitionUpdate,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Approve, reject or fulfil many requisitions in one request.
+
+    Transitions are validated in order and the valid ones are written in a
+    single batch. By default each transition succeeds or fails on its own and
+    the response lists a result per transition; with ``atomic`` set, any
+    failure leaves the whole batch unapplied.
+    """
+    if not request.transitions:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="At least one transition is required"
+        )
+    if len(request.transitions) > MAX_BULK_TRANSITIONS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_BULK_TRANSITIONS} transitions are allowed per request"
+        )
+    
+    try:
+        results = await requisition_workflow.bulk_transition(
+            [
+                (transition.requisition_id, transition.status, transition_actor(transition, current_user))
+                for transition in request.transitions
+            ],
+            atomic=request.atomic
+        )
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error applying bulk requisition update: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update requisitions"
+        )
+    
+    counts = {"applied": 0, "failed": 0, "skipped": 0}
+    for result in results:
+        counts[result["outcome"]] += 1
+    
+    return BulkRequisitionResponse(
+        success=counts["failed"] == 0,
+        results=[BulkTransitionResult(**result) for result in results],
+        **counts
+    )
+
+@api_router.put("/requisitions/{requisition_id}", response_model=RequisitionRequest, dependencies=[Depends(require_inventory_store)])
 async def update_requisition(
     requisition_id: str,
     updates: RequisitionUpdate,
@@ -824,21 +1239,22 @@ async def update_requisition(
 ):
     """Update a requisition request (approve/reject/fulfill)"""
     try:
-        # TODO: Implement actual update logic
-        updated_requisition = RequisitionRequest(
-            id=requisition_id,
-            item_id="inv-001",
-            department="Information Technology Project",
-            requested_quantity=3,
-            purpose="New employee setup",
-            status=updates.status,
-            requested_by="John Doe",
-            approved_by=updates.approved_by,
-            fulfilled_by=updates.fulfilled_by,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
+        updated = await requisition_workflow.transition(
+            requisition_id, updates.status, transition_actor(updates, current_user)
         )
-        return updated_requisition
+        return RequisitionRequest(**updated)
+    except RecordNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except (InvalidTransition, InsufficientStock, VersionConflict) as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error updating requisition: {str(e)}")
         raise HTTPException(
@@ -846,26 +1262,31 @@ async def update_requisition(
             detail="Failed to update requisition"
         )
 
-@api_router.get("/reports/low-stock", response_model=List[InventoryItem])
-async def get_low_stock_items(current_user: User = Depends(get_current_user)):
-    """Get items below reorder level"""
+@api_router.get("/reports/low-stock", response_model=List[InventoryItem], dependencies=[Depends(require_inventory_store)])
+async def get_low_stock_items(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    """Get items whose unreserved stock is at or below reorder level"""
     try:
-        # Sample low stock items
-        low_stock_items = [
-            InventoryItem(
-                id="inv-003",
-                name="Printer Cartridges",
-                description="HP LaserJet cartridges",
-                category="Consumables",
-                quantity=3,
-                unit_cost=15000.0,
-                reorder_level=10,
-                department="Corporate Services",
-                qr_code=generate_qr_code({"id": "inv-003", "name": "Printer Cartridges"}),
-                created_at=datetime.now()
-            )
+        state = await inventory_store.collection_state("inventory")
+        not_modified = conditional_response(
+            request,
+            response,
+            make_etag("low_stock", state.epoch, state.version),
+            state.last_modified
+        )
+        if not_modified:
+            return not_modified
+        
+        return [
+            InventoryItem(**record)
+            for record in await inventory_store.list_items()
+            if available_quantity(record) <= record["reorder_level"]
         ]
-        return low_stock_items
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error fetching low stock items: {str(e)}")
         raise HTTPException(
@@ -921,6 +1342,8 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
         
         return stats
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error("Dashboard stats error", dashboard_error={
             "user_id": current_user.id,
@@ -931,8 +1354,15 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
             detail="Failed to fetch dashboard stats"
         )
 
-# Include the router in the main app
-app.include_router(api_router)
+@api_router.get("/errors/summary")
+async def get_error_summary(limit: int = Query(50, ge=1, le=500), current_user: User = Depends(get_current_user)):
+    """Aggregated server errors grouped by fingerprint, most frequent first"""
+    if not UTILS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Error tracking not available in simplified mode")
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        **error_tracker.get_fingerprint_summary(limit=limit)
+    }
 
 # Startup and shutdown events
 @app.on_event("startup")
@@ -949,9 +1379,18 @@ async def startup_event():
         
         # Initialize database connection only if utils are available
         if UTILS_AVAILABLE:
-            db_initialized = await db_manager.initialize()
-            if not db_initialized:
-                logger.warning("Database initialization failed - running in degraded mode")
+            resource_sampler.start()
+            worker_metrics.start()
+            if timeseries_store.enabled:
+                loaded = await asyncio.get_running_loop().run_in_executor(None, health_monitor.history.load)
+                logger.info(f"Restored {loaded} health history points from {timeseries_store.path}")
+                timeseries_store.start()
+            # Connect in the background so the first request is not held up by
+            # connection retries; database operations wait for it on first use
+            db_manager.initialize_in_background()
+            # Sample items missing from the asset snapshot are seeded without QR codes
+            missing_qr = [item["id"] for item in await inventory_store.list_items() if not item.get("qr_code")]
+            await qr_code_queue.enqueue(None, missing_qr)
         else:
             logger.info("Running in simplified mode without full database utilities")
         
@@ -971,7 +1410,14 @@ async def shutdown_event():
         
         # Wait for active requests to complete only if utils available
         if UTILS_AVAILABLE:
-            await graceful_shutdown.shutdown(timeout=20)
+            await graceful_shutdown.shutdown(timeout=20, flush=(
+                import_jobs.stop,
+                qr_code_queue.stop,
+                frontend_ingestor.stop,
+                resource_sampler.stop,
+                timeseries_store.stop,
+                worker_metrics.stop
+            ))
         
         logger.info("Graceful shutdown completed")
         
@@ -982,7 +1428,14 @@ async def shutdown_event():
 @app.get("/health")
 @monitor_performance("health_check_basic")
 async def health_check():
-    """Basic health check endpoint"""
+    """Basic health check endpoint; 503 while draining so traffic moves elsewhere"""
+    if UTILS_AVAILABLE and graceful_shutdown.draining:
+        return JSONResponse(status_code=503, content={
+            "status": "draining",
+            "service": "USPF Inventory Management API",
+            "active_requests": graceful_shutdown.active_requests,
+            "timestamp": datetime.utcnow().isoformat()
+        })
     return {
         "status": "healthy", 
         "service": "USPF Inventory Management API",
@@ -990,14 +1443,35 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.post("/health/drain")
+async def start_draining(request: Request):
+    """Flip readiness to 503 ahead of a shutdown (e.g. from a preStop hook); local callers only"""
+    if not UTILS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Draining not available in simplified mode")
+    if not request.client or request.client.host not in ("127.0.0.1", "::1", "localhost"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Draining can only be started locally")
+    graceful_shutdown.start_draining()
+    return {"status": "draining", "active_requests": graceful_shutdown.active_requests}
+
 @app.get("/health/detailed")
 @monitor_performance("health_check_detailed")
-async def detailed_health_check():
-    """Comprehensive health check with all system components"""
+async def detailed_health_check(
+    fresh: bool = False,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+):
+    """Comprehensive health check with all system components (cached; admins can re-run it with ?fresh=1)"""
+    if fresh:
+        # Re-running every dependency check on demand is not for anonymous callers
+        user = await get_current_user(credentials)
+        if user.role != "admin":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only administrators can bypass the health report cache"
+            )
+    
     try:
         if UTILS_AVAILABLE:
-            health_report = await health_monitor.run_all_checks()
-            return health_report
+            return await health_monitor.get_report(fresh=fresh)
         else:
             return {
                 "status": "healthy",
@@ -1006,6 +1480,8 @@ async def detailed_health_check():
                 "mode": "simplified",
                 "timestamp": datetime.utcnow().isoformat()
             }
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
         return {
@@ -1027,14 +1503,39 @@ async def health_trends(hours: int = 24):
                 "message": "Health trends not available in simplified mode",
                 "mode": "simplified"
             }
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Health trends error: {str(e)}")
         return {"error": str(e)}
 
 @app.get("/metrics")
+async def prometheus_metrics():
+    """Expose request, operation and process metrics in Prometheus text format"""
+    if not UTILS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Metrics not available in simplified mode")
+    if worker_metrics.enabled:
+        # Reading every worker's snapshot is file I/O; keep it off the loop
+        content = await asyncio.get_running_loop().run_in_executor(None, worker_metrics.render)
+    else:
+        content = metrics_registry.render()
+    return Response(content=content, media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/metrics/operations")
+async def operation_metrics():
+    """Latency percentiles for operations instrumented with monitor_performance"""
+    if not UTILS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Metrics not available in simplified mode")
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "slow_threshold_ms": PerformanceMonitor.slow_threshold_ms,
+        "operations": operation_stats.snapshot()
+    }
+
+@app.get("/metrics/json")
 @monitor_performance("system_metrics")
 async def system_metrics():
-    """Get system performance metrics"""
+    """Get a JSON summary of system performance metrics"""
     try:
         metrics = {
             "timestamp": datetime.utcnow().isoformat(),
@@ -1047,27 +1548,26 @@ async def system_metrics():
         
         if UTILS_AVAILABLE:
             try:
-                import psutil
-                
-                # System metrics
-                memory = psutil.virtual_memory()
-                cpu_percent = psutil.cpu_percent(interval=1)
+                # System metrics from the background sampler
+                reading = resource_sampler.latest()
                 
                 # Database metrics
                 db_stats = db_manager.get_connection_stats()
                 
                 # Error metrics
-                try:
-                    from utils import error_tracker
-                    error_summary = error_tracker.get_error_summary()
-                except:
-                    error_summary = {}
+                error_summary = error_tracker.get_error_summary()
                 
                 metrics.update({
+                    "compression": compression_stats.get_stats(),
+                    "frontend_ingestion": frontend_ingestor.get_stats(),
+                    "circuit_breakers": {name: breaker.get_stats() for name, breaker in circuit_breakers.items()},
+                    "shared_state": shared_state.get_stats(),
+                    "asset_snapshot": asset_snapshot.get_stats(),
                     "system": {
-                        "memory_percent": round(memory.percent, 2),
-                        "memory_available_mb": round(memory.available / 1024 / 1024, 2),
-                        "cpu_percent": round(cpu_percent, 2)
+                        "memory_percent": round(reading.memory_percent, 2),
+                        "memory_available_mb": reading.memory_available_mb,
+                        "cpu_percent": round(reading.cpu_percent, 2),
+                        "rolling_averages": resource_sampler.averages()
                     },
                     "database": db_stats,
                     "errors": {
@@ -1080,98 +1580,84 @@ async def system_metrics():
         
         return metrics
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Metrics collection error: {str(e)}")
         return {"error": str(e)}
 
 # Additional endpoints for frontend logging and monitoring
-@api_router.post("/logs/frontend")
-@monitor_performance("frontend_log_ingestion")
-async def receive_frontend_logs(logs_data: Dict[str, Any]):
-    """Receive and process frontend logs"""
-    try:
-        logs = logs_data.get("logs", [])
-        
-        for log_entry in logs:
-            # Process each log entry
-            level = log_entry.get("level", "info").upper()
-            message = log_entry.get("message", "")
-            data = log_entry.get("data", {})
-            
-            # Enhanced log entry with frontend context
-            frontend_log_data = {
-                "source": "frontend",
-                "session_id": log_entry.get("sessionId"),
-                "user_id": log_entry.get("userId"),
-                "url": log_entry.get("url"),
-                "pathname": log_entry.get("pathname"),
-                "user_agent": log_entry.get("userAgent"),
-                "performance": log_entry.get("performance"),
-                "data": data
-            }
-            
-            # Log based on level
-            if level == "ERROR":
-                logger.error(f"Frontend: {message}", extra={"frontend_error": frontend_log_data})
-            elif level == "WARN":
-                logger.warning(f"Frontend: {message}", extra={"frontend_warning": frontend_log_data})
-            elif level == "INFO":
-                logger.info(f"Frontend: {message}", extra={"frontend_info": frontend_log_data})
-            else:
-                logger.debug(f"Frontend: {message}", extra={"frontend_debug": frontend_log_data})
-        
-        return {"success": True, "processed": len(logs)}
-        
-    except Exception as e:
-        logger.error("Frontend log processing failed", extra={
-            "frontend_log_error": {
-                "error": str(e),
-                "logs_count": len(logs_data.get("logs", []))
-            }
-        })
-        return {"success": False, "error": str(e)}
+def frontend_session_key(request: Request, entries: List[Dict[str, Any]]) -> str:
+    """Rate-limit key: the client's session id, falling back to its address"""
+    session_id = request.headers.get("x-session-id")
+    if not session_id and entries and isinstance(entries[0], dict):
+        session_id = entries[0].get("sessionId")
+    if session_id:
+        return f"session:{str(session_id)[:200]}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
 
-@api_router.post("/errors/frontend")
-@monitor_performance("frontend_error_reporting")
-async def receive_frontend_error(error_data: Dict[str, Any]):
-    """Receive and process frontend error reports"""
+async def read_frontend_payload(request: Request) -> Any:
+    """Read a JSON body, rejecting it as soon as it exceeds the payload cap"""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > frontend_ingestor.max_payload_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Payload too large")
     try:
-        # Extract error information
-        error_info = error_data.get("error", {})
-        context = error_data.get("context", {})
-        
-        # Create structured error log
-        frontend_error = {
-            "source": "frontend",
-            "error_id": error_data.get("errorId"),
-            "error_name": error_info.get("name"),
-            "error_message": error_info.get("message"),
-            "error_stack": error_info.get("stack"),
-            "url": error_data.get("url"),
-            "user_agent": error_data.get("userAgent"),
-            "timestamp": error_data.get("timestamp"),
-            "context": context
-        }
-        
-        logger.error(
-            f"Frontend Error: {error_info.get('name', 'Unknown')} - {error_info.get('message', 'No message')}",
-            extra={"frontend_error": frontend_error}
+        # Chunked bodies have no Content-Length; stop reading once past the cap
+        return frontend_ingestor.parse_body(await frontend_ingestor.read_body(request.stream()))
+    except PayloadTooLarge:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Payload too large")
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be valid JSON")
+
+def ingestion_response(accepted: int, dropped: int, **extra) -> JSONResponse:
+    # Nothing accepted means the client is over its rate or the queue is full
+    if dropped and not accepted:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"success": False, "accepted": 0, "dropped": dropped, **extra},
+            headers={"Retry-After": "60"}
         )
-        
-        return {
-            "success": True,
-            "error_id": error_data.get("errorId"),
-            "message": "Error report received"
-        }
-        
-    except Exception as e:
-        logger.error("Frontend error reporting failed", extra={
-            "error_processing": {
-                "error": str(e),
-                "original_error_id": error_data.get("errorId")
-            }
-        })
-        return {"success": False, "error": str(e)}
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"success": True, "accepted": accepted, "dropped": dropped, **extra}
+    )
+
+@api_router.post("/logs/frontend", status_code=status.HTTP_202_ACCEPTED)
+async def receive_frontend_logs(request: Request):
+    """Queue frontend logs for background processing"""
+    if not UTILS_AVAILABLE:
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"success": True, "accepted": 0, "dropped": 0})
+    
+    logs_data = await read_frontend_payload(request)
+    logs = logs_data.get("logs", []) if isinstance(logs_data, dict) else None
+    if not isinstance(logs, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected an object with a logs array")
+    
+    accepted, dropped = frontend_ingestor.submit("log", frontend_session_key(request, logs), logs)
+    return ingestion_response(accepted, dropped)
+
+@api_router.post("/errors/frontend", status_code=status.HTTP_202_ACCEPTED)
+async def receive_frontend_error(request: Request):
+    """Queue a frontend error report for background processing"""
+    if not UTILS_AVAILABLE:
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"success": True, "accepted": 0, "dropped": 0})
+    
+    error_data = await read_frontend_payload(request)
+    if not isinstance(error_data, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected an error report object")
+    
+    accepted, dropped = frontend_ingestor.submit("error", frontend_session_key(request, [error_data]), [error_data])
+    return ingestion_response(accepted, dropped, error_id=error_data.get("errorId"))
+
+@api_router.get("/errors/frontend/summary")
+async def get_frontend_error_summary(limit: int = Query(20, ge=1, le=200), current_user: User = Depends(get_current_user)):
+    """Most frequent frontend errors after deduplication"""
+    if not UTILS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Error tracking not available in simplified mode")
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        **frontend_ingestor.error_aggregator.summary(limit=limit)
+    }
 
 @api_router.get("/health/cron")
 @monitor_performance("health_cron_check")
@@ -1179,8 +1665,8 @@ async def health_cron_check():
     """Cron job endpoint for regular health monitoring"""
     try:
         if UTILS_AVAILABLE:
-            # Run comprehensive health check
-            health_report = await health_monitor.run_all_checks()
+            # Reuses a report from the last TTL rather than re-running every check
+            health_report = await health_monitor.get_report()
             
             # Log health status
             if health_report["status"] != "healthy":
@@ -1196,6 +1682,7 @@ async def health_cron_check():
             return {
                 "status": "completed",
                 "health_status": health_report["status"],
+                "cache": health_report["cache"],
                 "timestamp": datetime.utcnow().isoformat()
             }
         else:
@@ -1206,6 +1693,8 @@ async def health_cron_check():
                 "timestamp": datetime.utcnow().isoformat()
             }
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error("Health cron check failed", extra={
             "cron_error": {"error": str(e)}
@@ -1216,6 +1705,10 @@ async def health_cron_check():
             "timestamp": datetime.utcnow().isoformat()
         }
 
+# Include the router in the main app once every route has been declared
+app.include_router(api_router)
+
 if __name__ == "__main__":
+    # Single-process development server; production uses serve.py
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
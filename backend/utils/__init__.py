@@ -3,16 +3,68 @@ Utility modules for USPF Inventory Management System
 """
 
 from .logger import logger, monitor_performance, PerformanceMonitor, error_tracker
-from .error_handler import ErrorHandler, CircuitBreaker, graceful_shutdown
+from .error_handler import (
+    ErrorHandler,
+    CircuitBreaker,
+    CircuitOpenError,
+    circuit_breakers,
+    get_circuit_breaker,
+    graceful_shutdown
+)
 from .database import db_manager, with_database_retry, health_monitor as db_health_monitor
 from .middleware import (
     RequestLoggingMiddleware,
     TimeoutMiddleware,
     SecurityHeadersMiddleware,
     RateLimitMiddleware,
-    MemoryMonitoringMiddleware
+    MemoryMonitoringMiddleware,
+    CompressionMiddleware,
+    MetricsMiddleware,
+    ColdStartMiddleware,
+    compression_stats
+)
+from .metrics import metrics_registry, operation_stats, worker_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .health_monitor import health_monitor, resource_sampler
+from .health_history import HealthHistory
+from .timeseries_store import TimeSeriesStore, timeseries_store
+from .deadline import Deadline, DeadlineExceeded, current_deadline, get_deadline, check_deadline, run_in_executor
+from .retry import RetryPolicy
+from .shared_state import SharedState, InProcessState, SQLiteState, shared_state
+from .frontend_ingest import FrontendIngestor, FrontendErrorAggregator, SessionRateLimiter, PayloadTooLarge, frontend_ingestor
+from .inventory_store import (
+    InventoryStore,
+    InProcessInventoryStore,
+    SQLiteInventoryStore,
+    CollectionState,
+    RecordWrite,
+    RecordNotFound,
+    VersionConflict,
+    inventory_store
+)
+from .inventory_import import (
+    InventoryImporter,
+    ImportFormatError,
+    iter_csv_rows,
+    iter_xlsx_rows,
+    import_jobs,
+    qr_code_queue,
+    qr_code_payload
+)
+from .asset_snapshot import AssetSnapshot, asset_snapshot
+from .inventory_export import (
+    EXPORT_WRITERS,
+    EXPORT_MEDIA_TYPES,
+    ExportFormatError,
+    ensure_export_format,
+    export_columns
+)
+from .http_cache import conditional_response, make_etag, http_date
+from .requisition_workflow import (
+    RequisitionWorkflow,
+    InvalidTransition,
+    InsufficientStock,
+    requisition_workflow
 )
-from .health_monitor import health_monitor
 
 __all__ = [
     "logger",
@@ -21,14 +73,74 @@ __all__ = [
     "error_tracker",
     "ErrorHandler",
     "CircuitBreaker",
+    "CircuitOpenError",
+    "circuit_breakers",
+    "get_circuit_breaker",
     "graceful_shutdown",
     "db_manager",
     "with_database_retry",
     "db_health_monitor",
     "health_monitor",
+    "resource_sampler",
+    "HealthHistory",
+    "TimeSeriesStore",
+    "timeseries_store",
+    "Deadline",
+    "current_deadline",
+    "get_deadline",
+    "DeadlineExceeded",
+    "check_deadline",
+    "run_in_executor",
+    "RetryPolicy",
+    "SharedState",
+    "InProcessState",
+    "SQLiteState",
+    "shared_state",
+    "FrontendIngestor",
+    "FrontendErrorAggregator",
+    "SessionRateLimiter",
+    "PayloadTooLarge",
+    "frontend_ingestor",
     "RequestLoggingMiddleware",
     "TimeoutMiddleware",
     "SecurityHeadersMiddleware",
     "RateLimitMiddleware",
-    "MemoryMonitoringMiddleware"
+    "MemoryMonitoringMiddleware",
+    "CompressionMiddleware",
+    "MetricsMiddleware",
+    "ColdStartMiddleware",
+    "compression_stats",
+    "metrics_registry",
+    "worker_metrics",
+    "operation_stats",
+    "METRICS_CONTENT_TYPE",
+    "InventoryStore",
+    "InProcessInventoryStore",
+    "SQLiteInventoryStore",
+    "CollectionState",
+    "RecordWrite",
+    "RecordNotFound",
+    "VersionConflict",
+    "inventory_store",
+    "InventoryImporter",
+    "ImportFormatError",
+    "iter_csv_rows",
+    "iter_xlsx_rows",
+    "import_jobs",
+    "qr_code_queue",
+    "qr_code_payload",
+    "AssetSnapshot",
+    "asset_snapshot",
+    "EXPORT_WRITERS",
+    "EXPORT_MEDIA_TYPES",
+    "ExportFormatError",
+    "ensure_export_format",
+    "export_columns",
+    "conditional_response",
+    "make_etag",
+    "http_date",
+    "RequisitionWorkflow",
+    "InvalidTransition",
+    "InsufficientStock",
+    "requisition_workflow"
 ]
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Build-time snapshot of static assets, loaded at import
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "asset_snapshot.json")
+
+def qr_code_key(data: Dict[str, Any]) -> str:
+    """Stable key for a QR code payload"""
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+class AssetSnapshot:
+    """
+    Precomputed assets that would otherwise be rendered on every cold start.
+
+    ``build_snapshot.py`` renders the QR codes of the seed inventory into a
+    JSON file at build time; importing this module loads it, so a fresh
+    instance starts with those QR codes instead of rendering them. Entries
+    are keyed by their payload: after the seed data changes, a stale
+    snapshot misses and the QR code is rendered as before.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.qr_codes: Dict[str, str] = {}
+        self.built_at: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> int:
+        """Read the snapshot file if there is one; returns the number of QR codes"""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        self.qr_codes = snapshot.get("qr_codes", {})
+        self.built_at = snapshot.get("built_at")
+        return len(self.qr_codes)
+
+    def qr_code(self, data: Dict[str, Any]) -> Optional[str]:
+        """Snapshotted QR code for ``data``, or None if it has to be rendered"""
+        qr_code = self.qr_codes.get(qr_code_key(data))
+        if qr_code is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return qr_code
+
+    def add_qr_code(self, data: Dict[str, Any], qr_code: str):
+        self.qr_codes[qr_code_key(data)] = qr_code
+
+    def save(self):
+        self.built_at = datetime.utcnow().isoformat()
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"built_at": self.built_at, "qr_codes": self.qr_codes}, f, indent=1, sort_keys=True)
+            f.write("\n")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "built_at": self.built_at,
+            "qr_codes": len(self.qr_codes),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+# Global snapshot; ASSET_SNAPSHOT_PATH overrides the file next to server.py
+asset_snapshot = AssetSnapshot(os.environ.get("ASSET_SNAPSHOT_PATH") or DEFAULT_SNAPSHOT_PATH)
+asset_snapshot.load()
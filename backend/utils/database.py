@@ -4,14 +4,19 @@ Database connection handling with retry logic and connection pooling for Vercel
 
 import asyncio
 import time
-from typing import Optional, Dict, Any, Callable
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable
 from contextlib import asynccontextmanager
 from functools import wraps
 import os
-from supabase import create_client, Client
 
-from .logger import logger, monitor_performance
-from .error_handler import database_circuit_breaker
+if TYPE_CHECKING:  # supabase is imported on first connect; it dominates import time
+    from supabase import Client
+
+from .logger import logger, PerformanceMonitor
+from .error_handler import database_circuit_breaker, CircuitOpenError
+from .timeseries_store import timeseries_store
+from .retry import RetryPolicy
+from .deadline import DeadlineExceeded, run_in_executor
 
 class DatabaseManager:
     """
@@ -20,11 +25,15 @@ class DatabaseManager:
     """
     
     def __init__(self):
-        self.supabase: Optional[Client] = None
+        self.supabase: Optional["Client"] = None
+        self._initializing: Optional[asyncio.Task] = None
         self.connection_pool = {}
         self.health_status = {"healthy": False, "last_check": None, "error": None}
         self.max_retries = 3
         self.retry_delay = 1  # seconds
+        self.retry_policy = RetryPolicy(max_attempts=self.max_retries, base_delay=0.1, max_delay=2.0)
+        # Connecting backs off longer; within a request it still stops at the deadline
+        self.connect_policy = RetryPolicy(max_attempts=self.max_retries, base_delay=self.retry_delay, max_delay=4.0)
         self.connection_timeout = 10  # seconds
         
     async def initialize(self) -> bool:
@@ -36,34 +45,57 @@ class DatabaseManager:
             logger.error("Missing Supabase configuration")
             return False
         
-        for attempt in range(self.max_retries):
-            try:
-                with monitor_performance(f"database_connection_attempt_{attempt + 1}"):
-                    self.supabase = create_client(supabase_url, supabase_key)
-                    
-                    # Test connection
-                    await self.health_check()
-                    
-                    if self.health_status["healthy"]:
-                        logger.info(
-                            f"Database connection established on attempt {attempt + 1}",
-                            database={"attempt": attempt + 1, "url": supabase_url[:50] + "..."}
-                        )
-                        database_circuit_breaker.record_success()
-                        return True
-                        
-            except Exception as e:
-                logger.warning(
-                    f"Database connection attempt {attempt + 1} failed: {str(e)}",
-                    database={"attempt": attempt + 1, "error": str(e)}
-                )
+        from supabase import create_client
+        attempts = 0
+        
+        async def connect():
+            nonlocal attempts
+            attempts += 1
+            with PerformanceMonitor("database_connection"):
+                # Client construction is blocking I/O; skipped if the request has already timed out
+                self.supabase = await run_in_executor(create_client, supabase_url, supabase_key, stage="database_connection")
                 
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
+                # Test connection
+                if not await self.health_check():
+                    raise ConnectionError(self.health_status["error"] or "Database health check failed")
+        
+        async def log_retry(attempt: int, error: BaseException):
+            logger.warning(
+                f"Database connection attempt {attempt} failed: {str(error)}",
+                database={"attempt": attempt, "error": str(error)}
+            )
         
-        logger.error("Failed to establish database connection after all attempts")
-        database_circuit_breaker.record_failure()
-        return False
+        try:
+            await self.connect_policy.run(connect, name="database_connection", on_retry=log_retry)
+        except DeadlineExceeded:
+            # The request gave up; that says nothing about the database
+            raise
+        except Exception as e:
+            logger.error(
+                f"Failed to establish database connection after {attempts} attempts: {str(e)}",
+                database={"attempts": attempts, "error": str(e)}
+            )
+            database_circuit_breaker.record_failure()
+            return False
+        
+        logger.info(
+            f"Database connection established on attempt {attempts}",
+            database={"attempt": attempts, "url": supabase_url[:50] + "..."}
+        )
+        database_circuit_breaker.record_success()
+        return True
+    
+    def initialize_in_background(self):
+        """Start connecting without holding up startup; the first operation waits for it"""
+        if self._initializing is None or self._initializing.done():
+            self._initializing = asyncio.create_task(self.initialize())
+    
+    async def ensure_initialized(self) -> bool:
+        """Wait for a pending background initialisation; True if a client is available"""
+        if self.supabase is None and self._initializing is not None and not self._initializing.done():
+            # Shield so a cancelled request does not abort the shared connect
+            await asyncio.shield(self._initializing)
+        return self.supabase is not None
     
     async def health_check(self) -> bool:
         """Check database health"""
@@ -75,7 +107,8 @@ class DatabaseManager:
             start_time = time.time()
             
             # Use Supabase's built-in health check or a simple query
-            result = self.supabase.table('_health_check').select('*').limit(1).execute()
+            query = self.supabase.table('_health_check').select('*').limit(1)
+            result = await asyncio.get_running_loop().run_in_executor(None, query.execute)
             
             response_time = (time.time() - start_time) * 1000  # ms
             
@@ -107,54 +140,52 @@ class DatabaseManager:
             
             return False
     
+    async def _reconnect_on_retry(self, attempt: int, error: BaseException):
+        logger.warning(
+            f"Database operation attempt {attempt} failed: {str(error)}",
+            database={"attempt": attempt, "error": str(error)}
+        )
+        # Try to reconnect if connection is lost
+        if "connection" in str(error).lower() or "timeout" in str(error).lower():
+            await self.initialize()
+    
     async def execute_with_retry(self, operation: Callable, *args, **kwargs):
-        """Execute database operation with retry logic"""
-        if not database_circuit_breaker.can_execute():
-            raise Exception("Database circuit breaker is OPEN")
+        """Execute database operation with jittered retries bounded by the request deadline"""
+        permit = database_circuit_breaker.can_execute()
+        if not permit:
+            raise CircuitOpenError("Database circuit breaker is OPEN")
         
-        last_exception = None
+        operation_name = operation.__name__ if hasattr(operation, '__name__') else 'unknown'
         
-        for attempt in range(self.max_retries):
-            try:
-                with monitor_performance(f"database_operation_attempt_{attempt + 1}"):
-                    # Ensure connection is healthy
-                    if not await self.health_check():
-                        raise Exception("Database health check failed")
-                    
-                    # Execute operation
-                    result = await operation(*args, **kwargs)
-                    
-                    # Record success
-                    database_circuit_breaker.record_success()
-                    
-                    return result
-                    
-            except Exception as e:
-                last_exception = e
-                logger.warning(
-                    f"Database operation attempt {attempt + 1} failed: {str(e)}",
-                    database={
-                        "operation": operation.__name__ if hasattr(operation, '__name__') else 'unknown',
-                        "attempt": attempt + 1,
-                        "error": str(e)
-                    }
-                )
-                
-                # Try to reconnect if connection is lost
-                if "connection" in str(e).lower() or "timeout" in str(e).lower():
-                    await self.initialize()
-                
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (2 ** attempt))
+        async def attempt():
+            with PerformanceMonitor("database_operation"):
+                # Ensure connection is healthy
+                if not await self.health_check():
+                    raise ConnectionError("Database health check failed")
+                return await operation(*args, **kwargs)
         
-        # All attempts failed
-        database_circuit_breaker.record_failure()
-        logger.error(
-            f"Database operation failed after {self.max_retries} attempts",
-            database={"final_error": str(last_exception)}
-        )
+        try:
+            await self.ensure_initialized()
+            result = await self.retry_policy.run(attempt, name=operation_name, on_retry=self._reconnect_on_retry)
+        except (DeadlineExceeded, asyncio.CancelledError):
+            # Skipped rather than failed; says nothing about database health,
+            # but a HALF_OPEN probe slot must not stay claimed
+            database_circuit_breaker.release(permit)
+            raise
+        except Exception as e:
+            if self.retry_policy.is_retryable(e):
+                database_circuit_breaker.record_failure(permit)
+            else:
+                # The database answered; the query itself was rejected
+                database_circuit_breaker.record_success(permit)
+            logger.error(
+                f"Database operation {operation_name} failed: {str(e)}",
+                database={"operation": operation_name, "final_error": str(e)}
+            )
+            raise
         
-        raise last_exception
+        database_circuit_breaker.record_success(permit)
+        return result
     
     @asynccontextmanager
     async def transaction(self):
@@ -182,6 +213,7 @@ class DatabaseManager:
         """Get connection statistics"""
         return {
             "initialized": self.supabase is not None,
+            "initializing": self._initializing is not None and not self._initializing.done(),
             "health_status": self.health_status,
             "circuit_breaker_state": database_circuit_breaker.state,
             "circuit_breaker_failures": database_circuit_breaker.failure_count,
@@ -240,8 +272,10 @@ class DatabaseHealthMonitor:
                             (current_avg * (self.stats["successful_checks"] - 1) + new_time) 
                             / self.stats["successful_checks"]
                         )
+                        timeseries_store.record("database.health_check.response_ms", new_time)
                 else:
                     self.stats["failed_checks"] += 1
+                    timeseries_store.record("database.health_check.failed")
                     self.stats["last_error"] = db_manager.health_status.get("error")
                 
                 await asyncio.sleep(self.check_interval)
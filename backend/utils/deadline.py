@@ -0,0 +1,97 @@
+"""
+Per-request deadline propagated through contextvars
+"""
+
+import asyncio
+import functools
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from .metrics import metrics_registry
+
+deadline_work_skipped_total = metrics_registry.counter(
+    "uspf_deadline_work_skipped_total",
+    "Units of work skipped because their request had timed out or been answered",
+    ("stage",)
+)
+deadline_cancelled_total = metrics_registry.counter(
+    "uspf_deadline_cancelled_total",
+    "Requests answered with a timeout while their handler was still running"
+)
+
+class DeadlineExceeded(Exception):
+    """Raised by ``Deadline.check`` once the request no longer needs an answer"""
+    retryable = False
+
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline exceeded before {stage}")
+        self.stage = stage
+
+class Deadline:
+    """
+    Point on the monotonic clock by which a request must be answered.
+
+    ``cancel()`` marks the request as already answered (e.g. with a 408), so
+    work still running on its behalf can stop at the next ``check``.
+    """
+
+    def __init__(self, timeout_seconds: float, clock=time.monotonic):
+        self.clock = clock
+        self.timeout_seconds = timeout_seconds
+        self.expires_at = clock() + timeout_seconds
+        self.cancelled = False
+
+    def remaining(self) -> float:
+        """Seconds left, never negative"""
+        if self.cancelled:
+            return 0.0
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.cancelled or self.clock() >= self.expires_at
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            deadline_cancelled_total.inc()
+
+    def check(self, stage: str):
+        """Raise ``DeadlineExceeded`` (and count the skipped ``stage``) if expired"""
+        if self.expired:
+            deadline_work_skipped_total.inc(stage=stage)
+            raise DeadlineExceeded(stage)
+
+# Set by TimeoutMiddleware for the duration of each request
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+def get_deadline() -> Optional[Deadline]:
+    """Deadline of the request being handled, or None outside a request"""
+    return current_deadline.get()
+
+def check_deadline(stage: str):
+    """``Deadline.check`` for the current request; a no-op outside one"""
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+async def run_in_executor(func: Callable[..., Any], *args, stage: str = "executor") -> Any:
+    """
+    Run ``func(*args)`` in the default thread pool on behalf of the current request.
+
+    The deadline is checked before submitting and again when a pool thread
+    picks the call up, so work that queued behind a busy pool is dropped
+    instead of run for a client that has already been answered.
+    """
+    deadline = current_deadline.get()
+    if deadline is None:
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+
+    deadline.check(stage)
+
+    def guarded():
+        deadline.check(stage)
+        return func(*args)
+
+    return await asyncio.get_running_loop().run_in_executor(None, guarded)
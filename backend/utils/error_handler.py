@@ -6,12 +6,15 @@ from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from typing import Dict, Any
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple, Union
 import traceback
 import asyncio
+import time
 from datetime import datetime
 
 from .logger import logger, error_tracker
+from .metrics import metrics_registry
+from .deadline import DeadlineExceeded
 
 class ErrorHandler:
     """Centralized error handling for the application"""
@@ -93,23 +96,42 @@ class ErrorHandler:
             }
         )
     
+    @staticmethod
+    async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+        """Handle work abandoned because the request deadline passed"""
+        logger.info(
+            f"Abandoned {request.method} {request.url.path} at {exc.stage}: deadline exceeded",
+            error_details={"type": "deadline_exceeded", "stage": exc.stage, "method": request.method}
+        )
+        
+        # Usually the client already has a 408 from TimeoutMiddleware
+        return JSONResponse(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            content={
+                "success": False,
+                "error": "Request Timeout",
+                "message": str(exc),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+    
     @staticmethod
     async def general_exception_handler(request: Request, exc: Exception):
         """Handle all other exceptions"""
         error_id = f"error_{int(datetime.utcnow().timestamp())}"
         
-        error_details = error_tracker.track_error(exc, {
-            "error_id": error_id,
-            "url": str(request.url),
-            "method": request.method,
-            "headers": dict(request.headers),
-            "client": request.client.host if request.client else None
-        })
-        
-        logger.critical(
-            f"Unhandled exception in {request.method} {request.url.path}: {str(exc)}",
-            error_details=error_details,
-            exc_info=True
+        # Logged by the tracker, at most once a minute per distinct error
+        error_tracker.track_error(
+            exc,
+            {
+                "error_id": error_id,
+                "url": str(request.url),
+                "method": request.method,
+                "headers": dict(request.headers),
+                "client": request.client.host if request.client else None
+            },
+            level="critical",
+            message=f"Unhandled exception in {request.method} {request.url.path}: {str(exc)}"
         )
         
         # Return user-friendly error without exposing internal details
@@ -124,83 +146,322 @@ class ErrorHandler:
             }
         )
 
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit breaker is open"""
+
+class CircuitProbe:
+    """Permit for one HALF_OPEN trial call, returned by ``CircuitBreaker.can_execute``"""
+    __slots__ = ("generation", "settled")
+    
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.settled = False
+
 class CircuitBreaker:
-    """Circuit breaker pattern to prevent cascading failures"""
-    
-    def __init__(self, failure_threshold: int = 5, timeout_duration: int = 60):
-        self.failure_threshold = failure_threshold
-        self.timeout_duration = timeout_duration
-        self.failure_count = 0
-        self.last_failure_time = None
-        self.state = "CLOSED"  # CLOSED, OPEN, HALF_OPEN
-        
-    def can_execute(self) -> bool:
-        """Check if operation can be executed"""
-        if self.state == "CLOSED":
-            return True
-        elif self.state == "OPEN":
-            if self.last_failure_time and \
-               (datetime.utcnow() - self.last_failure_time).seconds >= self.timeout_duration:
-                self.state = "HALF_OPEN"
-                return True
-            return False
-        elif self.state == "HALF_OPEN":
+    """
+    Circuit breaker pattern to prevent cascading failures.
+    
+    Outcomes are counted in a rolling window of ``window_seconds`` split into
+    ``window_buckets`` buckets. The breaker opens when at least
+    ``minimum_calls`` outcomes are in the window and the failure rate reaches
+    ``failure_rate_threshold``. After ``open_seconds`` it goes HALF_OPEN and
+    admits at most ``half_open_max_calls`` concurrent probes; that many
+    successes close it, any failure re-opens it. Probes that never report
+    back release their slot after ``open_seconds``.
+    
+    ``can_execute`` returns a permit that callers hand back to
+    ``record_success``, ``record_failure`` or ``release``. Only successes
+    reported with a probe permit from the current HALF_OPEN period count
+    towards closing; a call admitted while CLOSED that finishes late does
+    not show that the dependency has recovered.
+    
+    All timing uses the monotonic clock. Every method is synchronous, so on
+    the event loop each state change is atomic without a lock; call it from
+    the loop rather than from worker threads.
+    """
+    
+    CLOSED, OPEN, HALF_OPEN = "CLOSED", "OPEN", "HALF_OPEN"
+    
+    def __init__(
+        self,
+        name: str = "default",
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 5,
+        window_seconds: float = 60.0,
+        window_buckets: int = 10,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock=time.monotonic
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_buckets = window_buckets
+        self.bucket_seconds = window_seconds / window_buckets
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.half_open_since = 0.0
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self._probe_generation = 0
+        # Per bucket: [bucket index, successes, failures]
+        self._buckets = [[-1, 0, 0] for _ in range(window_buckets)]
+        self.stats = {"rejected": 0, "opened": 0, "closed": 0}
+    
+    def _bucket(self, now: float) -> list:
+        index = int(now / self.bucket_seconds)
+        bucket = self._buckets[index % self.window_buckets]
+        if bucket[0] != index:
+            bucket[0], bucket[1], bucket[2] = index, 0, 0
+        return bucket
+    
+    def window_counts(self) -> Tuple[int, int]:
+        """``(successes, failures)`` within the rolling window"""
+        oldest = int(self.clock() / self.bucket_seconds) - self.window_buckets + 1
+        successes = failures = 0
+        for index, bucket_successes, bucket_failures in self._buckets:
+            if index >= oldest:
+                successes += bucket_successes
+                failures += bucket_failures
+        return successes, failures
+    
+    @property
+    def failure_count(self) -> int:
+        return self.window_counts()[1]
+    
+    def _transition(self, state: str, now: float):
+        previous, self.state = self.state, state
+        if state == self.OPEN:
+            self.opened_at = now
+            self.stats["opened"] += 1
+        elif state == self.HALF_OPEN:
+            self.half_open_since = now
+            self.probes_in_flight = 0
+            self.probe_successes = 0
+            self._probe_generation += 1
+        elif state == self.CLOSED:
+            self.stats["closed"] += 1
+            for bucket in self._buckets:
+                bucket[0], bucket[1], bucket[2] = -1, 0, 0
+        
+        circuit_breaker_transitions_total.inc(name=self.name, state=state)
+        successes, failures = self.window_counts()
+        log = logger.warning if state == self.OPEN else logger.info
+        log(
+            f"Circuit breaker '{self.name}' {previous} -> {state}",
+            circuit_breaker={"name": self.name, "state": state, "window_successes": successes, "window_failures": failures}
+        )
+    
+    def can_execute(self) -> Union[bool, CircuitProbe]:
+        """
+        Check if operation can be executed, claiming a probe slot when HALF_OPEN.
+        
+        Returns False when rejected, otherwise a truthy permit: True when
+        CLOSED, or a ``CircuitProbe`` holding a HALF_OPEN slot.
+        """
+        now = self.clock()
+        if self.state == self.OPEN and now - self.opened_at >= self.open_seconds:
+            self._transition(self.HALF_OPEN, now)
+        
+        if self.state == self.HALF_OPEN:
+            if now - self.half_open_since >= self.open_seconds:
+                # Probes that never reported back must not wedge the breaker
+                self.half_open_since = now
+                self.probes_in_flight = 0
+                self._probe_generation += 1
+            if self.probes_in_flight < self.half_open_max_calls:
+                self.probes_in_flight += 1
+                return CircuitProbe(self._probe_generation)
+        elif self.state == self.CLOSED:
             return True
+        
+        self.stats["rejected"] += 1
+        circuit_breaker_rejected_total.inc(name=self.name)
         return False
     
-    def record_success(self):
+    def _settle_probe(self, permit: Optional[Union[bool, CircuitProbe]]) -> bool:
+        """Free the slot of a current, unsettled probe; False for any other permit"""
+        if not isinstance(permit, CircuitProbe) or permit.settled:
+            return False
+        permit.settled = True
+        if self.state != self.HALF_OPEN or permit.generation != self._probe_generation:
+            return False
+        self.probes_in_flight = max(0, self.probes_in_flight - 1)
+        return True
+    
+    def release(self, permit: Optional[Union[bool, CircuitProbe]]):
+        """Give back a permit whose call ended without telling us anything about the dependency"""
+        self._settle_probe(permit)
+    
+    def record_success(self, permit: Optional[Union[bool, CircuitProbe]] = None):
         """Record successful operation"""
-        self.failure_count = 0
-        self.state = "CLOSED"
-        logger.info("Circuit breaker reset to CLOSED state")
+        now = self.clock()
+        if self.state == self.HALF_OPEN:
+            if self._settle_probe(permit):
+                self.probe_successes += 1
+                if self.probe_successes >= self.half_open_max_calls:
+                    self._transition(self.CLOSED, now)
+            return
+        self._bucket(now)[1] += 1
     
-    def record_failure(self):
+    def record_failure(self, permit: Optional[Union[bool, CircuitProbe]] = None):
         """Record failed operation"""
-        self.failure_count += 1
-        self.last_failure_time = datetime.utcnow()
-        
-        if self.failure_count >= self.failure_threshold:
-            self.state = "OPEN"
-            logger.warning(
-                f"Circuit breaker opened after {self.failure_count} failures",
-                circuit_breaker={
-                    "state": self.state,
-                    "failure_count": self.failure_count,
-                    "threshold": self.failure_threshold
-                }
-            )
+        now = self.clock()
+        if self.state == self.HALF_OPEN:
+            # Any failure is reason enough to back off again
+            self._settle_probe(permit)
+            self._transition(self.OPEN, now)
+            return
+        self._bucket(now)[2] += 1
+        
+        if self.state == self.CLOSED:
+            successes, failures = self.window_counts()
+            total = successes + failures
+            if total >= self.minimum_calls and failures / total >= self.failure_rate_threshold:
+                self._transition(self.OPEN, now)
+    
+    async def call(self, func: Callable, *args, **kwargs):
+        """Run ``func`` through the breaker, raising CircuitOpenError when rejected"""
+        permit = self.can_execute()
+        if not permit:
+            raise CircuitOpenError(f"Circuit breaker '{self.name}' is {self.state}")
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            self.record_failure(permit)
+            raise
+        except BaseException:
+            # Cancelled: no verdict on the dependency
+            self.release(permit)
+            raise
+        self.record_success(permit)
+        return result
+    
+    def get_stats(self) -> Dict[str, Any]:
+        successes, failures = self.window_counts()
+        total = successes + failures
+        return {
+            "name": self.name,
+            "state": self.state,
+            "window_successes": successes,
+            "window_failures": failures,
+            "failure_rate": round(failures / total, 3) if total else 0.0,
+            "probes_in_flight": self.probes_in_flight,
+            **self.stats
+        }
+
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_circuit_breaker(name: str, **config) -> CircuitBreaker:
+    """Return the breaker for dependency ``name``, creating it with ``config`` on first use"""
+    breaker = circuit_breakers.get(name)
+    if breaker is None:
+        breaker = circuit_breakers[name] = CircuitBreaker(name=name, **config)
+    return breaker
+
+_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+circuit_breaker_transitions_total = metrics_registry.counter(
+    "uspf_circuit_breaker_transitions_total",
+    "Circuit breaker state changes, by breaker and new state",
+    ("name", "state")
+)
+circuit_breaker_rejected_total = metrics_registry.counter(
+    "uspf_circuit_breaker_rejected_total",
+    "Calls rejected by an open or saturated half-open circuit breaker",
+    ("name",)
+)
+metrics_registry.gauge(
+    "uspf_circuit_breaker_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ("name",),
+    callback=lambda: [({"name": name}, _STATE_VALUES[breaker.state]) for name, breaker in circuit_breakers.items()]
+)
 
 class GracefulShutdown:
-    """Handle graceful shutdown for Vercel serverless functions"""
+    """
+    Drain in-flight requests before the process exits.
+    
+    Requests are counted rather than tracked individually, and an
+    ``asyncio.Event`` is set whenever the count drops to zero, so shutdown
+    wakes as soon as the last request finishes instead of polling. Draining
+    starts before the wait: ``/health`` answers 503 from that point so load
+    balancers stop routing here while the remaining requests complete.
+    """
     
     def __init__(self):
-        self.active_requests = set()
+        self.active_requests = 0
+        self.draining = False
         self.shutting_down = False
+        self._idle = asyncio.Event()
+        self._idle.set()
     
-    def add_request(self, request_id: str):
-        """Add active request"""
-        if not self.shutting_down:
-            self.active_requests.add(request_id)
+    def request_started(self):
+        """Count a request as in flight"""
+        self.active_requests += 1
+        self._idle.clear()
     
-    def remove_request(self, request_id: str):
-        """Remove completed request"""
-        self.active_requests.discard(request_id)
+    def request_finished(self):
+        """Count a request as done, waking a pending drain if it was the last"""
+        self.active_requests = max(0, self.active_requests - 1)
+        if self.active_requests == 0:
+            self._idle.set()
     
-    async def shutdown(self, timeout: int = 30):
-        """Gracefully shutdown, waiting for active requests"""
-        self.shutting_down = True
-        logger.info(f"Starting graceful shutdown with {len(self.active_requests)} active requests")
+    def start_draining(self):
+        """Report not-ready so new traffic goes elsewhere; requests are still served"""
+        if not self.draining:
+            self.draining = True
+            logger.info(f"Draining: readiness reports unavailable, {self.active_requests} requests in flight")
+    
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait until no request is in flight; False if ``timeout`` elapsed first"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def shutdown(self, timeout: int = 30, flush: Tuple[Callable[[], Awaitable[Any]], ...] = ()):
+        """
+        Drain, wait for active requests, then run ``flush`` callbacks in order.
         
-        # Wait for active requests to complete
-        start_time = asyncio.get_event_loop().time()
-        while self.active_requests and (asyncio.get_event_loop().time() - start_time) < timeout:
-            await asyncio.sleep(0.1)
+        Each flush callback (typically a background queue's ``stop``) runs
+        even if an earlier one failed, so buffered logs and metrics are
+        written out whatever happened before.
+        """
+        self.start_draining()
+        self.shutting_down = True
+        logger.info(f"Starting graceful shutdown with {self.active_requests} active requests")
         
-        if self.active_requests:
-            logger.warning(f"Shutdown timeout reached with {len(self.active_requests)} requests still active")
+        started = time.monotonic()
+        if await self.wait_idle(timeout):
+            logger.info("All requests completed, shutdown successful", shutdown={
+                "drain_ms": round((time.monotonic() - started) * 1000, 2)
+            })
         else:
-            logger.info("All requests completed, shutdown successful")
+            logger.warning(f"Shutdown timeout reached with {self.active_requests} requests still active")
+        
+        for callback in flush:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Shutdown flush {getattr(callback, '__qualname__', callback)} failed: {str(e)}")
 
 # Global instances
 graceful_shutdown = GracefulShutdown()
-database_circuit_breaker = CircuitBreaker(failure_threshold=3, timeout_duration=30)
\ No newline at end of file
+metrics_registry.gauge(
+    "uspf_active_requests",
+    "Requests in flight as counted for graceful shutdown",
+    callback=lambda: [({}, graceful_shutdown.active_requests)]
+)
+metrics_registry.gauge(
+    "uspf_draining",
+    "1 while the process is draining before shutdown",
+    callback=lambda: [({}, int(graceful_shutdown.draining))]
+)
+database_circuit_breaker = get_circuit_breaker("database", minimum_calls=3, open_seconds=30)
+qr_code_circuit_breaker = get_circuit_breaker("qr_code", minimum_calls=10, open_seconds=60)
\ No newline at end of file
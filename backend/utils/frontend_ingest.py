@@ -0,0 +1,431 @@
+"""
+Bounded, batched ingestion of frontend log entries and error reports
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+
+from .logger import logger
+from .metrics import metrics_registry
+
+frontend_entries_total = metrics_registry.counter(
+    "uspf_frontend_entries_total",
+    "Frontend log entries and error reports received, by kind and outcome",
+    ("kind", "outcome")
+)
+
+LOG_LEVELS = {"ERROR": "error", "WARN": "warning", "WARNING": "warning", "INFO": "info", "DEBUG": "debug"}
+
+class PayloadTooLarge(Exception):
+    """Raised when a request body exceeds the ingestion payload cap"""
+
+class SessionRateLimiter:
+    """Token bucket per session, keeping at most ``max_sessions`` buckets"""
+
+    def __init__(self, rate_per_minute: float = 120, burst: int = 60, max_sessions: int = 10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_sessions = max_sessions
+        self.buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def take(self, session: str, requested: int, now: float = None) -> int:
+        """Consume up to ``requested`` tokens and return how many were granted"""
+        now = time.monotonic() if now is None else now
+        bucket = self.buckets.get(session)
+        if bucket is None:
+            bucket = self.buckets[session] = [float(self.burst), now]
+            while len(self.buckets) > self.max_sessions:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(session)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        granted = min(requested, int(bucket[0]))
+        bucket[0] -= granted
+        return granted
+
+class FrontendErrorGroup:
+    """Occurrences of one frontend error fingerprint"""
+    __slots__ = ("fingerprint", "name", "message", "stack", "count", "sampled_out", "first_seen",
+                 "last_seen", "window_start", "window_count", "sample")
+
+    def __init__(self, fingerprint: str, name: str, message: str, stack: List[str], now: float):
+        self.fingerprint = fingerprint
+        self.name = name
+        self.message = message
+        self.stack = stack
+        self.count = 0
+        self.sampled_out = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.window_start = now
+        self.window_count = 0
+        self.sample: Dict[str, Any] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "name": self.name,
+            "message": self.message,
+            "stack": self.stack,
+            "count": self.count,
+            "sampled_out": self.sampled_out,
+            "first_seen": datetime.utcfromtimestamp(self.first_seen).isoformat(),
+            "last_seen": datetime.utcfromtimestamp(self.last_seen).isoformat(),
+            "sample": self.sample
+        }
+
+class FrontendErrorAggregator:
+    """
+    Deduplicate frontend error reports by name, message and normalised stack.
+
+    Messages and stacks are normalised (numbers, ids, bundle hashes, query
+    strings and line/column positions removed) so the same bug fingerprints
+    identically across builds and users. Only the first report of a
+    fingerprint in each ``window_seconds`` is forwarded for logging, carrying
+    the number of repeats seen in the previous window; the rest are counted.
+    Forwarded reports are further sampled per error name using
+    ``sample_rates`` (``"default"`` applies to unlisted names).
+    """
+
+    _NUMBERS = re.compile(r"\b(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|0x[0-9a-f]+|\d+)\b", re.I)
+    _BUNDLE_HASH = re.compile(r"([./-])[0-9a-f]{6,}(?=\.(?:chunk\.)?m?js\b)", re.I)
+    _QUERY = re.compile(r"[?#][^\s):]*")
+    _POSITION = re.compile(r"(?::\d+){1,2}(?=\)?\s*$)")
+    _ORIGIN = re.compile(r"\b[a-z][a-z0-9+.-]*://[^/\s]+", re.I)
+
+    def __init__(
+        self,
+        window_seconds: float = 60.0,
+        stack_frames: int = 5,
+        max_groups: int = 1000,
+        sample_rates: Dict[str, float] = None
+    ):
+        self.window_seconds = window_seconds
+        self.stack_frames = stack_frames
+        self.max_groups = max_groups
+        self.sample_rates = {"default": 1.0, **(sample_rates or {})}
+        self.groups: "OrderedDict[str, FrontendErrorGroup]" = OrderedDict()
+        self.evicted = 0
+        self.stats = {"deduplicated": 0, "sampled_out": 0}
+
+    def normalize_message(self, message: str) -> str:
+        return self._NUMBERS.sub("<n>", message or "").strip()[:500]
+
+    def normalize_stack(self, stack: str) -> List[str]:
+        frames = []
+        for line in (stack or "").splitlines():
+            line = line.strip()
+            # Chrome frames start with "at", Firefox/Safari with "fn@url"
+            if not (line.startswith("at ") or "@" in line):
+                continue
+            line = self._ORIGIN.sub("", line)
+            line = self._QUERY.sub("", line)
+            line = self._BUNDLE_HASH.sub(r"\1<hash>", line)
+            line = self._POSITION.sub("", line)
+            frames.append(line)
+            if len(frames) >= self.stack_frames:
+                break
+        return frames
+
+    def sample_rate(self, name: str) -> float:
+        return self.sample_rates.get(name, self.sample_rates["default"])
+
+    def observe(self, report: Dict[str, Any], now: float = None) -> Optional[Dict[str, Any]]:
+        """
+        Count ``report`` and return it, annotated, if it should be logged.
+
+        Returns None when the report is a duplicate within the current window
+        or was sampled out.
+        """
+        now = time.time() if now is None else now
+        name = report.get("error_name") or "Unknown"
+        message = self.normalize_message(report.get("error_message"))
+        stack = self.normalize_stack(report.get("error_stack"))
+        fingerprint = hashlib.sha1("|".join([name, message, *stack]).encode()).hexdigest()[:16]
+
+        group = self.groups.get(fingerprint)
+        if group is None:
+            group = self.groups[fingerprint] = FrontendErrorGroup(fingerprint, name, message, stack, now)
+            while len(self.groups) > self.max_groups:
+                self.groups.popitem(last=False)
+                self.evicted += 1
+        else:
+            self.groups.move_to_end(fingerprint)
+
+        group.count += 1
+        group.last_seen = now
+        if group.count > 1 and now - group.window_start < self.window_seconds:
+            group.window_count += 1
+            self.stats["deduplicated"] += 1
+            return None
+
+        repeats = max(0, group.window_count - 1) if group.count > 1 else 0
+        group.window_start = now
+        group.window_count = 1
+        if random.random() >= self.sample_rate(name):
+            group.sampled_out += 1
+            self.stats["sampled_out"] += 1
+            return None
+
+        group.sample = {key: value for key, value in report.items() if key != "error_stack"}
+        return {
+            **report,
+            "fingerprint": fingerprint,
+            "occurrences": group.count,
+            "repeats_in_previous_window": repeats
+        }
+
+    def summary(self, limit: int = 20) -> Dict[str, Any]:
+        """Most frequent frontend errors"""
+        top = sorted(self.groups.values(), key=lambda group: group.count, reverse=True)[:limit]
+        return {
+            "window_seconds": self.window_seconds,
+            "sample_rates": self.sample_rates,
+            "distinct_errors": len(self.groups),
+            "evicted_errors": self.evicted,
+            "total_reports": sum(group.count for group in self.groups.values()),
+            "errors": [group.to_dict() for group in top]
+        }
+
+class FrontendIngestor:
+    """
+    Accept frontend logs and errors without doing the logging on the request path.
+
+    Requests are checked against a payload cap and an entry cap, trimmed,
+    rate limited per session and appended to a bounded queue; the handler then
+    answers 202 immediately. A background task drains the queue in batches,
+    writing one log record per level per batch for ordinary entries and one
+    per error report. When the queue is full new entries are dropped and
+    counted rather than buffered, so a flooding client cannot grow memory or
+    slow the API.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 5000,
+        batch_size: int = 200,
+        flush_interval_seconds: float = 1.0,
+        max_payload_bytes: int = 256 * 1024,
+        max_entries_per_request: int = 100,
+        max_message_chars: int = 2000,
+        max_data_bytes: int = 8 * 1024,
+        rate_limiter: SessionRateLimiter = None,
+        error_aggregator: FrontendErrorAggregator = None
+    ):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_payload_bytes = max_payload_bytes
+        self.max_entries_per_request = max_entries_per_request
+        self.max_message_chars = max_message_chars
+        self.max_data_bytes = max_data_bytes
+        self.rate_limiter = rate_limiter or SessionRateLimiter()
+        self.error_aggregator = error_aggregator or FrontendErrorAggregator()
+        self.queue: deque = deque()
+        self.wakeup: Optional[asyncio.Event] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.stats = {
+            "accepted": 0,
+            "dropped_rate_limited": 0,
+            "dropped_queue_full": 0,
+            "dropped_over_cap": 0,
+            "flushed": 0,
+            "batches": 0
+        }
+
+    def _ensure_worker(self):
+        if self.worker is None or self.worker.done():
+            self.wakeup = asyncio.Event()
+            self.worker = asyncio.create_task(self._run())
+
+    async def read_body(self, chunks: AsyncIterator[bytes]) -> bytes:
+        """Collect a streamed request body, raising ``PayloadTooLarge`` as soon as it passes the cap"""
+        body = bytearray()
+        async for chunk in chunks:
+            body += chunk
+            if len(body) > self.max_payload_bytes:
+                raise PayloadTooLarge(f"Payload exceeds {self.max_payload_bytes} bytes")
+        return bytes(body)
+
+    def parse_body(self, body: bytes) -> Any:
+        """Decode a request body, enforcing the payload cap"""
+        if len(body) > self.max_payload_bytes:
+            raise PayloadTooLarge(f"Payload exceeds {self.max_payload_bytes} bytes")
+        return json.loads(body)
+
+    def _trim(self, value: Any, limit: int) -> Any:
+        if isinstance(value, str) and len(value) > limit:
+            return value[:limit] + "...[truncated]"
+        return value
+
+    def _trim_data(self, value: Any) -> Any:
+        try:
+            size = len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return {"truncated": True, "reason": "unserialisable"}
+        if size > self.max_data_bytes:
+            return {"truncated": True, "size_bytes": size}
+        return value
+
+    def _drop(self, kind: str, reason: str, count: int):
+        if count > 0:
+            self.stats[f"dropped_{reason}"] += count
+            frontend_entries_total.inc(count, kind=kind, outcome=f"dropped_{reason}")
+
+    def submit(self, kind: str, session: str, entries: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Queue ``entries`` of ``kind`` (``log`` or ``error``); returns ``(accepted, dropped)``"""
+        received = len(entries)
+        entries = [entry for entry in entries if isinstance(entry, dict)]
+        self._drop(kind, "over_cap", received - len(entries))
+        received_valid = len(entries)
+        if received_valid > self.max_entries_per_request:
+            self._drop(kind, "over_cap", received_valid - self.max_entries_per_request)
+            entries = entries[:self.max_entries_per_request]
+
+        granted = self.rate_limiter.take(session, len(entries))
+        self._drop(kind, "rate_limited", len(entries) - granted)
+        entries = entries[:granted]
+
+        # Trim only what will be kept, so dropped entries cost nothing
+        clean = self.clean_error if kind == "error" else self.clean_log
+        queued = []
+        for entry in entries:
+            entry = clean(entry)
+            if kind == "error":
+                entry = self.error_aggregator.observe(entry)
+                if entry is None:
+                    # Counted by the aggregator; nothing to log
+                    continue
+            queued.append(entry)
+
+        space = max(0, self.max_queue - len(self.queue))
+        self._drop(kind, "queue_full", len(queued) - space)
+        for entry in queued[:space]:
+            self.queue.append((kind, entry))
+
+        accepted = len(entries) - max(0, len(queued) - space)
+        if accepted:
+            self.stats["accepted"] += accepted
+            frontend_entries_total.inc(accepted, kind=kind, outcome="accepted")
+        if queued[:space]:
+            self._ensure_worker()
+            if len(self.queue) >= self.batch_size:
+                self.wakeup.set()
+        return accepted, received - accepted
+
+    def clean_log(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "level": str(entry.get("level", "info")).upper(),
+            "message": self._trim(str(entry.get("message", "")), self.max_message_chars),
+            "session_id": self._trim(entry.get("sessionId"), 200),
+            "user_id": self._trim(entry.get("userId"), 200),
+            "url": self._trim(entry.get("url"), 2000),
+            "pathname": self._trim(entry.get("pathname"), 2000),
+            "user_agent": self._trim(entry.get("userAgent"), 500),
+            "performance": self._trim_data(entry.get("performance")),
+            "data": self._trim_data(entry.get("data", {}))
+        }
+
+    def clean_error(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        error_info = report.get("error") if isinstance(report.get("error"), dict) else {}
+        return {
+            "error_id": self._trim(report.get("errorId"), 200),
+            "error_name": self._trim(error_info.get("name"), 200),
+            "error_message": self._trim(error_info.get("message"), self.max_message_chars),
+            "error_stack": self._trim(error_info.get("stack"), self.max_data_bytes),
+            "url": self._trim(report.get("url"), 2000),
+            "user_agent": self._trim(report.get("userAgent"), 500),
+            "timestamp": report.get("timestamp"),
+            "context": self._trim_data(report.get("context", {}))
+        }
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        by_level: Dict[str, List[Dict[str, Any]]] = {}
+        for kind, entry in batch:
+            if kind == "error":
+                repeats = entry.get("repeats_in_previous_window")
+                logger.error(
+                    f"Frontend Error: {entry.get('error_name') or 'Unknown'} - {entry.get('error_message') or 'No message'}"
+                    + (f" (repeated {repeats} more times in the previous window)" if repeats else ""),
+                    frontend_error={"source": "frontend", **entry}
+                )
+            else:
+                by_level.setdefault(LOG_LEVELS.get(entry["level"], "debug"), []).append(entry)
+
+        for level, entries in by_level.items():
+            getattr(logger, level)(
+                f"Frontend: {len(entries)} {level} entries",
+                frontend_logs={"source": "frontend", "count": len(entries), "entries": entries}
+            )
+
+    def flush(self, limit: int = None) -> int:
+        """Write up to ``limit`` queued entries (default one batch)"""
+        limit = self.batch_size if limit is None else limit
+        batch = [self.queue.popleft() for _ in range(min(limit, len(self.queue)))]
+        if batch:
+            self._write_batch(batch)
+            self.stats["flushed"] += len(batch)
+            self.stats["batches"] += 1
+        return len(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            while self.queue:
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Frontend log flush failed: {str(e)}")
+                # Yield between batches so request handling keeps priority
+                await asyncio.sleep(0)
+
+    async def stop(self):
+        """Stop the worker and write everything still queued"""
+        if self.worker and not self.worker.done():
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+        self.worker = None
+        while self.queue:
+            self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self.queue),
+            "max_queue": self.max_queue,
+            **self.stats,
+            "errors": {"distinct": len(self.error_aggregator.groups), **self.error_aggregator.stats}
+        }
+
+def _sample_rates_from_env() -> Dict[str, float]:
+    # e.g. FRONTEND_ERROR_SAMPLE_RATES='{"ChunkLoadError": 0.1, "default": 1.0}'
+    try:
+        rates = json.loads(os.environ.get("FRONTEND_ERROR_SAMPLE_RATES") or "{}")
+        return {str(name): min(1.0, max(0.0, float(rate))) for name, rate in rates.items()}
+    except (TypeError, ValueError, AttributeError):
+        logger.warning("Ignoring invalid FRONTEND_ERROR_SAMPLE_RATES")
+        return {}
+
+# Global frontend ingestion queue
+frontend_ingestor = FrontendIngestor(
+    error_aggregator=FrontendErrorAggregator(
+        window_seconds=float(os.environ.get("FRONTEND_ERROR_DEDUP_WINDOW_SECONDS", "60")),
+        sample_rates=_sample_rates_from_env()
+    )
+)
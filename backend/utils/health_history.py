@@ -0,0 +1,242 @@
+"""
+Bounded health check history with minute/hour rollups for cheap trend queries
+"""
+
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from .timeseries_store import TimeSeriesStore
+
+STATUS_CODES = {"healthy": 0, "warning": 1, "unhealthy": 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+class RingBuffer:
+    """Fixed-capacity, array-backed ring of (timestamp, status, value) samples"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = array("d", [0.0]) * capacity
+        self.statuses = array("b", [0]) * capacity
+        self.values = array("d", [0.0]) * capacity
+        self.size = 0
+        self.next = 0
+
+    def append(self, timestamp: float, status: int, value: float):
+        self.timestamps[self.next] = timestamp
+        self.statuses[self.next] = status
+        self.values[self.next] = value
+        self.next = (self.next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def latest(self) -> Optional[Tuple[float, int, float]]:
+        if not self.size:
+            return None
+        index = (self.next - 1) % self.capacity
+        return self.timestamps[index], self.statuses[index], self.values[index]
+
+    def __iter__(self) -> Iterator[Tuple[float, int, float]]:
+        """Iterate oldest first"""
+        first = (self.next - self.size) % self.capacity
+        for offset in range(self.size):
+            index = (first + offset) % self.capacity
+            yield self.timestamps[index], self.statuses[index], self.values[index]
+
+    def __len__(self) -> int:
+        return self.size
+
+class RollupBucket:
+    """Aggregates of every report whose timestamp falls in one time bucket"""
+    __slots__ = ("statuses", "checks")
+
+    def __init__(self):
+        self.statuses = [0, 0, 0]  # indexed by STATUS_CODES
+        self.checks: Dict[str, list] = {}  # name -> [count, sum, min, max] response time
+
+    def add(self, status: int, check_times: Dict[str, float]):
+        self.statuses[status] += 1
+        for name, response_ms in check_times.items():
+            stats = self.checks.get(name)
+            if stats is None:
+                self.checks[name] = [1, response_ms, response_ms, response_ms]
+            else:
+                stats[0] += 1
+                stats[1] += response_ms
+                stats[2] = min(stats[2], response_ms)
+                stats[3] = max(stats[3], response_ms)
+
+class Rollup:
+    """Time-bucketed aggregates kept for ``retention_seconds``"""
+
+    def __init__(self, resolution_seconds: int, retention_seconds: int):
+        self.resolution = resolution_seconds
+        self.retention = retention_seconds
+        self.buckets: "OrderedDict[float, RollupBucket]" = OrderedDict()
+
+    def bucket(self, timestamp: float) -> RollupBucket:
+        """Bucket containing ``timestamp``, created (and old buckets evicted) on demand"""
+        start = timestamp - timestamp % self.resolution
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            # Reports normally arrive in order; keep the dict sorted if not
+            out_of_order = bool(self.buckets) and next(reversed(self.buckets)) > start
+            bucket = self.buckets[start] = RollupBucket()
+            if out_of_order:
+                for key in sorted(self.buckets):
+                    self.buckets.move_to_end(key)
+
+            horizon = next(reversed(self.buckets)) - self.retention
+            while next(iter(self.buckets)) < horizon:
+                self.buckets.popitem(last=False)
+        return bucket
+
+    def add(self, timestamp: float, status: int, check_times: Dict[str, float]):
+        self.bucket(timestamp).add(status, check_times)
+
+    def since(self, cutoff: float) -> Iterator[RollupBucket]:
+        """Buckets overlapping ``[cutoff, now]``, newest first"""
+        for start in reversed(self.buckets):
+            if start + self.resolution <= cutoff:
+                break
+            yield self.buckets[start]
+
+class HealthHistory:
+    """
+    Health report history sized for days of data.
+
+    Each report is reduced to numbers on insert: an overall status and a
+    response time per check go into fixed-size ring buffers, and minute and
+    hour rollups are updated in place. Trend queries then walk at most one
+    bucket per minute (up to ``minute_retention_hours``) or per hour, so their
+    cost is independent of how many reports were recorded.
+    """
+
+    def __init__(
+        self,
+        samples_per_check: int = 1440,
+        minute_retention_hours: int = 24,
+        hour_retention_days: int = 30,
+        store: TimeSeriesStore = None
+    ):
+        self.store = store
+        self.samples_per_check = samples_per_check
+        self.overall = RingBuffer(samples_per_check)
+        self.checks: Dict[str, RingBuffer] = {}
+        self.minutes = Rollup(60, minute_retention_hours * 3600)
+        self.hours = Rollup(3600, hour_retention_days * 86400)
+        self._lock = threading.Lock()
+
+    def record(self, report: Dict[str, Any], timestamp: float = None):
+        """Add a report produced by ``SystemHealthMonitor.run_all_checks``"""
+        timestamp = time.time() if timestamp is None else timestamp
+        status = STATUS_CODES.get(report.get("status"), STATUS_CODES["unhealthy"])
+        check_times = {
+            name: float(result.get("response_time_ms") or 0.0)
+            for name, result in report.get("checks", {}).items()
+        }
+
+        with self._lock:
+            self.overall.append(timestamp, status, sum(check_times.values()))
+            for name, result in report.get("checks", {}).items():
+                ring = self.checks.get(name)
+                if ring is None:
+                    ring = self.checks[name] = RingBuffer(self.samples_per_check)
+                check_status = STATUS_CODES.get(result.get("status"), STATUS_CODES["unhealthy"])
+                ring.append(timestamp, check_status, check_times[name])
+            self.minutes.add(timestamp, status, check_times)
+            self.hours.add(timestamp, status, check_times)
+
+        if self.store is not None:
+            self.store.record(f"health.status.{STATUS_NAMES[status]}", 1, timestamp)
+            for name, response_ms in check_times.items():
+                self.store.record(f"health.check.{name}", response_ms, timestamp)
+
+    def load(self, now: float = None) -> int:
+        """
+        Rebuild the rollups from the persistent store after a restart.
+
+        Call before recording new reports; returns the number of rows loaded.
+        """
+        if self.store is None or not self.store.enabled:
+            return 0
+        now = time.time() if now is None else now
+        loaded = 0
+        with self._lock:
+            for rollup in (self.minutes, self.hours):
+                rows = self.store.query("health.", now - rollup.retention, rollup.resolution)
+                for series, bucket_start, count, total, minimum, maximum in rows:
+                    bucket = rollup.bucket(bucket_start)
+                    kind, _, name = series[len("health."):].partition(".")
+                    if kind == "status" and name in STATUS_CODES:
+                        bucket.statuses[STATUS_CODES[name]] += count
+                    elif kind == "check":
+                        stats = bucket.checks.get(name)
+                        if stats is None:
+                            bucket.checks[name] = [count, total, minimum, maximum]
+                        else:
+                            stats[0] += count
+                            stats[1] += total
+                            stats[2] = min(stats[2], minimum)
+                            stats[3] = max(stats[3], maximum)
+                    loaded += 1
+        return loaded
+
+    def trends(self, hours: int = 24, now: float = None) -> Dict[str, Any]:
+        """Aggregate the rollups covering the last ``hours`` hours"""
+        now = time.time() if now is None else now
+        cutoff = now - hours * 3600
+        rollup = self.minutes if hours * 3600 <= self.minutes.retention else self.hours
+
+        statuses = [0, 0, 0]
+        checks: Dict[str, list] = {}
+        with self._lock:
+            latest = self.overall.latest()
+            buckets = 0
+            for bucket in rollup.since(cutoff):
+                buckets += 1
+                for code, count in enumerate(bucket.statuses):
+                    statuses[code] += count
+                for name, (count, total, minimum, maximum) in bucket.checks.items():
+                    stats = checks.get(name)
+                    if stats is None:
+                        checks[name] = [count, total, minimum, maximum]
+                    else:
+                        stats[0] += count
+                        stats[1] += total
+                        stats[2] = min(stats[2], minimum)
+                        stats[3] = max(stats[3], maximum)
+
+        total_reports = sum(statuses)
+        if not total_reports:
+            return {"message": "No recent health data available"}
+
+        return {
+            "period_hours": hours,
+            "resolution_seconds": rollup.resolution,
+            "buckets": buckets,
+            "total_reports": total_reports,
+            "uptime_percentage": round(statuses[STATUS_CODES["healthy"]] / total_reports * 100, 2),
+            "status_distribution": {name: statuses[code] for name, code in STATUS_CODES.items()},
+            "average_response_times": {
+                name: {
+                    "average_ms": round(total / count, 2),
+                    "min_ms": round(minimum, 2),
+                    "max_ms": round(maximum, 2),
+                    "samples": count
+                }
+                for name, (count, total, minimum, maximum) in checks.items()
+            },
+            "latest_status": STATUS_NAMES[latest[1]] if latest else "unknown",
+            "persisted": bool(self.store is not None and self.store.enabled)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self.overall),
+            "capacity": self.samples_per_check,
+            "checks": len(self.checks),
+            "minute_buckets": len(self.minutes.buckets),
+            "hour_buckets": len(self.hours.buckets)
+        }
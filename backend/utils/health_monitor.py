@@ -4,13 +4,19 @@ Comprehensive health monitoring and system status tracking for Vercel deployment
 
 import time
 import asyncio
+import functools
 import psutil
 import os
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
 from dataclasses import dataclass, asdict
 
 from .logger import logger
+from .metrics import metrics_registry
+from .health_history import HealthHistory
+from .timeseries_store import timeseries_store
+from .shared_state import shared_state
 from .database import db_manager
 from .error_handler import error_tracker, database_circuit_breaker
 
@@ -29,8 +35,12 @@ class SystemHealthMonitor:
     
     def __init__(self):
         self.checks_registry = {}
-        self.health_history = []
-        self.max_history_size = 100
+        self.history = HealthHistory(store=timeseries_store)
+        self.cache_ttl_seconds = float(os.environ.get("HEALTH_CACHE_TTL_SECONDS", "10"))
+        self._cached_report: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        self.state = shared_state
         self.alert_thresholds = {
             "memory_usage_percent": 80,
             "response_time_ms": 5000,
@@ -134,9 +144,7 @@ class SystemHealthMonitor:
         }
         
         # Store in history
-        self.health_history.append(health_report)
-        if len(self.health_history) > self.max_history_size:
-            self.health_history.pop(0)
+        self.history.record(health_report)
         
         # Log health status
         if overall_status == "healthy":
@@ -146,93 +154,208 @@ class SystemHealthMonitor:
         
         return health_report
     
-    def get_health_trends(self, hours: int = 24) -> Dict[str, Any]:
-        """Get health trends over specified time period"""
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-        
-        recent_reports = [
-            report for report in self.health_history
-            if datetime.fromisoformat(report["timestamp"].replace("Z", "+00:00")) > cutoff_time
-        ]
-        
-        if not recent_reports:
-            return {"message": "No recent health data available"}
+    async def _refresh_report(self, fresh: bool = False) -> Tuple[Dict[str, Any], float, bool]:
+        """
+        Produce a report and cache it unless a newer one landed meanwhile.
+
+        Returns the report, when it was generated (on the monotonic clock)
+        and whether it came from the shared cache rather than a run here.
+        """
+        # Another worker on the host may have just run the checks
+        loop = asyncio.get_running_loop()
+        shared = None if fresh else await loop.run_in_executor(None, self.state.get, "health:report")
+        if shared is not None:
+            report = shared["report"]
+            generated_at = time.monotonic() - max(0.0, time.time() - shared["generated_at"])
+            from_shared = True
+        else:
+            # Dated from the start, so a run that began later counts as newer
+            generated_at = time.monotonic()
+            report = await self.run_all_checks()
+            from_shared = False
+            await loop.run_in_executor(None, functools.partial(
+                self.state.set, "health:report", {"report": report, "generated_at": time.time()}, ttl=self.cache_ttl_seconds
+            ))
         
-        # Calculate trends
-        total_reports = len(recent_reports)
-        healthy_count = sum(1 for r in recent_reports if r["status"] == "healthy")
-        uptime_percentage = (healthy_count / total_reports) * 100 if total_reports > 0 else 0
+        # Runs can finish out of order once a fresh one overlaps a cached one
+        if self._cached_report is None or generated_at >= self._cached_at:
+            self._cached_report = report
+            self._cached_at = generated_at
+        return report, generated_at, from_shared
+    
+    async def get_report(self, fresh: bool = False) -> Dict[str, Any]:
+        """
+        Return the latest health report, re-running checks only when needed.
         
-        # Average response times by check
-        avg_response_times = {}
-        for report in recent_reports:
-            for check_name, check_result in report["checks"].items():
-                if check_name not in avg_response_times:
-                    avg_response_times[check_name] = []
-                avg_response_times[check_name].append(check_result["response_time_ms"])
+        A report younger than ``cache_ttl_seconds`` is served from cache.
+        Refreshes are single-flight: concurrent callers await the same run
+        instead of each starting their own, and a report another worker
+        stored in the shared state within the TTL is reused. ``fresh`` always
+        starts a new run of every check, since a run already in flight began
+        before the call and may be serving the shared cache; later callers
+        join that run. The returned copy carries a ``cache`` block with the
+        report's age.
+        """
+        age = time.monotonic() - self._cached_at
+        if self._cached_report is not None and not fresh and age < self.cache_ttl_seconds:
+            report, hit = self._cached_report, True
+        else:
+            if fresh or self._refresh is None or self._refresh.done():
+                self._refresh = asyncio.create_task(self._refresh_report(fresh))
+            refresh = self._refresh
+            # Shield so a disconnecting client does not cancel the shared run
+            report, generated_at, hit = await asyncio.shield(refresh)
+            age = time.monotonic() - generated_at
         
-        for check_name in avg_response_times:
-            times = avg_response_times[check_name]
-            avg_response_times[check_name] = {
-                "average_ms": round(sum(times) / len(times), 2),
-                "min_ms": min(times),
-                "max_ms": max(times),
-                "samples": len(times)
+        return {
+            **report,
+            "cache": {
+                "hit": hit,
+                "age_seconds": round(age, 3),
+                "ttl_seconds": self.cache_ttl_seconds
             }
-        
+        }
+    
+    def get_health_trends(self, hours: int = 24) -> Dict[str, Any]:
+        """Get health trends over specified time period"""
+        trends = self.history.trends(hours=hours)
+        if timeseries_store.enabled:
+            since = time.time() - hours * 3600
+            resolution = trends.get("resolution_seconds", self.history.hours.resolution)
+            trends["errors"] = {
+                error_type: int(totals["count"])
+                for error_type, totals in timeseries_store.totals("errors.", since, resolution).items()
+            }
+            database = timeseries_store.totals("database.", since, resolution)
+            checks = database.get("health_check.response_ms")
+            trends["database"] = {
+                "health_checks": int(checks["count"]) if checks else 0,
+                "average_response_ms": round(checks["sum"] / checks["count"], 2) if checks else None,
+                "failed_checks": int(database.get("health_check.failed", {}).get("count", 0))
+            }
+        return trends
+
+@dataclass
+class ResourceSample:
+    """One reading of system resource usage"""
+    timestamp: float
+    cpu_percent: float
+    memory_percent: float
+    memory_available_mb: float
+    disk_percent: float
+    disk_free_gb: float
+
+class ResourceSampler:
+    """
+    Background sampler keeping a rolling window of resource readings.
+    
+    CPU is measured with ``psutil.cpu_percent(interval=None)``, i.e. the
+    utilisation since the previous sample, so no reading ever sleeps. Health
+    checks read the latest sample instantly; when the sampler is not running
+    (or its data is stale, e.g. a frozen serverless instance) a fresh
+    non-blocking sample is taken on demand.
+    """
+    
+    def __init__(self, interval_seconds: float = 5.0, window_size: int = 60):
+        self.interval_seconds = interval_seconds
+        self.samples: deque = deque(maxlen=window_size)
+        self.task: Optional[asyncio.Task] = None
+        # Prime the CPU counter so the first real sample covers a real interval
+        psutil.cpu_percent(interval=None)
+    
+    def sample(self) -> ResourceSample:
+        """Take one reading and append it to the window"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        reading = ResourceSample(
+            timestamp=time.time(),
+            cpu_percent=psutil.cpu_percent(interval=None),
+            memory_percent=memory.percent,
+            memory_available_mb=round(memory.available / 1024 / 1024, 2),
+            disk_percent=round((disk.used / disk.total) * 100, 2),
+            disk_free_gb=round(disk.free / 1024 / 1024 / 1024, 2)
+        )
+        self.samples.append(reading)
+        return reading
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                # disk_usage may touch slow filesystems, keep it off the loop
+                await loop.run_in_executor(None, self.sample)
+            except Exception as e:
+                logger.warning(f"Resource sampling failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+    
+    def start(self):
+        """Start the sampling task on the running event loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self.task and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+    
+    def latest(self) -> ResourceSample:
+        """Most recent reading, sampling on demand if none is fresh"""
+        if self.samples and time.time() - self.samples[-1].timestamp <= self.interval_seconds * 3:
+            return self.samples[-1]
+        return self.sample()
+    
+    def averages(self) -> Dict[str, Any]:
+        """Rolling averages over the current window"""
+        samples = list(self.samples)
+        if not samples:
+            return {"samples": 0}
+        count = len(samples)
         return {
-            "period_hours": hours,
-            "total_reports": total_reports,
-            "uptime_percentage": round(uptime_percentage, 2),
-            "status_distribution": {
-                "healthy": sum(1 for r in recent_reports if r["status"] == "healthy"),
-                "warning": sum(1 for r in recent_reports if r["status"] == "warning"),
-                "unhealthy": sum(1 for r in recent_reports if r["status"] == "unhealthy")
-            },
-            "average_response_times": avg_response_times,
-            "latest_status": recent_reports[-1]["status"] if recent_reports else "unknown"
+            "samples": count,
+            "window_seconds": round(samples[-1].timestamp - samples[0].timestamp, 1),
+            "cpu_percent": round(sum(s.cpu_percent for s in samples) / count, 2),
+            "cpu_percent_max": round(max(s.cpu_percent for s in samples), 2),
+            "memory_percent": round(sum(s.memory_percent for s in samples) / count, 2),
+            "disk_percent": round(sum(s.disk_percent for s in samples) / count, 2)
         }
 
 # Health check functions
 async def check_system_resources():
-    """Check system resource usage"""
+    """Check system resource usage from the background sampler"""
     try:
-        # Memory usage
-        memory = psutil.virtual_memory()
-        memory_percent = memory.percent
-        
-        # CPU usage
-        cpu_percent = psutil.cpu_percent(interval=1)
-        
-        # Disk usage
-        disk = psutil.disk_usage('/')
-        disk_percent = (disk.used / disk.total) * 100
+        reading = resource_sampler.latest()
         
         status = "healthy"
         issues = []
         
-        if memory_percent > 80:
+        if reading.memory_percent > 80:
             status = "warning"
-            issues.append(f"High memory usage: {memory_percent:.1f}%")
+            issues.append(f"High memory usage: {reading.memory_percent:.1f}%")
         
-        if cpu_percent > 80:
+        if reading.cpu_percent > 80:
             status = "warning"
-            issues.append(f"High CPU usage: {cpu_percent:.1f}%")
+            issues.append(f"High CPU usage: {reading.cpu_percent:.1f}%")
         
-        if disk_percent > 90:
+        if reading.disk_percent > 90:
             status = "warning"
-            issues.append(f"High disk usage: {disk_percent:.1f}%")
+            issues.append(f"High disk usage: {reading.disk_percent:.1f}%")
         
         return {
             "status": status,
             "issues": issues,
             "metrics": {
-                "memory_percent": round(memory_percent, 2),
-                "memory_available_mb": round(memory.available / 1024 / 1024, 2),
-                "cpu_percent": round(cpu_percent, 2),
-                "disk_percent": round(disk_percent, 2),
-                "disk_free_gb": round(disk.free / 1024 / 1024 / 1024, 2)
-            }
+                "memory_percent": round(reading.memory_percent, 2),
+                "memory_available_mb": reading.memory_available_mb,
+                "cpu_percent": round(reading.cpu_percent, 2),
+                "disk_percent": reading.disk_percent,
+                "disk_free_gb": reading.disk_free_gb,
+                "sampled_at": datetime.utcfromtimestamp(reading.timestamp).isoformat()
+            },
+            "rolling_averages": resource_sampler.averages()
         }
         
     except Exception as e:
@@ -321,8 +444,25 @@ async def check_environment_config():
             "error": str(e)
         }
 
-# Global health monitor instance
+# Global health monitor and resource sampler instances
 health_monitor = SystemHealthMonitor()
+resource_sampler = ResourceSampler(
+    interval_seconds=float(os.environ.get("RESOURCE_SAMPLE_INTERVAL_SECONDS", "5")),
+    window_size=int(os.environ.get("RESOURCE_SAMPLE_WINDOW", "60"))
+)
+
+def _resource_gauge_samples():
+    reading = resource_sampler.latest()
+    yield {"resource": "cpu"}, reading.cpu_percent
+    yield {"resource": "memory"}, reading.memory_percent
+    yield {"resource": "disk"}, reading.disk_percent
+
+metrics_registry.gauge(
+    "uspf_system_resource_percent",
+    "Latest system CPU, memory and disk utilisation from the resource sampler",
+    ("resource",),
+    callback=_resource_gauge_samples
+)
 
 # Register default health checks
 health_monitor.register_check("system_resources", check_system_resources, timeout=10)
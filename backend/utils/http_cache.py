@@ -0,0 +1,84 @@
+"""
+ETag / Last-Modified helpers for conditional GET on read endpoints
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Authenticated data may be kept by the browser but must be revalidated
+PRIVATE_REVALIDATE = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """
+    Build an ETag from the values that determine a representation.
+
+    The tag is weak: it follows the data, not the bytes, so it stays valid
+    when the body is compressed and a 304 carries the same tag as the 200.
+    """
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC or aware datetime as an HTTP date"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    opaque_tag = etag.removeprefix("W/")
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(candidate.removeprefix("W/") == opaque_tag for candidate in candidates)
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = PRIVATE_REVALIDATE
+) -> Optional[Response]:
+    """
+    Apply validators to ``response`` and short-circuit unchanged requests.
+
+    Returns a bodiless 304 response when the client's If-None-Match (or, if
+    absent, If-Modified-Since) shows it already holds the current
+    representation; otherwise sets ETag, Last-Modified and Cache-Control on
+    ``response`` and returns None so the handler can build the body.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    elif if_modified_since is not None and last_modified is not None:
+        not_modified = _not_modified_since(if_modified_since, last_modified)
+    else:
+        not_modified = False
+
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,131 @@
+"""
+Streaming inventory export in CSV, NDJSON and XLSX formats
+"""
+
+import asyncio
+import csv
+import importlib.util
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, List, AsyncIterator
+
+EXPORT_COLUMNS = [
+    "id",
+    "name",
+    "description",
+    "category",
+    "department",
+    "quantity",
+    "reserved_quantity",
+    "reorder_level",
+    "unit_cost",
+    "total_value",
+    "version",
+    "created_at",
+    "updated_at",
+]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+class ExportFormatError(Exception):
+    """Raised when an export format cannot be produced"""
+
+def ensure_export_format(file_format: str):
+    """Fail before streaming starts if ``file_format`` cannot be produced"""
+    if file_format not in EXPORT_MEDIA_TYPES:
+        raise ExportFormatError(f"Unsupported export format: {file_format}")
+    if file_format == "xlsx" and importlib.util.find_spec("openpyxl") is None:
+        raise ExportFormatError("XLSX export requires the openpyxl package")
+
+def export_columns(include_qr: bool = False) -> List[str]:
+    return EXPORT_COLUMNS + (["qr_code"] if include_qr else [])
+
+def export_row(item: Dict[str, Any], columns: List[str]) -> Dict[str, Any]:
+    """Flatten a stored item into export values, adding its stock valuation"""
+    row = {}
+    for column in columns:
+        if column == "total_value":
+            value = round(item.get("quantity", 0) * item.get("unit_cost", 0.0), 2)
+        else:
+            value = item.get(column)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        row[column] = value
+    return row
+
+async def stream_csv(items: AsyncIterator[Dict[str, Any]], columns: List[str], chunk_rows: int = 200):
+    """Yield CSV text in chunks of ``chunk_rows`` rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    pending = 0
+
+    async for item in items:
+        writer.writerow(export_row(item, columns))
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    yield buffer.getvalue()
+
+async def stream_ndjson(items: AsyncIterator[Dict[str, Any]], columns: List[str], chunk_rows: int = 200):
+    """Yield newline-delimited JSON in chunks of ``chunk_rows`` rows"""
+    lines = []
+    async for item in items:
+        lines.append(json.dumps(export_row(item, columns)))
+        if len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+async def stream_xlsx(items: AsyncIterator[Dict[str, Any]], columns: List[str], chunk_size: int = 64 * 1024):
+    """
+    Yield an XLSX workbook.
+
+    XLSX is a zip archive and cannot be emitted row by row, so rows are
+    written through openpyxl's write-only mode (which spools them to disk)
+    into a temporary file that is then streamed back in chunks. Saving the
+    workbook and reading it back run in the default thread pool.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ExportFormatError("XLSX export requires the openpyxl package")
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Inventory")
+    sheet.append(columns)
+    async for item in items:
+        row = export_row(item, columns)
+        sheet.append([row[column] for column in columns])
+
+    handle, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(handle)
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, workbook.save, path)
+        with open(path, "rb") as export_file:
+            while True:
+                chunk = await loop.run_in_executor(None, export_file.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.unlink(path)
+
+EXPORT_WRITERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "xlsx": stream_xlsx,
+}
@@ -0,0 +1,465 @@
+"""
+Streaming bulk inventory import with batched inserts and deferred QR generation
+"""
+
+import asyncio
+import csv
+import functools
+import io
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple, Set, Awaitable
+
+from .logger import logger
+from .inventory_store import InventoryStore, RecordWrite, VersionConflict, inventory_store
+from .error_handler import CircuitBreaker, qr_code_circuit_breaker
+from .deadline import Deadline, DeadlineExceeded, check_deadline, current_deadline, run_in_executor
+from .shared_state import SharedState, shared_state
+
+class ImportFormatError(Exception):
+    """Raised when an uploaded file cannot be read as the requested format"""
+
+def _clean_row(raw: Dict[Any, Any]) -> Dict[str, Any]:
+    """Normalise headers and drop blank cells so model defaults apply"""
+    row = {}
+    for key, value in raw.items():
+        if key is None:
+            continue
+        column = str(key).strip().lower()
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        row[column] = value
+    return row
+
+def iter_csv_rows(binary_file, encoding: str = "utf-8-sig") -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield ``(line_number, row)`` pairs from a CSV upload without loading it whole"""
+    text = io.TextIOWrapper(binary_file, encoding=encoding, newline="")
+    try:
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            raise ImportFormatError("CSV file has no header row")
+        for row in reader:
+            yield reader.line_num, _clean_row(row)
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(f"CSV file is not valid {encoding}: {e}")
+    except csv.Error as e:
+        raise ImportFormatError(f"Malformed CSV: {e}")
+    finally:
+        text.detach()
+
+def iter_xlsx_rows(binary_file) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield ``(row_number, row)`` pairs from the first sheet of an XLSX upload"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("XLSX import requires the openpyxl package")
+
+    try:
+        workbook = load_workbook(binary_file, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFormatError(f"Unable to read XLSX file: {e}")
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            raise ImportFormatError("XLSX file has no header row")
+        for row_number, values in enumerate(rows, start=2):
+            if all(value is None for value in values):
+                continue
+            yield row_number, _clean_row(dict(zip(header, values)))
+    finally:
+        workbook.close()
+
+@dataclass
+class ImportJob:
+    """Progress and error report for one bulk import"""
+    id: str
+    filename: str
+    status: str = "processing"  # processing, generating_qr_codes, completed, failed
+    rows_processed: int = 0
+    rows_imported: int = 0
+    rows_failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    errors_truncated: bool = False
+    qr_codes_pending: int = 0
+    qr_codes_generated: int = 0
+    qr_codes_failed: int = 0
+    message: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    completed_at: Optional[str] = None
+
+    def finish(self, status: str, message: str = None):
+        self.status = status
+        self.message = message
+        self.completed_at = datetime.utcnow().isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+@dataclass
+class RowBatch:
+    """Rows read and validated in the thread pool, applied to their job on the event loop"""
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+    errors: List[Tuple[int, List[Dict[str, Any]]]] = field(default_factory=list)
+    processed: int = 0
+    exhausted: bool = False
+    truncated: bool = False
+
+class ImportJobRegistry:
+    """
+    Publish import jobs to the shared state so any worker can answer a poll, and run them in the background.
+
+    The worker running an import owns its ``ImportJob`` and republishes it
+    as it progresses; other workers (and other instances sharing the state)
+    serve the last published copy. Published jobs expire after
+    ``retention_seconds``. State operations run in the default thread pool.
+    """
+
+    def __init__(
+        self,
+        state: SharedState = None,
+        max_jobs: int = 100,
+        retention_seconds: float = 86400,
+        timeout_seconds: Optional[float] = 600.0
+    ):
+        self.state = state or shared_state
+        self.max_jobs = max_jobs
+        self.retention_seconds = retention_seconds
+        self.timeout_seconds = timeout_seconds
+        self.jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self.tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"import_job:{job_id}"
+
+    async def _call_state(self, method: Callable, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(method, *args, **kwargs))
+
+    async def create(self, filename: str) -> ImportJob:
+        job = ImportJob(id=str(uuid.uuid4()), filename=filename)
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.max_jobs:
+            self.jobs.popitem(last=False)
+        await self.publish(job)
+        return job
+
+    async def publish(self, job: ImportJob):
+        """Store a snapshot of ``job`` for polls answered by other workers"""
+        try:
+            await self._call_state(self.state.set, self._key(job.id), job.to_dict(), ttl=self.retention_seconds)
+        except Exception as e:
+            # The import itself carries on; polls elsewhere see an older snapshot
+            logger.warning(f"Could not publish import job {job.id}: {str(e)}")
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job, from this worker if it runs it, otherwise as last published"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return await self._call_state(self.state.get, self._key(job_id))
+
+    def run_in_background(self, job: ImportJob, work: Awaitable) -> asyncio.Task:
+        """Run ``work`` for ``job`` after the request returns; the task is held until it finishes"""
+        task = asyncio.create_task(self._run(job, work))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def _run(self, job: ImportJob, work: Awaitable):
+        # The task inherits the request's context but outlives the request,
+        # so it gets a budget of its own instead of the request's deadline
+        current_deadline.set(Deadline(self.timeout_seconds) if self.timeout_seconds else None)
+        try:
+            await work
+        except asyncio.CancelledError:
+            job.finish("failed", "Import cancelled by shutdown")
+            await asyncio.shield(self.publish(job))
+            raise
+        except Exception as e:
+            logger.error("Inventory import failed", inventory_import={
+                "job_id": job.id,
+                "error": str(e)
+            }, exc_info=True)
+            job.finish("failed", "Import failed unexpectedly")
+            await self.publish(job)
+
+    async def stop(self):
+        """Cancel imports still running"""
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def qr_code_payload(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Data encoded in an inventory item's QR code"""
+    return {"id": item["id"], "name": item["name"], "category": item["category"]}
+
+class QRCodeQueue:
+    """
+    Background queue that renders QR codes for imported items.
+
+    Rendering runs in the default thread pool so a large import never blocks
+    the event loop; the worker task starts on first use and exits when the
+    queue is stopped. Job progress is republished every ``publish_every``
+    QR codes and when the last one is done.
+    """
+
+    def __init__(
+        self,
+        store: InventoryStore = None,
+        max_attempts: int = 5,
+        breaker: CircuitBreaker = None,
+        jobs: ImportJobRegistry = None,
+        publish_every: int = 100
+    ):
+        self.store = store or inventory_store
+        self.max_attempts = max_attempts
+        self.breaker = breaker or qr_code_circuit_breaker
+        self.jobs = jobs or import_jobs
+        self.publish_every = publish_every
+        self.generator: Optional[Callable[[dict], str]] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+
+    def _ensure_worker(self):
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self._run())
+
+    async def enqueue(self, job: Optional[ImportJob], item_ids: List[str]):
+        """Schedule QR generation for items, tracking progress on ``job`` if given"""
+        if not item_ids:
+            return
+        if self.generator is None:
+            raise RuntimeError("QR code generator not configured")
+        self._ensure_worker()
+        if job is not None:
+            job.qr_codes_pending += len(item_ids)
+        for item_id in item_ids:
+            self.queue.put_nowait((job, item_id))
+
+    async def _render(self, item_id: str) -> bool:
+        loop = asyncio.get_running_loop()
+        for _ in range(self.max_attempts):
+            item = await self.store.get_item(item_id)
+            if item is None:
+                return False
+            # Stop feeding the render pool while it keeps failing
+            permit = self.breaker.can_execute()
+            if not permit:
+                return False
+            try:
+                item["qr_code"] = await loop.run_in_executor(None, self.generator, qr_code_payload(item))
+            except Exception:
+                self.breaker.record_failure(permit)
+                raise
+            except BaseException:
+                self.breaker.release(permit)
+                raise
+            if item["qr_code"]:
+                self.breaker.record_success(permit)
+            else:
+                self.breaker.record_failure(permit)
+                return False
+            try:
+                await self.store.commit([RecordWrite("inventory", item)])
+                return bool(item["qr_code"])
+            except VersionConflict:
+                continue
+        return False
+
+    async def _run(self):
+        # The worker is started from a request and inherits its context; it
+        # outlives that request, so it must not inherit its deadline too
+        current_deadline.set(None)
+        while True:
+            job, item_id = await self.queue.get()
+            rendered = False
+            try:
+                rendered = await self._render(item_id)
+            except Exception as e:
+                logger.error(f"QR code generation failed for {item_id}: {str(e)}")
+            finally:
+                self.queue.task_done()
+            if job is not None:
+                if rendered:
+                    job.qr_codes_generated += 1
+                else:
+                    job.qr_codes_failed += 1
+                job.qr_codes_pending -= 1
+                if job.qr_codes_pending == 0 and job.status == "generating_qr_codes":
+                    job.finish("completed", job.message)
+                done = job.qr_codes_generated + job.qr_codes_failed
+                if job.qr_codes_pending == 0 or done % self.publish_every == 0:
+                    await self.jobs.publish(job)
+
+    async def stop(self):
+        """Cancel the worker, abandoning anything still queued"""
+        if self.worker and not self.worker.done():
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+        self.worker = None
+
+class InventoryImporter:
+    """
+    Validate uploaded rows and insert them in batched transactions.
+
+    Rows are consumed lazily from a row iterator, validated one at a time and
+    inserted ``batch_size`` at a time, so memory use is bounded by the batch
+    rather than the file. Reading and validating a batch (including opening
+    the workbook) runs in the thread pool, so parsing a large upload never
+    blocks the event loop. Invalid rows are recorded in the job's error
+    report and skipped; QR codes are left to ``QRCodeQueue``. The job is
+    republished after every batch.
+    """
+
+    def __init__(
+        self,
+        store: InventoryStore = None,
+        qr_queue: QRCodeQueue = None,
+        jobs: ImportJobRegistry = None,
+        batch_size: int = 500,
+        max_rows: int = 50000,
+        max_reported_errors: int = 500
+    ):
+        self.store = store or inventory_store
+        self.qr_queue = qr_queue or qr_code_queue
+        self.jobs = jobs or import_jobs
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self.max_reported_errors = max_reported_errors
+
+    def _record_error(self, job: ImportJob, row_number: int, errors: List[Dict[str, Any]]):
+        job.rows_failed += 1
+        if len(job.errors) < self.max_reported_errors:
+            job.errors.append({"row": row_number, "errors": errors})
+        else:
+            job.errors_truncated = True
+
+    def _read_batch(
+        self,
+        job: ImportJob,
+        rows: Iterator[Tuple[int, Dict[str, Any]]],
+        validate: Callable[[Dict[str, Any]], Dict[str, Any]],
+        remaining: int
+    ) -> RowBatch:
+        """Pull rows until a batch of valid records is ready; runs in the thread pool"""
+        batch = RowBatch()
+        while len(batch.records) < self.batch_size:
+            next_row = next(rows, None)
+            if next_row is None:
+                batch.exhausted = True
+                break
+            if batch.processed >= remaining:
+                batch.truncated = True
+                break
+            row_number, row = next_row
+            batch.processed += 1
+
+            try:
+                data = validate(row)
+            except Exception as e:
+                errors = e.errors() if hasattr(e, "errors") else [{"msg": str(e)}]
+                batch.errors.append((row_number, [
+                    {"field": ".".join(str(part) for part in error.get("loc", ())), "message": error.get("msg")}
+                    for error in errors
+                ]))
+                continue
+
+            item_id = str(uuid.uuid4())
+            batch.records.append({"id": item_id, **data, "qr_code": None, "reserved_quantity": 0})
+            if data.get("quantity", 0) > 0:
+                batch.entries.append({
+                    "item_id": item_id,
+                    "transaction_type": "receive",
+                    "quantity": data["quantity"],
+                    "balance": data["quantity"],
+                    "reference_number": f"IMPORT-{job.id[:8]}",
+                    "department": data.get("department"),
+                    "remarks": f"Imported from {job.filename}"
+                })
+        return batch
+
+    async def _flush(self, job: ImportJob, records: List[Dict[str, Any]], entries: List[Dict[str, Any]]):
+        # Batches already written stay; nothing more is written once the deadline passes
+        check_deadline("inventory_import")
+        await self.store.insert_many("inventory", records, entries)
+        job.rows_imported += len(records)
+        await self.qr_queue.enqueue(job, [record["id"] for record in records])
+
+    async def run(
+        self,
+        job: ImportJob,
+        rows: Iterator[Tuple[int, Dict[str, Any]]],
+        validate: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> ImportJob:
+        """
+        Import ``rows`` into the store, recording progress on ``job``.
+
+        ``validate`` turns a raw row into clean item data or raises an
+        exception exposing pydantic-style ``errors()``; it is called from
+        the thread pool. The current deadline is checked before each batch
+        is read and written; once it has passed the job fails, keeping the
+        batches already imported.
+        """
+        rows = iter(rows)
+
+        try:
+            while True:
+                batch = await run_in_executor(
+                    self._read_batch, job, rows, validate, self.max_rows - job.rows_processed,
+                    stage="inventory_import"
+                )
+                job.rows_processed += batch.processed
+                for row_number, errors in batch.errors:
+                    self._record_error(job, row_number, errors)
+                if batch.records:
+                    await self._flush(job, batch.records, batch.entries)
+                if batch.truncated:
+                    job.message = f"Stopped after {self.max_rows} rows"
+                if batch.exhausted or batch.truncated:
+                    break
+                await self.jobs.publish(job)
+
+        except ImportFormatError as e:
+            job.finish("failed", str(e))
+            await self.jobs.publish(job)
+            return job
+        except DeadlineExceeded:
+            job.finish("failed", f"Import timed out after {job.rows_imported} rows were imported")
+            await self.jobs.publish(job)
+            logger.warning(f"Inventory import {job.id} timed out", inventory_import={
+                "job_id": job.id,
+                "filename": job.filename,
+                "imported": job.rows_imported,
+                "processed": job.rows_processed
+            })
+            return job
+
+        if job.qr_codes_pending:
+            job.status = "generating_qr_codes"
+        else:
+            job.finish("completed", job.message)
+        await self.jobs.publish(job)
+
+        logger.info(f"Inventory import {job.id} processed {job.rows_processed} rows", inventory_import={
+            "job_id": job.id,
+            "filename": job.filename,
+            "imported": job.rows_imported,
+            "failed": job.rows_failed
+        })
+        return job
+
+# Global import job registry and QR queue
+import_jobs = ImportJobRegistry()
+qr_code_queue = QRCodeQueue()
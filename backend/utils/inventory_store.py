@@ -0,0 +1,768 @@
+"""
+Inventory store with optimistic concurrency control
+"""
+
+import asyncio
+import copy
+import functools
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from .logger import logger
+
+class VersionConflict(Exception):
+    """Raised when a record changed between read and commit"""
+
+class RecordNotFound(LookupError):
+    """Raised when a referenced record does not exist"""
+
+@dataclass
+class RecordWrite:
+    """
+    A pending write against a single record.
+
+    ``record["version"]`` must hold the version that was read; the store
+    rejects the whole commit if the stored version has moved on since.
+    """
+    collection: str  # "inventory" or "requisitions"
+    record: Dict[str, Any]
+
+@dataclass
+class CommitResult:
+    """Records as stored after a successful commit"""
+    records: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    bin_card_entries: List[Dict[str, Any]] = field(default_factory=list)
+
+@dataclass
+class CollectionState:
+    """Change marker of a collection, for cache validation"""
+    epoch: str
+    version: int
+    last_modified: datetime
+
+class InventoryStore(ABC):
+    """
+    Inventory, requisition and BIN card storage.
+
+    Every item and requisition carries a ``version`` column. Writers read a
+    record, compute its new state and commit it together with the version
+    they read; commits touching stale versions raise ``VersionConflict`` and
+    the caller retries. Only the validate-and-apply step is serialised, so
+    concurrent writers never hold a lock while doing their own work.
+
+    ``InProcessInventoryStore`` keeps the data in dicts and serves a single
+    process; ``SQLiteInventoryStore`` keeps it in a database file that every
+    worker on the host opens and that survives restarts.
+
+    Collection versions count changes since the store was last seeded, so
+    anything derived from them (such as an ETag) must also include the
+    ``epoch`` of ``collection_state``, which is new for every seed.
+    """
+
+    COLLECTIONS = ("inventory", "requisitions", "bin_cards")
+    RECORD_COLLECTIONS = ("inventory", "requisitions")
+
+    def __init__(self):
+        self.stats = {"commits": 0, "conflicts": 0}
+
+    def _check_collection(self, collection: str):
+        if collection not in self.RECORD_COLLECTIONS:
+            raise ValueError(f"Unknown collection: {collection}")
+
+    # Reads
+
+    @abstractmethod
+    async def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of an inventory item, or None"""
+
+    @abstractmethod
+    async def list_items(self) -> List[Dict[str, Any]]:
+        """Return copies of all inventory items in insertion order"""
+
+    @abstractmethod
+    def iter_items(self, predicate: Callable[[Dict[str, Any]], bool] = None):
+        """
+        Yield copies of inventory items matching ``predicate`` one at a time.
+
+        An async generator; callers streaming a large inventory hold only a
+        small batch of items in memory at a time.
+        """
+
+    @abstractmethod
+    async def get_requisition(self, requisition_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a requisition, or None"""
+
+    @abstractmethod
+    async def list_requisitions(self) -> List[Dict[str, Any]]:
+        """Return copies of all requisitions in insertion order"""
+
+    @abstractmethod
+    async def get_many(self, collection: str, record_ids) -> Dict[str, Dict[str, Any]]:
+        """Return copies of the requested records keyed by id, skipping missing ones"""
+
+    @abstractmethod
+    async def get_bin_card(self, item_id: str) -> List[Dict[str, Any]]:
+        """Return the BIN card history for an item, oldest first"""
+
+    @abstractmethod
+    async def bin_card_state(self, item_id: str) -> Tuple[int, Optional[str]]:
+        """Entry count and last entry id of an item's BIN card, for cache validation"""
+
+    @abstractmethod
+    async def collection_state(self, collection: str) -> CollectionState:
+        """Epoch, change count and last change time of ``collection``"""
+
+    # Writes
+
+    @abstractmethod
+    async def insert(
+        self,
+        collection: str,
+        record: Dict[str, Any],
+        bin_card_entries: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Insert a new record at version 1, optionally with its opening BIN card entries"""
+
+    @abstractmethod
+    async def insert_many(
+        self,
+        collection: str,
+        records: List[Dict[str, Any]],
+        bin_card_entries: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        """Insert a batch of new records at version 1 as a single transaction"""
+
+    @abstractmethod
+    async def commit(
+        self,
+        writes: List[RecordWrite],
+        bin_card_entries: Optional[List[Dict[str, Any]]] = None
+    ) -> CommitResult:
+        """
+        Atomically apply record updates and BIN card postings.
+
+        Either every write is applied or, if any record's version no longer
+        matches, none are and ``VersionConflict`` is raised.
+        """
+
+    @abstractmethod
+    def seed(
+        self,
+        items: List[Dict[str, Any]],
+        requisitions: List[Dict[str, Any]] = None,
+        bin_card_entries: List[Dict[str, Any]] = None,
+        replace: bool = True
+    ) -> bool:
+        """
+        Load initial records; True if they were loaded.
+
+        With ``replace`` anything already stored is dropped first, otherwise
+        the records are only loaded into an empty store.
+        """
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+
+class InProcessInventoryStore(InventoryStore):
+    """
+    ``InventoryStore`` held in dicts; shared by the tasks of one process.
+
+    Writes are serialised by an ``asyncio.Lock``. Nothing is kept across
+    restarts and every worker process has its own copy.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.requisitions: Dict[str, Dict[str, Any]] = {}
+        self.bin_cards: Dict[str, List[Dict[str, Any]]] = {}
+        self.epoch = uuid.uuid4().hex
+        self.collection_versions = {name: 0 for name in self.COLLECTIONS}
+        self.last_modified = {name: datetime.utcnow() for name in self.COLLECTIONS}
+        self._commit_lock = asyncio.Lock()
+        self._bin_card_sequence = 0
+
+    def _table(self, collection: str) -> Dict[str, Dict[str, Any]]:
+        self._check_collection(collection)
+        return self.items if collection == "inventory" else self.requisitions
+
+    def _touch(self, collection: str, now: datetime):
+        self.collection_versions[collection] += 1
+        self.last_modified[collection] = now
+
+    def _next_bin_card_id(self) -> str:
+        self._bin_card_sequence += 1
+        return f"bin-{self._bin_card_sequence:06d}"
+
+    def _post_bin_card_entries(self, entries: List[Dict[str, Any]], now: datetime) -> List[Dict[str, Any]]:
+        posted_entries = []
+        for entry in entries:
+            posted = dict(entry)
+            posted.setdefault("id", self._next_bin_card_id())
+            posted.setdefault("created_at", now)
+            self.bin_cards.setdefault(posted["item_id"], []).append(posted)
+            posted_entries.append(dict(posted))
+        if posted_entries:
+            self._touch("bin_cards", now)
+        return posted_entries
+
+    # Reads
+
+    async def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        item = self.items.get(item_id)
+        return copy.deepcopy(item) if item else None
+
+    async def list_items(self) -> List[Dict[str, Any]]:
+        return [copy.deepcopy(item) for item in self.items.values()]
+
+    async def iter_items(self, predicate: Callable[[Dict[str, Any]], bool] = None):
+        # Only the list of ids is snapshotted up front
+        for item_id in list(self.items):
+            item = self.items.get(item_id)
+            if item is None or (predicate and not predicate(item)):
+                continue
+            yield copy.deepcopy(item)
+
+    async def get_requisition(self, requisition_id: str) -> Optional[Dict[str, Any]]:
+        requisition = self.requisitions.get(requisition_id)
+        return copy.deepcopy(requisition) if requisition else None
+
+    async def list_requisitions(self) -> List[Dict[str, Any]]:
+        return [copy.deepcopy(req) for req in self.requisitions.values()]
+
+    async def get_many(self, collection: str, record_ids) -> Dict[str, Dict[str, Any]]:
+        table = self._table(collection)
+        return {
+            record_id: copy.deepcopy(table[record_id])
+            for record_id in record_ids
+            if record_id in table
+        }
+
+    async def get_bin_card(self, item_id: str) -> List[Dict[str, Any]]:
+        return [dict(entry) for entry in self.bin_cards.get(item_id, [])]
+
+    async def bin_card_state(self, item_id: str) -> Tuple[int, Optional[str]]:
+        entries = self.bin_cards.get(item_id, [])
+        return len(entries), entries[-1]["id"] if entries else None
+
+    async def collection_state(self, collection: str) -> CollectionState:
+        return CollectionState(self.epoch, self.collection_versions[collection], self.last_modified[collection])
+
+    # Writes
+
+    async def insert(
+        self,
+        collection: str,
+        record: Dict[str, Any],
+        bin_card_entries: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        async with self._commit_lock:
+            table = self._table(collection)
+            if record["id"] in table:
+                raise VersionConflict(f"{collection} record {record['id']} already exists")
+
+            now = datetime.utcnow()
+            stored = copy.deepcopy(record)
+            stored["version"] = 1
+            stored.setdefault("created_at", now)
+            stored.setdefault("updated_at", now)
+            table[stored["id"]] = stored
+            self._touch(collection, now)
+            self._post_bin_card_entries(bin_card_entries or [], now)
+            return copy.deepcopy(stored)
+
+    async def insert_many(
+        self,
+        collection: str,
+        records: List[Dict[str, Any]],
+        bin_card_entries: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        async with self._commit_lock:
+            table = self._table(collection)
+            for record in records:
+                if record["id"] in table:
+                    raise VersionConflict(f"{collection} record {record['id']} already exists")
+
+            now = datetime.utcnow()
+            for record in records:
+                stored = copy.deepcopy(record)
+                stored["version"] = 1
+                stored.setdefault("created_at", now)
+                stored.setdefault("updated_at", now)
+                table[stored["id"]] = stored
+            if records:
+                self._touch(collection, now)
+            self._post_bin_card_entries(bin_card_entries or [], now)
+            self.stats["commits"] += 1
+            return len(records)
+
+    async def commit(
+        self,
+        writes: List[RecordWrite],
+        bin_card_entries: Optional[List[Dict[str, Any]]] = None
+    ) -> CommitResult:
+        bin_card_entries = bin_card_entries or []
+
+        async with self._commit_lock:
+            # Validate every write before touching anything
+            for write in writes:
+                table = self._table(write.collection)
+                current = table.get(write.record["id"])
+                if current is None:
+                    raise RecordNotFound(f"{write.collection} record {write.record['id']} not found")
+                if current["version"] != write.record["version"]:
+                    self.stats["conflicts"] += 1
+                    raise VersionConflict(
+                        f"{write.collection} record {write.record['id']} is at version "
+                        f"{current['version']}, expected {write.record['version']}"
+                    )
+
+            now = datetime.utcnow()
+            result = CommitResult()
+
+            for write in writes:
+                table = self._table(write.collection)
+                stored = copy.deepcopy(write.record)
+                stored["version"] = write.record["version"] + 1
+                stored["updated_at"] = now
+                table[stored["id"]] = stored
+                result.records[stored["id"]] = copy.deepcopy(stored)
+                self._touch(write.collection, now)
+
+            result.bin_card_entries = self._post_bin_card_entries(bin_card_entries, now)
+
+            self.stats["commits"] += 1
+
+        return result
+
+    def seed(
+        self,
+        items: List[Dict[str, Any]],
+        requisitions: List[Dict[str, Any]] = None,
+        bin_card_entries: List[Dict[str, Any]] = None,
+        replace: bool = True
+    ) -> bool:
+        # Synchronous, so no commit can interleave with it
+        if not replace and self.items:
+            return False
+
+        now = datetime.utcnow()
+        self.epoch = uuid.uuid4().hex
+        self.items = {}
+        self.requisitions = {}
+        self.bin_cards = {}
+        for item in items:
+            stored = copy.deepcopy(item)
+            stored.setdefault("reserved_quantity", 0)
+            stored.setdefault("version", 1)
+            self.items[stored["id"]] = stored
+        for requisition in requisitions or []:
+            stored = copy.deepcopy(requisition)
+            stored.setdefault("version", 1)
+            self.requisitions[stored["id"]] = stored
+        self._post_bin_card_entries(bin_card_entries or [], now)
+        for name in self.COLLECTIONS:
+            self._touch(name, now)
+
+        logger.debug("Inventory store seeded", store={
+            "items": len(self.items),
+            "requisitions": len(self.requisitions)
+        })
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "items": len(self.items),
+            "requisitions": len(self.requisitions),
+            "bin_card_entries": sum(len(entries) for entries in self.bin_cards.values()),
+            "epoch": self.epoch,
+            "collection_versions": dict(self.collection_versions),
+            **self.stats
+        }
+
+class SQLiteInventoryStore(InventoryStore):
+    """
+    ``InventoryStore`` in a SQLite database that every worker on the host opens.
+
+    Records are stored as JSON next to their ``version`` column. A commit is
+    one ``BEGIN IMMEDIATE`` transaction of conditional updates,
+    ``UPDATE ... WHERE id = ? AND version = ?``; an update that matches no
+    row means another writer (in any process) got there first, so the
+    transaction is rolled back and ``VersionConflict`` raised. Collection
+    versions and the seed epoch live in the same database, so ETags agree
+    across workers. Statements run in the default thread pool to keep file
+    I/O off the event loop. Connections are per process and reopened after
+    fork.
+    """
+
+    DATETIME_FIELDS = ("created_at", "updated_at")
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS records ("
+        " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " collection TEXT NOT NULL,"
+        " id TEXT NOT NULL,"
+        " version INTEGER NOT NULL,"
+        " data TEXT NOT NULL,"
+        " UNIQUE (collection, id))",
+        "CREATE TABLE IF NOT EXISTS bin_cards ("
+        " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " id TEXT,"
+        " item_id TEXT NOT NULL,"
+        " data TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS bin_cards_by_item ON bin_cards (item_id, seq)",
+        "CREATE TABLE IF NOT EXISTS collections ("
+        " name TEXT PRIMARY KEY,"
+        " epoch TEXT NOT NULL,"
+        " version INTEGER NOT NULL,"
+        " last_modified TEXT NOT NULL)"
+    )
+
+    def __init__(self, path: str, page_size: int = 500):
+        super().__init__()
+        self.path = path
+        self.page_size = page_size
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection inherited across fork must not be used by the child
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    @contextmanager
+    def _read(self):
+        with self._lock:
+            yield self._connect()
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction; the database write lock is taken up front"""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> str:
+        return json.dumps(
+            record,
+            default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value)
+        )
+
+    def _decode(self, data: str) -> Dict[str, Any]:
+        record = json.loads(data)
+        for name in self.DATETIME_FIELDS:
+            if isinstance(record.get(name), str):
+                record[name] = datetime.fromisoformat(record[name])
+        return record
+
+    def _bin_card_entry(self, seq: int, entry_id: Optional[str], data: str) -> Dict[str, Any]:
+        return {**self._decode(data), "id": entry_id or f"bin-{seq:06d}"}
+
+    def _touch(self, connection: sqlite3.Connection, collection: str, now: datetime):
+        connection.execute(
+            "UPDATE collections SET version = version + 1, last_modified = ? WHERE name = ?",
+            (now.isoformat(), collection)
+        )
+
+    def _post_bin_card_entries(
+        self,
+        connection: sqlite3.Connection,
+        entries: List[Dict[str, Any]],
+        now: datetime
+    ) -> List[Dict[str, Any]]:
+        posted_entries = []
+        for entry in entries:
+            posted = dict(entry)
+            posted.setdefault("created_at", now)
+            cursor = connection.execute(
+                "INSERT INTO bin_cards (id, item_id, data) VALUES (?, ?, ?)",
+                (posted.get("id"), posted["item_id"], self._encode(posted))
+            )
+            posted.setdefault("id", f"bin-{cursor.lastrowid:06d}")
+            posted_entries.append(posted)
+        if posted_entries:
+            self._touch(connection, "bin_cards", now)
+        return posted_entries
+
+    def _insert_records(
+        self,
+        connection: sqlite3.Connection,
+        collection: str,
+        records: List[Dict[str, Any]],
+        now: datetime
+    ) -> List[Dict[str, Any]]:
+        stored_records = []
+        for record in records:
+            stored = copy.deepcopy(record)
+            stored["version"] = 1
+            stored.setdefault("created_at", now)
+            stored.setdefault("updated_at", now)
+            try:
+                connection.execute(
+                    "INSERT INTO records (collection, id, version, data) VALUES (?, ?, 1, ?)",
+                    (collection, stored["id"], self._encode(stored))
+                )
+            except sqlite3.IntegrityError:
+                raise VersionConflict(f"{collection} record {stored['id']} already exists")
+            stored_records.append(stored)
+        if stored_records:
+            self._touch(connection, collection, now)
+        return stored_records
+
+    # Reads
+
+    def _get(self, collection: str, record_id: str) -> Optional[Dict[str, Any]]:
+        with self._read() as connection:
+            row = connection.execute(
+                "SELECT data FROM records WHERE collection = ? AND id = ?", (collection, record_id)
+            ).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def _list(self, collection: str) -> List[Dict[str, Any]]:
+        with self._read() as connection:
+            rows = connection.execute(
+                "SELECT data FROM records WHERE collection = ? ORDER BY seq", (collection,)
+            ).fetchall()
+        return [self._decode(data) for data, in rows]
+
+    def _page(self, collection: str, after: int) -> List[Tuple[int, str]]:
+        with self._read() as connection:
+            return connection.execute(
+                "SELECT seq, data FROM records WHERE collection = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (collection, after, self.page_size)
+            ).fetchall()
+
+    def _get_many(self, collection: str, record_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        records = {}
+        with self._read() as connection:
+            # Stay well under SQLite's bound parameter limit
+            for start in range(0, len(record_ids), 500):
+                chunk = record_ids[start:start + 500]
+                rows = connection.execute(
+                    f"SELECT id, data FROM records WHERE collection = ? AND id IN ({', '.join('?' * len(chunk))})",
+                    (collection, *chunk)
+                ).fetchall()
+                records.update((record_id, self._decode(data)) for record_id, data in rows)
+        return records
+
+    def _get_bin_card(self, item_id: str) -> List[Dict[str, Any]]:
+        with self._read() as connection:
+            rows = connection.execute(
+                "SELECT seq, id, data FROM bin_cards WHERE item_id = ? ORDER BY seq", (item_id,)
+            ).fetchall()
+        return [self._bin_card_entry(*row) for row in rows]
+
+    def _bin_card_state(self, item_id: str) -> Tuple[int, Optional[str]]:
+        with self._read() as connection:
+            count, last_seq = connection.execute(
+                "SELECT COUNT(*), MAX(seq) FROM bin_cards WHERE item_id = ?", (item_id,)
+            ).fetchone()
+            if not count:
+                return 0, None
+            last_id = connection.execute("SELECT id FROM bin_cards WHERE seq = ?", (last_seq,)).fetchone()[0]
+        return count, last_id or f"bin-{last_seq:06d}"
+
+    def _collection_state(self, collection: str) -> CollectionState:
+        with self._read() as connection:
+            row = connection.execute(
+                "SELECT epoch, version, last_modified FROM collections WHERE name = ?", (collection,)
+            ).fetchone()
+        if row is None:
+            # Never seeded
+            return CollectionState("", 0, datetime.utcfromtimestamp(0))
+        return CollectionState(row[0], row[1], datetime.fromisoformat(row[2]))
+
+    async def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self._get, "inventory", item_id)
+
+    async def list_items(self) -> List[Dict[str, Any]]:
+        return await self._run(self._list, "inventory")
+
+    async def iter_items(self, predicate: Callable[[Dict[str, Any]], bool] = None):
+        after = 0
+        while True:
+            rows = await self._run(self._page, "inventory", after)
+            if not rows:
+                return
+            for _, data in rows:
+                item = self._decode(data)
+                if predicate is None or predicate(item):
+                    yield item
+            after = rows[-1][0]
+
+    async def get_requisition(self, requisition_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self._get, "requisitions", requisition_id)
+
+    async def list_requisitions(self) -> List[Dict[str, Any]]:
+        return await self._run(self._list, "requisitions")
+
+    async def get_many(self, collection: str, record_ids) -> Dict[str, Dict[str, Any]]:
+        self._check_collection(collection)
+        return await self._run(self._get_many, collection, list(record_ids))
+
+    async def get_bin_card(self, item_id: str) -> List[Dict[str, Any]]:
+        return await self._run(self._get_bin_card, item_id)
+
+    async def bin_card_state(self, item_id: str) -> Tuple[int, Optional[str]]:
+        return await self._run(self._bin_card_state, item_id)
+
+    async def collection_state(self, collection: str) -> CollectionState:
+        return await self._run(self._collection_state, collection)
+
+    # Writes
+
+    def _insert(
+        self,
+        collection: str,
+        records: List[Dict[str, Any]],
+        bin_card_entries: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        now = datetime.utcnow()
+        with self._transaction() as connection:
+            stored_records = self._insert_records(connection, collection, records, now)
+            self._post_bin_card_entries(connection, bin_card_entries, now)
+        self.stats["commits"] += 1
+        return stored_records
+
+    def _commit(self, writes: List[RecordWrite], bin_card_entries: List[Dict[str, Any]]) -> CommitResult:
+        now = datetime.utcnow()
+        result = CommitResult()
+        with self._transaction() as connection:
+            for write in writes:
+                record_id, version = write.record["id"], write.record["version"]
+                stored = copy.deepcopy(write.record)
+                stored["version"] = version + 1
+                stored["updated_at"] = now
+                # The compare-and-set: only applies if nobody committed since the read
+                updated = connection.execute(
+                    "UPDATE records SET version = ?, data = ? WHERE collection = ? AND id = ? AND version = ?",
+                    (stored["version"], self._encode(stored), write.collection, record_id, version)
+                ).rowcount
+                if not updated:
+                    row = connection.execute(
+                        "SELECT version FROM records WHERE collection = ? AND id = ?", (write.collection, record_id)
+                    ).fetchone()
+                    if row is None:
+                        raise RecordNotFound(f"{write.collection} record {record_id} not found")
+                    self.stats["conflicts"] += 1
+                    raise VersionConflict(
+                        f"{write.collection} record {record_id} is at version {row[0]}, expected {version}"
+                    )
+                result.records[record_id] = stored
+                self._touch(connection, write.collection, now)
+
+            result.bin_card_entries = self._post_bin_card_entries(connection, bin_card_entries, now)
+        self.stats["commits"] += 1
+        return result
+
+    async def insert(
+        self,
+        collection: str,
+        record: Dict[str, Any],
+        bin_card_entries: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        self._check_collection(collection)
+        stored = await self._run(self._insert, collection, [record], bin_card_entries or [])
+        return stored[0]
+
+    async def insert_many(
+        self,
+        collection: str,
+        records: List[Dict[str, Any]],
+        bin_card_entries: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        self._check_collection(collection)
+        return len(await self._run(self._insert, collection, records, bin_card_entries or []))
+
+    async def commit(
+        self,
+        writes: List[RecordWrite],
+        bin_card_entries: Optional[List[Dict[str, Any]]] = None
+    ) -> CommitResult:
+        for write in writes:
+            self._check_collection(write.collection)
+        return await self._run(self._commit, writes, bin_card_entries or [])
+
+    def seed(
+        self,
+        items: List[Dict[str, Any]],
+        requisitions: List[Dict[str, Any]] = None,
+        bin_card_entries: List[Dict[str, Any]] = None,
+        replace: bool = True
+    ) -> bool:
+        # Runs at import, before the event loop serves anything
+        now = datetime.utcnow()
+        with self._transaction() as connection:
+            # Checked inside the write transaction, so concurrently starting
+            # workers seed an empty database exactly once
+            if not replace and connection.execute("SELECT 1 FROM records LIMIT 1").fetchone():
+                return False
+
+            for table in ("records", "bin_cards", "collections"):
+                connection.execute(f"DELETE FROM {table}")
+            epoch = uuid.uuid4().hex
+            connection.executemany(
+                "INSERT INTO collections (name, epoch, version, last_modified) VALUES (?, ?, 0, ?)",
+                [(name, epoch, now.isoformat()) for name in self.COLLECTIONS]
+            )
+
+            for collection, records in (("inventory", items), ("requisitions", requisitions or [])):
+                for record in records:
+                    stored = copy.deepcopy(record)
+                    if collection == "inventory":
+                        stored.setdefault("reserved_quantity", 0)
+                    stored.setdefault("version", 1)
+                    connection.execute(
+                        "INSERT INTO records (collection, id, version, data) VALUES (?, ?, ?, ?)",
+                        (collection, stored["id"], stored["version"], self._encode(stored))
+                    )
+            self._post_bin_card_entries(connection, bin_card_entries or [], now)
+            for name in self.COLLECTIONS:
+                self._touch(connection, name, now)
+
+        logger.debug("Inventory store seeded", store={
+            "path": self.path,
+            "items": len(items),
+            "requisitions": len(requisitions or [])
+        })
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "sqlite", "path": self.path, **self.stats}
+
+def create_inventory_store(path: Optional[str] = None) -> InventoryStore:
+    """SQLite-backed store when a path is given, otherwise in-process"""
+    return SQLiteInventoryStore(path) if path else InProcessInventoryStore()
+
+# Global inventory store; set INVENTORY_DB_PATH (gunicorn_conf.py does) to share it between workers
+inventory_store = create_inventory_store(os.environ.get("INVENTORY_DB_PATH") or None)
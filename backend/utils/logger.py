@@ -3,17 +3,24 @@ Advanced logging system optimized for Vercel deployment
 Supports structured JSON logging, performance monitoring, and error tracking.
 """
 
+import hashlib
 import json
 import logging
 import time
 import traceback
 import psutil
 import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from contextlib import contextmanager
 from functools import wraps
 
+from .metrics import operation_duration_seconds, operation_stats
+from .timeseries_store import timeseries_store
+from .shared_state import SharedState, shared_state
+
 class VercelLogger:
     """
     Advanced logger designed for Vercel serverless functions
@@ -116,39 +123,53 @@ class VercelLogger:
 logger = VercelLogger()
 
 class PerformanceMonitor:
-    """Context manager for monitoring function performance"""
+    """
+    Context manager for monitoring function performance.
+    
+    Every call is recorded in the operation aggregator and the Prometheus
+    histogram; a log line is only written for calls slower than
+    ``slow_threshold_ms`` (``SLOW_OPERATION_THRESHOLD_MS``, default 500ms).
+    """
+    
+    slow_threshold_ms = float(os.environ.get("SLOW_OPERATION_THRESHOLD_MS", "500"))
     
     def __init__(self, operation_name: str, logger_instance: VercelLogger = None):
         self.operation_name = operation_name
         self.logger = logger_instance or logger
         self.start_time = None
-        self.start_memory = None
     
     def __enter__(self):
-        self.start_time = time.time()
-        self.start_memory = self.logger.get_memory_usage()
+        self.start_time = time.perf_counter()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        end_time = time.time()
-        end_memory = self.logger.get_memory_usage()
+        elapsed = time.perf_counter() - self.start_time
+        success = exc_type is None
+        duration = round(elapsed * 1000, 2)  # ms
+        
+        operation_stats.record(self.operation_name, elapsed * 1000, success)
+        operation_duration_seconds.observe(
+            elapsed,
+            operation=self.operation_name,
+            outcome="success" if success else "error"
+        )
         
-        duration = round((end_time - self.start_time) * 1000, 2)  # ms
+        if duration < self.slow_threshold_ms:
+            return
         
         performance_data = {
             "operation": self.operation_name,
             "duration_ms": duration,
-            "memory_start": self.start_memory,
-            "memory_end": end_memory,
-            "success": exc_type is None
+            "threshold_ms": self.slow_threshold_ms,
+            "success": success
         }
         
         if exc_type:
             performance_data["error_type"] = exc_type.__name__
             performance_data["error_message"] = str(exc_val)
         
-        self.logger.info(
-            f"Operation '{self.operation_name}' completed in {duration}ms",
+        self.logger.warning(
+            f"Slow operation '{self.operation_name}' took {duration}ms",
             performance=performance_data
         )
 
@@ -193,39 +214,173 @@ def log_context(request_id: str = None, user_id: str = None):
     finally:
         logging.setLogRecordFactory(old_factory)
 
+@dataclass
+class ErrorFingerprint:
+    """Aggregated occurrences of one distinct error"""
+    fingerprint: str
+    error_type: str
+    location: List[str]
+    message: str
+    count: int = 0
+    first_seen: float = 0.0
+    last_seen: float = 0.0
+    sample_traceback: str = ""
+    sample_context: Dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "type": self.error_type,
+            "location": self.location,
+            "message": self.message,
+            "count": self.count,
+            "first_seen": datetime.utcfromtimestamp(self.first_seen).isoformat(),
+            "last_seen": datetime.utcfromtimestamp(self.last_seen).isoformat(),
+            "sample_traceback": self.sample_traceback,
+            "sample_context": self.sample_context
+        }
+
 class ErrorTracker:
-    """Track and categorize errors for better debugging"""
+    """
+    Track and categorize errors for better debugging.
+    
+    Errors are grouped by a fingerprint of their type and innermost
+    ``fingerprint_frames`` stack frames. Each fingerprint keeps a count,
+    first/last seen times and one sample traceback (formatted only on first
+    occurrence); at most ``max_fingerprints`` are kept, evicting the least
+    recently seen. A fingerprint is logged when first seen and then at most
+    once per ``log_interval_seconds`` with the number of suppressed repeats.
     
-    def __init__(self):
-        self.error_counts = {}
+    Counts and the log rate limit live in the shared state, so with several
+    workers a fingerprint is counted and logged once per interval for the
+    whole host; samples and tracebacks stay in the worker that saw them.
+    Shared counters expire ``retention_seconds`` after they were created,
+    and an evicted fingerprint's counters are deleted with it, so the
+    shared state stays bounded like the local LRU.
+    """
+    
+    # Request headers carry credentials and must not be kept in samples
+    REDACTED_CONTEXT_KEYS = ("headers",)
+    
+    def __init__(
+        self,
+        max_fingerprints: int = 500,
+        fingerprint_frames: int = 3,
+        log_interval_seconds: float = 60.0,
+        retention_seconds: float = 86400.0,
+        state: SharedState = None
+    ):
+        self.state = state or shared_state
+        self.retention_seconds = retention_seconds
+        self.fingerprints: "OrderedDict[str, ErrorFingerprint]" = OrderedDict()
+        self.max_fingerprints = max_fingerprints
+        self.fingerprint_frames = fingerprint_frames
+        self.log_interval_seconds = log_interval_seconds
+        self.evicted = 0
         self.logger = logger
     
-    def track_error(self, error: Exception, context: Dict[str, Any] = None):
-        """Track an error with context"""
+    def _fingerprint(self, error: Exception) -> Tuple[str, List[str]]:
+        frames = traceback.extract_tb(error.__traceback__)[-self.fingerprint_frames:] if error.__traceback__ else []
+        # File and function, not line numbers, so fingerprints survive small edits
+        location = [f"{os.path.basename(frame.filename)}:{frame.name}" for frame in frames]
+        key = "|".join([type(error).__module__, type(error).__qualname__, *location])
+        return hashlib.sha1(key.encode()).hexdigest()[:16], location
+    
+    def track_error(
+        self,
+        error: Exception,
+        context: Dict[str, Any] = None,
+        level: str = "error",
+        message: str = None
+    ) -> Dict[str, Any]:
+        """Track an error with context, logging it unless rate-limited"""
         error_type = type(error).__name__
         error_message = str(error)
+        now = time.time()
         
         # Increment error count
-        self.error_counts[error_type] = self.error_counts.get(error_type, 0) + 1
+        self.state.incr(f"errors:type:{error_type}", ttl=self.retention_seconds)
+        timeseries_store.record(f"errors.{error_type}")
+        
+        fingerprint, location = self._fingerprint(error)
+        entry = self.fingerprints.get(fingerprint)
+        if entry is None:
+            entry = ErrorFingerprint(
+                fingerprint=fingerprint,
+                error_type=error_type,
+                location=location,
+                message=error_message,
+                first_seen=now,
+                sample_traceback="".join(traceback.format_exception(type(error), error, error.__traceback__)),
+                sample_context={
+                    key: value for key, value in (context or {}).items()
+                    if key not in self.REDACTED_CONTEXT_KEYS
+                }
+            )
+            self.fingerprints[fingerprint] = entry
+            while len(self.fingerprints) > self.max_fingerprints:
+                evicted, _ = self.fingerprints.popitem(last=False)
+                self.state.pop(f"errors:fingerprint:{evicted}")
+                self.state.pop(f"errors:suppressed:{evicted}")
+                self.evicted += 1
+        else:
+            self.fingerprints.move_to_end(fingerprint)
+        
+        entry.count += 1
+        entry.last_seen = now
+        entry.message = error_message
+        count = int(self.state.incr(f"errors:fingerprint:{fingerprint}", ttl=self.retention_seconds))
         
         error_details = {
             "type": error_type,
             "message": error_message,
-            "count": self.error_counts[error_type],
-            "context": context or {},
-            "traceback": traceback.format_exc()
+            "fingerprint": fingerprint,
+            "count": count,
+            "context": context or {}
         }
         
-        self.logger.error(
-            f"Error tracked: {error_type} - {error_message}",
-            error_details=error_details
-        )
+        # Whichever worker claims the key logs; the rest count suppressions
+        if self.state.add(f"errors:logged:{fingerprint}", now, ttl=self.log_interval_seconds):
+            if count == 1:
+                error_details["traceback"] = entry.sample_traceback
+            else:
+                error_details["suppressed_since_last_log"] = int(self.state.pop(f"errors:suppressed:{fingerprint}", 0))
+            getattr(self.logger, level)(
+                message or f"Error tracked: {error_type} - {error_message}",
+                error_details=error_details
+            )
+            error_details["logged"] = True
+        else:
+            self.state.incr(f"errors:suppressed:{fingerprint}", ttl=self.retention_seconds)
+            error_details["logged"] = False
         
         return error_details
     
+    @property
+    def error_counts(self) -> Dict[str, int]:
+        """Error counts by type across all workers, within the retention period"""
+        prefix = "errors:type:"
+        return {key[len(prefix):]: int(value) for key, value in self.state.scan(prefix).items()}
+    
     def get_error_summary(self) -> Dict[str, int]:
         """Get summary of tracked errors"""
-        return self.error_counts.copy()
+        return self.error_counts
+    
+    def get_fingerprint_summary(self, limit: int = 50) -> Dict[str, Any]:
+        """Most frequent fingerprints with their sample tracebacks"""
+        prefix = "errors:fingerprint:"
+        counts = {key[len(prefix):]: int(value) for key, value in self.state.scan(prefix).items()}
+        # Samples are per worker, counts are host-wide
+        entries = [{**entry.to_dict(), "count": counts.get(entry.fingerprint, entry.count)} for entry in self.fingerprints.values()]
+        top = sorted(entries, key=lambda entry: entry["count"], reverse=True)[:limit]
+        error_counts = self.error_counts
+        return {
+            "total_errors": sum(error_counts.values()),
+            "distinct_fingerprints": len(counts),
+            "evicted_fingerprints": self.evicted,
+            "by_type": error_counts,
+            "fingerprints": top
+        }
 
 # Global error tracker
 error_tracker = ErrorTracker()
\ No newline at end of file
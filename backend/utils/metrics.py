@@ -0,0 +1,540 @@
+"""
+Minimal Prometheus-compatible metrics registry and text exposition
+"""
+
+import asyncio
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import psutil
+except ImportError:  # process metrics are skipped without psutil
+    psutil = None
+
+# Request latencies from a few milliseconds up to the 25s request timeout
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def snapshot(self) -> Dict[str, object]:
+        """JSON-serialisable copy of the metric, for sharing between worker processes"""
+        return {
+            "type": self.metric_type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(key), value] for key, value in self.samples()]
+        }
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self.samples()
+        ]
+
+class Gauge(_Metric):
+    """Value that can go up and down, optionally computed at scrape time"""
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Callable[[], Iterable[Tuple[Dict[str, str], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._children[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], float]]:
+        if self.callback:
+            try:
+                return [(self._key(labels), value) for labels, value in self.callback()]
+            except Exception:
+                return []
+        return super().samples()
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self.samples()
+        ]
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds"""
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                # per-bucket counts (last slot is +Inf), sum, count
+                child = self._children[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            child[0][index] += 1
+            child[1] += value
+            child[2] += 1
+
+    def merge(self, key: Tuple[str, ...], counts: Sequence[int], total: float, count: int):
+        """Add another histogram's per-bucket counts for ``key`` (same bucket bounds)"""
+        if len(counts) != len(self.buckets) + 1:
+            return
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            for index, bucket_count in enumerate(counts):
+                child[0][index] += bucket_count
+            child[1] += total
+            child[2] += count
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], Tuple[List[int], float, int]]]:
+        with self._lock:
+            return sorted((key, ([*child[0]], child[1], child[2])) for key, child in self._children.items())
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            **super().snapshot(),
+            "buckets": list(self.buckets),
+            "samples": [[list(key), counts, total, count] for key, (counts, total, count) in self.samples()]
+        }
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, (counts, total, count) in self.samples():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class _OperationSummary:
+    __slots__ = ("count", "errors", "total", "minimum", "maximum", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+        self.buckets: Dict[int, int] = {}
+
+class OperationAggregator:
+    """
+    Per-operation count, sum, min/max and percentile estimates.
+
+    Durations are counted in logarithmic buckets (HDR-style) whose width is a
+    fixed fraction of their value, so memory per operation is bounded by the
+    dynamic range rather than the number of calls and every percentile is
+    within ``relative_error`` of the true value.
+    """
+
+    def __init__(self, relative_error: float = 0.01, min_value_ms: float = 0.001):
+        self.relative_error = relative_error
+        self.min_value_ms = min_value_ms
+        self._log_base = math.log1p(2 * relative_error)
+        self._lock = threading.Lock()
+        self._operations: Dict[str, _OperationSummary] = {}
+
+    def _bucket(self, value_ms: float) -> int:
+        return int(math.log(max(value_ms, self.min_value_ms) / self.min_value_ms) / self._log_base)
+
+    def _bucket_value(self, index: int) -> float:
+        # Midpoint of the bucket keeps the estimate within relative_error
+        lower = self.min_value_ms * math.exp(index * self._log_base)
+        return lower * (1 + self.relative_error)
+
+    def record(self, operation: str, duration_ms: float, success: bool = True):
+        index = self._bucket(duration_ms)
+        with self._lock:
+            summary = self._operations.get(operation)
+            if summary is None:
+                summary = self._operations[operation] = _OperationSummary()
+            summary.count += 1
+            summary.errors += 0 if success else 1
+            summary.total += duration_ms
+            summary.minimum = min(summary.minimum, duration_ms)
+            summary.maximum = max(summary.maximum, duration_ms)
+            summary.buckets[index] = summary.buckets.get(index, 0) + 1
+
+    def _percentiles(self, buckets: Dict[int, int], count: int, minimum: float, maximum: float,
+                     quantiles: Sequence[float]) -> List[float]:
+        ordered = sorted(buckets.items())
+        results = []
+        for quantile in quantiles:
+            rank = max(1, math.ceil(quantile * count))
+            seen = 0
+            for index, bucket_count in ordered:
+                seen += bucket_count
+                if seen >= rank:
+                    # Never report outside the observed range
+                    value = min(max(self._bucket_value(index), minimum), maximum)
+                    results.append(round(value, 3))
+                    break
+        return results
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return count, sum, min/max, mean and p50/p95/p99 (ms) per operation"""
+        with self._lock:
+            summaries = [
+                (name, summary.count, summary.errors, summary.total, summary.minimum,
+                 summary.maximum, dict(summary.buckets))
+                for name, summary in self._operations.items()
+            ]
+
+        report = {}
+        for name, count, errors, total, minimum, maximum, buckets in sorted(summaries):
+            p50, p95, p99 = self._percentiles(buckets, count, minimum, maximum, (0.50, 0.95, 0.99))
+            report[name] = {
+                "count": count,
+                "errors": errors,
+                "sum_ms": round(total, 3),
+                "mean_ms": round(total / count, 3),
+                "min_ms": round(minimum, 3),
+                "max_ms": round(maximum, 3),
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99
+            }
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+def merge_snapshots(snapshots: Iterable[Tuple[Optional[str], Dict[str, Dict[str, object]]]]) -> MetricsRegistry:
+    """
+    Combine registry snapshots from several worker processes.
+
+    Counters and histograms are summed. Gauges describe one process, so they
+    are kept per worker under an extra ``worker`` label; snapshots passed
+    with a ``None`` worker (retired workers) contribute no gauges.
+    """
+    merged = MetricsRegistry()
+    for worker, snapshot in snapshots:
+        for name, data in snapshot.items():
+            if data["type"] == "counter":
+                counter = merged.counter(name, data["help"], data["labelnames"])
+                for key, value in data["samples"]:
+                    counter.inc(value, **dict(zip(counter.labelnames, key)))
+            elif data["type"] == "histogram":
+                histogram = merged.histogram(name, data["help"], data["labelnames"], data["buckets"])
+                for key, counts, total, count in data["samples"]:
+                    histogram.merge(tuple(key), counts, total, count)
+            elif worker is not None:
+                gauge = merged.gauge(name, data["help"], [*data["labelnames"], "worker"])
+                for key, value in data["samples"]:
+                    gauge.set(value, **dict(zip(gauge.labelnames, [*key, worker])))
+    return merged
+
+class WorkerMetricsExporter:
+    """
+    Share metrics between the worker processes of one server.
+
+    Each worker periodically writes its registry snapshot to
+    ``<directory>/worker-<pid>.json``; whichever worker serves ``/metrics``
+    merges every snapshot, so a scrape sees the whole server rather than one
+    random worker. When a worker exits the master folds its counters and
+    histograms into ``retired.json`` (see ``retire``) so totals never go
+    backwards across worker recycling. Disabled when no directory is set.
+    """
+
+    RETIRED = "retired.json"
+
+    def __init__(self, registry: MetricsRegistry, directory: Optional[str] = None, interval_seconds: float = 10.0):
+        self.registry = registry
+        self.directory = directory
+        self.interval_seconds = interval_seconds
+        self._task = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def _worker_path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"worker-{pid}.json")
+
+    def _read(self, path: str) -> Optional[dict]:
+        try:
+            with open(path) as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: str, data: dict):
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as handle:
+            json.dump(data, handle)
+        os.replace(temporary, path)
+
+    def write(self):
+        """Publish this worker's current snapshot"""
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write(self._worker_path(os.getpid()), self.registry.snapshot())
+
+    def collect(self) -> List[Tuple[Optional[str], Dict[str, Dict[str, object]]]]:
+        """Snapshots of live workers plus the retired totals"""
+        snapshots = []
+        for filename in os.listdir(self.directory):
+            if filename.startswith("worker-") and filename.endswith(".json"):
+                snapshot = self._read(os.path.join(self.directory, filename))
+                if snapshot is not None:
+                    snapshots.append((filename[len("worker-"):-len(".json")], snapshot))
+        # Read after the worker files: a worker retired in between is then
+        # listed in merged_pids and its file is skipped, never counted twice
+        retired = self._read(os.path.join(self.directory, self.RETIRED)) or {}
+        merged_pids = {str(pid) for pid in retired.get("merged_pids", [])}
+        snapshots = [(worker, snapshot) for worker, snapshot in snapshots if worker not in merged_pids]
+        if retired.get("metrics"):
+            snapshots.append((None, retired["metrics"]))
+        return snapshots
+
+    def render(self) -> str:
+        """Exposition text for every worker, or just this one when disabled"""
+        if not self.enabled:
+            return self.registry.render()
+        self.write()
+        return merge_snapshots(self.collect()).render()
+
+    def retire(self, pid: int):
+        """Fold an exited worker's counters and histograms into the retired totals (master only)"""
+        if not self.enabled:
+            return
+        worker_path = self._worker_path(pid)
+        snapshot = self._read(worker_path)
+        if snapshot is None:
+            return
+        retired_path = os.path.join(self.directory, self.RETIRED)
+        retired = self._read(retired_path) or {}
+        merged = merge_snapshots([(None, retired.get("metrics", {})), (None, snapshot)])
+        # Only remember pids whose files might still be read
+        merged_pids = [
+            merged_pid for merged_pid in retired.get("merged_pids", [])
+            if os.path.exists(self._worker_path(merged_pid))
+        ]
+        self._write(retired_path, {"merged_pids": merged_pids + [pid], "metrics": merged.snapshot()})
+        os.remove(worker_path)
+
+    def clear(self):
+        """Remove snapshots left by a previous server run (master, before forking)"""
+        if self.enabled and os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                if filename.endswith(".json") or filename.endswith(".tmp"):
+                    os.remove(os.path.join(self.directory, filename))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.write)
+            except OSError:
+                pass
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Start publishing snapshots periodically on the running event loop"""
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop publishing and write a final snapshot for the master to retire"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self.write()
+
+# Global registry, operation aggregator and the metrics shared across modules
+metrics_registry = MetricsRegistry()
+operation_stats = OperationAggregator()
+
+http_requests_total = metrics_registry.counter(
+    "uspf_http_requests_total",
+    "HTTP requests handled, by route template, method and status",
+    ("method", "route", "status")
+)
+http_request_duration_seconds = metrics_registry.histogram(
+    "uspf_http_request_duration_seconds",
+    "HTTP request latency, by route template, method and status",
+    ("method", "route", "status")
+)
+http_requests_in_flight = metrics_registry.gauge(
+    "uspf_http_requests_in_flight",
+    "HTTP requests currently being handled",
+    ("method",)
+)
+operation_duration_seconds = metrics_registry.histogram(
+    "uspf_operation_duration_seconds",
+    "Duration of operations instrumented with monitor_performance (JWT, QR, database, handlers)",
+    ("operation", "outcome")
+)
+
+process_start_time = time.time()
+
+def mark_worker_start():
+    """Reset per-process state inherited from a preloading master after fork"""
+    global process_start_time
+    process_start_time = time.time()
+
+metrics_registry.gauge(
+    "uspf_process_uptime_seconds",
+    "Seconds since this worker process started",
+    callback=lambda: [({}, round(time.time() - process_start_time, 3))]
+)
+
+def process_created_at() -> float:
+    """When this process was created, so interpreter start-up and imports count too"""
+    if psutil is not None:
+        try:
+            return psutil.Process(os.getpid()).create_time()
+        except psutil.Error:
+            pass
+    return process_start_time
+
+cold_start_seconds = metrics_registry.gauge(
+    "uspf_cold_start_seconds",
+    "Seconds from process creation to the first response the process sent"
+)
+
+if psutil is not None:
+    _processes: Dict[int, "psutil.Process"] = {}
+
+    def _process() -> "psutil.Process":
+        # Looked up per pid: a preloaded app is imported once in the master
+        # and then forked into workers
+        pid = os.getpid()
+        process = _processes.get(pid)
+        if process is None:
+            process = _processes[pid] = psutil.Process(pid)
+            # Prime the counter so the first scrape reports a real value;
+            # interval=None compares against the previous call instead of sleeping
+            process.cpu_percent(interval=None)
+        return process
+
+    _process()
+
+    metrics_registry.gauge(
+        "uspf_process_cpu_percent",
+        "CPU utilisation of this worker process since the previous scrape",
+        callback=lambda: [({}, _process().cpu_percent(interval=None))]
+    )
+    metrics_registry.gauge(
+        "uspf_process_resident_memory_bytes",
+        "Resident memory of this worker process",
+        callback=lambda: [({}, _process().memory_info().rss)]
+    )
+
+# Global cross-worker exporter, enabled by METRICS_MULTIPROC_DIR (set by gunicorn_conf.py)
+worker_metrics = WorkerMetricsExporter(
+    metrics_registry,
+    directory=os.environ.get("METRICS_MULTIPROC_DIR") or None,
+    interval_seconds=float(os.environ.get("METRICS_MULTIPROC_INTERVAL_SECONDS", "10"))
+)
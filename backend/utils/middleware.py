@@ -5,14 +5,31 @@ Custom middleware for request/response logging, performance monitoring, and time
 import time
 import uuid
 import asyncio
-from typing import Callable
+import zlib
+from typing import Callable, Dict, Any, Optional, Tuple
 from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import json
 
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
 from .logger import logger, log_context, PerformanceMonitor
 from .error_handler import graceful_shutdown
+from .deadline import Deadline, current_deadline
+from .shared_state import SharedState, shared_state
+from .metrics import (
+    http_requests_total,
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    cold_start_seconds,
+    process_created_at
+)
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
     """Log all HTTP requests and responses with performance metrics"""
@@ -25,8 +42,8 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         # Track request start time
         start_time = time.time()
         
-        # Add request to graceful shutdown tracker
-        graceful_shutdown.add_request(request_id)
+        # Count the request for graceful shutdown
+        graceful_shutdown.request_started()
         
         # Log request
         with log_context(request_id=request_id):
@@ -94,8 +111,8 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 raise
             
             finally:
-                # Remove request from graceful shutdown tracker
-                graceful_shutdown.remove_request(request_id)
+                # Release the request from graceful shutdown
+                graceful_shutdown.request_finished()
 
 class TimeoutMiddleware(BaseHTTPMiddleware):
     """Handle request timeouts to prevent Vercel function timeouts"""
@@ -105,6 +122,10 @@ class TimeoutMiddleware(BaseHTTPMiddleware):
         self.timeout_seconds = timeout_seconds
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        # call_next runs the app in a task that copies this context, so
+        # handlers and database retries downstream see the deadline
+        deadline = Deadline(self.timeout_seconds)
+        token = current_deadline.set(deadline)
         try:
             # Race between request processing and timeout
             response = await asyncio.wait_for(
@@ -114,6 +135,8 @@ class TimeoutMiddleware(BaseHTTPMiddleware):
             return response
             
         except asyncio.TimeoutError:
+            # The handler may still be running; let it stop at its next check
+            deadline.cancel()
             logger.warning(
                 f"Request timeout after {self.timeout_seconds}s",
                 timeout_details={
@@ -132,6 +155,8 @@ class TimeoutMiddleware(BaseHTTPMiddleware):
                     "timeout_seconds": self.timeout_seconds
                 }
             )
+        finally:
+            current_deadline.reset(token)
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """Add security headers to all responses"""
@@ -146,38 +171,63 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
         response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
         
+        # API responses are uncacheable unless the route set its own policy
+        if request.url.path.startswith("/api/") and "cache-control" not in response.headers:
+            response.headers["Cache-Control"] = "no-store"
+        
         return response
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware"""
+    """
+    Per-client rate limiting over a sliding one-minute window.
     
-    def __init__(self, app, requests_per_minute: int = 100):
+    Requests are counted in fixed windows in the shared state, so every
+    worker on the host enforces the same limit. The rate is estimated as
+    the current window's count plus the previous window's count weighted by
+    how much of it still overlaps the last ``window_size`` seconds. Only
+    admitted requests are counted, so a client that keeps retrying while
+    limited gets back in as its earlier requests age out. State operations
+    run in the default thread pool.
+    """
+    
+    def __init__(self, app, requests_per_minute: int = 100, state: SharedState = None):
         super().__init__(app)
         self.requests_per_minute = requests_per_minute
-        self.clients = {}  # client_ip -> [timestamp, ...]
         self.window_size = 60  # seconds
+        self.state = state or shared_state
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        client_ip = request.client.host if request.client else "unknown"
-        current_time = time.time()
+    def _admit(self, client_ip: str, current_time: float) -> Tuple[bool, float]:
+        """Count the request if it fits under the limit; returns (admitted, estimated rate)"""
+        window = int(current_time // self.window_size)
+        key = f"ratelimit:{client_ip}:{window}"
+        previous = self.state.get(f"ratelimit:{client_ip}:{window - 1}", 0)
+        overlap = 1 - (current_time % self.window_size) / self.window_size
         
-        # Initialize client if not exists
-        if client_ip not in self.clients:
-            self.clients[client_ip] = []
+        requests_count = previous * overlap + self.state.get(key, 0) + 1
+        if requests_count > self.requests_per_minute:
+            return False, requests_count
         
-        # Remove old requests outside the window
-        self.clients[client_ip] = [
-            timestamp for timestamp in self.clients[client_ip]
-            if current_time - timestamp < self.window_size
-        ]
+        # Keys outlive the next window so it can weigh them
+        requests_count = previous * overlap + self.state.incr(key, 1, ttl=self.window_size * 2)
+        if requests_count > self.requests_per_minute:
+            # Lost a race with other requests for the last slot; give it back
+            self.state.incr(key, -1, ttl=self.window_size * 2)
+            return False, requests_count
+        return True, requests_count
+    
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        client_ip = request.client.host if request.client else "unknown"
+        admitted, requests_count = await asyncio.get_running_loop().run_in_executor(
+            None, self._admit, client_ip, time.time()
+        )
         
         # Check rate limit
-        if len(self.clients[client_ip]) >= self.requests_per_minute:
+        if not admitted:
             logger.warning(
                 f"Rate limit exceeded for {client_ip}",
                 rate_limit={
                     "client_ip": client_ip,
-                    "requests_count": len(self.clients[client_ip]),
+                    "requests_count": round(requests_count, 1),
                     "limit": self.requests_per_minute,
                     "window_seconds": self.window_size
                 }
@@ -194,9 +244,6 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 headers={"Retry-After": "60"}
             )
         
-        # Add current request
-        self.clients[client_ip].append(current_time)
-        
         return await call_next(request)
 
 class MemoryMonitoringMiddleware(BaseHTTPMiddleware):
@@ -237,4 +284,280 @@ class MemoryMonitoringMiddleware(BaseHTTPMiddleware):
         response.headers["X-Memory-Usage"] = f"{memory_after:.2f}MB"
         response.headers["X-Memory-Delta"] = f"{memory_delta:.2f}MB"
         
-        return response
\ No newline at end of file
+        return response
+
+class CompressionStats:
+    """Byte counts before and after response compression"""
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.compressed = {}  # encoding -> {"responses", "bytes_in", "bytes_out"}
+        self.skipped = {"too_small": 0, "content_type": 0, "already_encoded": 0, "not_accepted": 0}
+    
+    def record(self, encoding: str, bytes_in: int, bytes_out: int):
+        stats = self.compressed.setdefault(encoding, {"responses": 0, "bytes_in": 0, "bytes_out": 0})
+        stats["responses"] += 1
+        stats["bytes_in"] += bytes_in
+        stats["bytes_out"] += bytes_out
+    
+    def get_stats(self) -> Dict[str, Any]:
+        bytes_in = sum(stats["bytes_in"] for stats in self.compressed.values())
+        bytes_out = sum(stats["bytes_out"] for stats in self.compressed.values())
+        return {
+            "by_encoding": {encoding: dict(stats) for encoding, stats in self.compressed.items()},
+            "skipped": dict(self.skipped),
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "ratio": round(bytes_out / bytes_in, 3) if bytes_in else None
+        }
+
+compression_stats = CompressionStats()
+
+class _Encoder:
+    """Incremental gzip or brotli encoder"""
+    
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 produces a gzip container rather than raw zlib
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+    
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if token:
+            accepted[token.strip().lower()] = quality
+    return accepted
+
+class CompressionMiddleware:
+    """
+    Compress large text responses with Brotli or gzip.
+    
+    Written as plain ASGI rather than BaseHTTPMiddleware so that streamed
+    responses (such as inventory exports) are compressed chunk by chunk
+    instead of being buffered. Responses below ``minimum_size``, with a
+    content type outside the allowlist (PNG QR codes, XLSX archives) or that
+    already carry a Content-Encoding are passed through untouched.
+    """
+    
+    COMPRESSIBLE_TYPES = (
+        "application/json",
+        "application/x-ndjson",
+        "application/javascript",
+        "application/xml",
+        "image/svg+xml",
+        "text/",
+    )
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        stats: CompressionStats = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats or compression_stats
+    
+    def _choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        accepted = _accepted_encodings(accept_encoding)
+        if brotli is not None and accepted.get("br", 0) > 0:
+            return "br"
+        if accepted.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+    
+    def _compressible(self, headers: Headers) -> bool:
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(self.COMPRESSIBLE_TYPES)
+    
+    def _below_minimum(self, headers: Headers, body: bytes, more_body: bool) -> bool:
+        # Inner BaseHTTPMiddleware layers re-stream every body, so trust the
+        # declared length when there is one
+        content_length = headers.get("content-length")
+        if content_length is not None and content_length.isdigit():
+            return int(content_length) < self.minimum_size
+        return not more_body and len(body) < self.minimum_size
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = self._choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            self.stats.skipped["not_accepted"] += 1
+            await self.app(scope, receive, send)
+            return
+        
+        start_message: Optional[Message] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+        bytes_in = bytes_out = 0
+        
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough, bytes_in, bytes_out
+            
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows the size
+                start_message = message
+                return
+            
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            
+            if encoder is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                skip_reason = None
+                if "content-encoding" in headers:
+                    skip_reason = "already_encoded"
+                elif not self._compressible(headers):
+                    skip_reason = "content_type"
+                elif self._below_minimum(headers, body, more_body):
+                    skip_reason = "too_small"
+                
+                if skip_reason:
+                    self.stats.skipped[skip_reason] += 1
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                
+                encoder = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                # The compressed bytes are a different representation
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                
+                if not more_body:
+                    compressed = encoder.compress(body) + encoder.finish()
+                    headers["Content-Length"] = str(len(compressed))
+                    self.stats.record(encoding, len(body), len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                
+                del headers["Content-Length"]
+                await send(start_message)
+            
+            bytes_in += len(body)
+            chunk = encoder.compress(body)
+            if not more_body:
+                chunk += encoder.finish()
+            bytes_out += len(chunk)
+            if not more_body:
+                self.stats.record(encoding, bytes_in, bytes_out)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        
+        await self.app(scope, receive, send_compressed)
+
+class MetricsMiddleware:
+    """
+    Record request counts, latency histograms and in-flight gauges.
+    
+    Requests are labelled by the matched route template (``/api/inventory/{item_id}``)
+    rather than the raw path so label cardinality stays bounded; requests
+    that match no route are grouped under ``unmatched``.
+    """
+    
+    def __init__(self, app: ASGIApp, exclude_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = exclude_paths
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        http_requests_in_flight.inc(method=method)
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            http_requests_in_flight.dec(method=method)
+            # The router stores the matched route on the (shared) scope
+            route = scope.get("route")
+            labels = {
+                "method": method,
+                "route": getattr(route, "path", None) or "unmatched",
+                "status": str(status_code)
+            }
+            http_requests_total.inc(**labels)
+            http_request_duration_seconds.observe(elapsed, **labels)
+
+class ColdStartMiddleware:
+    """
+    Report how long this process took to send its first response.
+    
+    The first response carries ``X-Cold-Start: 1`` and
+    ``Server-Timing: cold-start;dur=<ms>``, measured from process creation so
+    interpreter start-up, imports and startup handlers are all included;
+    later responses carry ``X-Cold-Start: 0``. The duration is also exported
+    as ``uspf_cold_start_seconds``.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.cold = True
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if self.cold:
+                    self.cold = False
+                    elapsed = max(0.0, time.time() - process_created_at())
+                    cold_start_seconds.set(round(elapsed, 3))
+                    headers.append("Server-Timing", f"cold-start;dur={elapsed * 1000:.1f}")
+                    headers["X-Cold-Start"] = "1"
+                else:
+                    headers["X-Cold-Start"] = "0"
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
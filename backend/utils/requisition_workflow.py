@@ -0,0 +1,306 @@
+"""
+Requisition state machine with atomic stock reservation and issue posting
+"""
+
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from .logger import logger
+from .inventory_store import (
+    InventoryStore,
+    RecordWrite,
+    RecordNotFound,
+    VersionConflict,
+    inventory_store
+)
+
+# pending -> approved -> fulfilled, with rejection allowed until fulfilment
+TRANSITIONS = {
+    "pending": {"approved", "rejected"},
+    "approved": {"fulfilled", "rejected"},
+    "rejected": set(),
+    "fulfilled": set(),
+}
+
+class InvalidTransition(Exception):
+    """Raised when a requisition cannot move to the requested status"""
+
+class InsufficientStock(Exception):
+    """Raised when an approval would reserve more than is available"""
+
+# Error categories reported per item by bulk transitions
+ERROR_TYPES = {
+    RecordNotFound: "not_found",
+    InvalidTransition: "invalid_transition",
+    InsufficientStock: "insufficient_stock",
+}
+
+@dataclass
+class TransitionPlan:
+    """Writes needed to apply one or more transitions in a single commit"""
+    requisitions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    items: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    bin_card_entries: List[Dict[str, Any]] = field(default_factory=list)
+
+    def writes(self) -> List[RecordWrite]:
+        return (
+            [RecordWrite("inventory", item) for item in self.items.values()] +
+            [RecordWrite("requisitions", req) for req in self.requisitions.values()]
+        )
+
+def available_quantity(item: Dict[str, Any]) -> int:
+    """Stock on hand that is not reserved by approved requisitions"""
+    return item.get("quantity", 0) - item.get("reserved_quantity", 0)
+
+def apply_transition(
+    plan: TransitionPlan,
+    requisition: Dict[str, Any],
+    item: Dict[str, Any],
+    target_status: str,
+    actor: Optional[str] = None
+):
+    """
+    Apply a status transition to working copies held in ``plan``.
+
+    Approval reserves the requested quantity, rejection of an approved
+    requisition releases it, and fulfilment converts the reservation into a
+    BIN card issue. Raises before modifying anything if the transition is
+    not allowed.
+    """
+    current_status = requisition["status"]
+    if target_status not in TRANSITIONS.get(current_status, set()):
+        raise InvalidTransition(f"Cannot move requisition from '{current_status}' to '{target_status}'")
+
+    quantity = requisition["requested_quantity"]
+
+    if target_status == "approved":
+        if available_quantity(item) < quantity:
+            raise InsufficientStock(
+                f"Only {available_quantity(item)} of {item['name']} available, {quantity} requested"
+            )
+        item["reserved_quantity"] = item.get("reserved_quantity", 0) + quantity
+        requisition["approved_by"] = actor
+
+    elif target_status == "rejected":
+        if current_status == "approved":
+            item["reserved_quantity"] = item.get("reserved_quantity", 0) - quantity
+
+    elif target_status == "fulfilled":
+        item["reserved_quantity"] = item.get("reserved_quantity", 0) - quantity
+        item["quantity"] -= quantity
+        requisition["fulfilled_by"] = actor
+        plan.bin_card_entries.append({
+            "item_id": item["id"],
+            "transaction_type": "issue",
+            "quantity": quantity,
+            "balance": item["quantity"],
+            "reference_number": f"REQ-{requisition['id']}",
+            "department": requisition.get("department"),
+            "remarks": requisition.get("purpose")
+        })
+
+    requisition["status"] = target_status
+    plan.requisitions[requisition["id"]] = requisition
+    plan.items[item["id"]] = item
+
+class RequisitionWorkflow:
+    """
+    Drive requisitions through their lifecycle against the inventory store.
+
+    Each transition reads the requisition and its item, plans the new state
+    and commits both records (plus any BIN card posting) as one unit guarded
+    by their version columns. On a version conflict the transition is
+    re-planned from fresh data after a short randomised backoff.
+
+    Single transitions on the same item also queue on a per-item lock
+    within the process, so a burst of approvals for one item commits one
+    after another instead of spending its retry budget on conflicts. The
+    version check still guards against writers in other processes.
+    """
+
+    def __init__(
+        self,
+        store: InventoryStore = None,
+        max_attempts: int = 10,
+        backoff_ms: float = 2.0,
+        max_backoff_ms: float = 100.0
+    ):
+        self.store = store or inventory_store
+        self.max_attempts = max_attempts
+        self.backoff_ms = backoff_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.stats = {"transitions": 0, "conflicts": 0, "exhausted": 0}
+        self._item_locks: Dict[str, asyncio.Lock] = {}
+        self._item_lock_users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def _item_lock(self, item_id: str):
+        """Serialise transitions on one item; the lock is dropped once nobody holds or awaits it"""
+        lock = self._item_locks.setdefault(item_id, asyncio.Lock())
+        self._item_lock_users[item_id] = self._item_lock_users.get(item_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._item_lock_users[item_id] -= 1
+            if not self._item_lock_users[item_id]:
+                del self._item_lock_users[item_id]
+                del self._item_locks[item_id]
+
+    async def _backoff(self, attempt: int):
+        self.stats["conflicts"] += 1
+        ceiling = min(self.backoff_ms * (2 ** attempt), self.max_backoff_ms)
+        await asyncio.sleep(random.uniform(0, ceiling) / 1000)
+
+    async def _load(self, requisition_id: str):
+        requisition = await self.store.get_requisition(requisition_id)
+        if requisition is None:
+            raise RecordNotFound(f"Requisition {requisition_id} not found")
+        item = await self.store.get_item(requisition["item_id"])
+        if item is None:
+            raise RecordNotFound(f"Inventory item {requisition['item_id']} not found")
+        return requisition, item
+
+    async def transition(
+        self,
+        requisition_id: str,
+        target_status: str,
+        actor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Move a requisition to ``target_status`` and return the stored record"""
+        requisition = await self.store.get_requisition(requisition_id)
+        if requisition is None:
+            raise RecordNotFound(f"Requisition {requisition_id} not found")
+
+        async with self._item_lock(requisition["item_id"]):
+            for attempt in range(self.max_attempts):
+                requisition, item = await self._load(requisition_id)
+
+                plan = TransitionPlan()
+                apply_transition(plan, requisition, item, target_status, actor)
+
+                try:
+                    result = await self.store.commit(plan.writes(), plan.bin_card_entries)
+                except VersionConflict:
+                    await self._backoff(attempt)
+                    continue
+
+                self.stats["transitions"] += 1
+                logger.info(f"Requisition {requisition_id} {target_status}", requisition={
+                    "id": requisition_id,
+                    "item_id": item["id"],
+                    "status": target_status,
+                    "actor": actor,
+                    "attempts": attempt + 1
+                })
+                return result.records[requisition_id]
+
+        self.stats["exhausted"] += 1
+        raise VersionConflict(
+            f"Requisition {requisition_id} could not be updated after {self.max_attempts} attempts"
+        )
+
+    def _plan_batch(
+        self,
+        transitions: List[Tuple[str, str, Optional[str]]],
+        requisitions: Dict[str, Dict[str, Any]],
+        items: Dict[str, Dict[str, Any]]
+    ) -> Tuple[TransitionPlan, List[Dict[str, Any]]]:
+        """Validate transitions in order against shared working copies"""
+        plan = TransitionPlan()
+        results = []
+
+        for requisition_id, target_status, actor in transitions:
+            result = {
+                "requisition_id": requisition_id,
+                "status": target_status,
+                "outcome": "applied",
+                "error": None,
+                "error_type": None,
+                "requisition": None
+            }
+            try:
+                requisition = requisitions.get(requisition_id)
+                if requisition is None:
+                    raise RecordNotFound(f"Requisition {requisition_id} not found")
+                item = items.get(requisition["item_id"])
+                if item is None:
+                    raise RecordNotFound(f"Inventory item {requisition['item_id']} not found")
+
+                # Working copies are shared, so later transitions in the batch
+                # see the stock reserved or issued by earlier ones
+                apply_transition(plan, requisition, item, target_status, actor)
+            except tuple(ERROR_TYPES) as e:
+                result.update(outcome="failed", error=str(e), error_type=ERROR_TYPES[type(e)])
+            results.append(result)
+
+        return plan, results
+
+    async def bulk_transition(
+        self,
+        transitions: List[Tuple[str, str, Optional[str]]],
+        atomic: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Apply many ``(requisition_id, target_status, actor)`` transitions.
+
+        All transitions are validated in one pass, in request order, and the
+        valid ones are written in a single commit. Invalid transitions are
+        reported as ``failed`` and do not affect the rest of the batch unless
+        ``atomic`` is set, in which case any failure leaves every other
+        transition ``skipped`` and nothing is written. A version conflict
+        re-validates the whole batch against fresh data.
+        """
+        requisition_ids = {requisition_id for requisition_id, _, _ in transitions}
+
+        for attempt in range(self.max_attempts):
+            requisitions = await self.store.get_many("requisitions", requisition_ids)
+            items = await self.store.get_many(
+                "inventory", {req["item_id"] for req in requisitions.values()}
+            )
+
+            plan, results = self._plan_batch(transitions, requisitions, items)
+            failed = any(result["outcome"] == "failed" for result in results)
+
+            if atomic and failed:
+                for result in results:
+                    if result["outcome"] == "applied":
+                        result["outcome"] = "skipped"
+                return results
+
+            if not plan.requisitions:
+                return results
+
+            try:
+                commit = await self.store.commit(plan.writes(), plan.bin_card_entries)
+            except VersionConflict:
+                await self._backoff(attempt)
+                continue
+
+            for result in results:
+                if result["outcome"] == "applied":
+                    result["requisition"] = commit.records[result["requisition_id"]]
+
+            applied = sum(1 for result in results if result["outcome"] == "applied")
+            self.stats["transitions"] += applied
+            logger.info(f"Bulk requisition update applied {applied} of {len(results)} transitions", requisition={
+                "applied": applied,
+                "failed": len(results) - applied,
+                "attempts": attempt + 1
+            })
+            return results
+
+        self.stats["exhausted"] += 1
+        raise VersionConflict(
+            f"Bulk requisition update could not be applied after {self.max_attempts} attempts"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get workflow statistics"""
+        return self.stats.copy()
+
+# Global requisition workflow
+requisition_workflow = RequisitionWorkflow()
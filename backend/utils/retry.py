@@ -0,0 +1,102 @@
+"""
+Jittered, deadline-aware retry policy
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
+
+from .deadline import get_deadline
+from .metrics import metrics_registry
+
+retry_outcomes_total = metrics_registry.counter(
+    "uspf_retry_outcomes_total",
+    "Retried operations by final outcome (success, non_retryable, deadline, exhausted)",
+    ("operation", "outcome")
+)
+
+# PostgreSQL SQLSTATE classes that will fail the same way on every attempt:
+# data exceptions, integrity violations, syntax/undefined objects, privileges
+NON_RETRYABLE_SQLSTATE_CLASSES = ("22", "23", "42", "28")
+
+class RetryPolicy:
+    """
+    Retry an async operation with full-jitter exponential backoff.
+
+    The delay before retry ``n`` is uniform in ``[0, min(max_delay, base_delay * 2**n)]``.
+    When the current request has a deadline (see ``utils.deadline``), a retry
+    is only attempted if the remaining budget covers the delay plus the
+    expected duration of another attempt (the slowest attempt so far, at
+    least ``min_attempt_seconds``), and no attempt starts once the deadline
+    has expired or been cancelled. Errors classified as non-retryable are
+    raised immediately.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 2.0,
+        min_attempt_seconds: float = 0.25,
+        non_retryable: Tuple[Type[BaseException], ...] = (ValueError, TypeError, KeyError, PermissionError)
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_attempt_seconds = min_attempt_seconds
+        self.non_retryable = non_retryable
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Whether ``error`` could plausibly succeed on another attempt"""
+        if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+            return True
+        if isinstance(error, self.non_retryable) or getattr(error, "retryable", True) is False:
+            return False
+        # postgrest APIError carries the SQLSTATE or PGRST code
+        code = str(getattr(error, "code", "") or "")
+        if code.startswith("PGRST") or code[:2] in NON_RETRYABLE_SQLSTATE_CLASSES:
+            return False
+        return True
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number ``attempt`` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    async def run(
+        self,
+        operation: Callable[[], Awaitable[Any]],
+        name: str = "operation",
+        on_retry: Optional[Callable[[int, BaseException], Awaitable[None]]] = None
+    ) -> Any:
+        """Call ``operation`` until it succeeds, the error is final or the budget runs out"""
+        deadline = get_deadline()
+        slowest_attempt = self.min_attempt_seconds
+
+        for attempt in range(1, self.max_attempts + 1):
+            if deadline is not None:
+                deadline.check(name)
+            started = time.monotonic()
+            try:
+                result = await operation()
+            except Exception as e:
+                slowest_attempt = max(slowest_attempt, time.monotonic() - started)
+
+                if not self.is_retryable(e):
+                    retry_outcomes_total.inc(operation=name, outcome="non_retryable")
+                    raise
+                if attempt == self.max_attempts:
+                    retry_outcomes_total.inc(operation=name, outcome="exhausted")
+                    raise
+
+                delay = self.backoff(attempt)
+                if deadline is not None and deadline.remaining() < delay + slowest_attempt:
+                    retry_outcomes_total.inc(operation=name, outcome="deadline")
+                    raise
+
+                if on_retry is not None:
+                    await on_retry(attempt, e)
+                await asyncio.sleep(delay)
+            else:
+                retry_outcomes_total.inc(operation=name, outcome="success")
+                return result
@@ -0,0 +1,251 @@
+"""
+Key/value state shared by every worker process on a host
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+class SharedState(ABC):
+    """
+    Small key/value store with atomic counters and expiring keys.
+
+    Rate limits, error counts and cached reports go through this interface
+    so they stay correct when the app runs as several worker processes.
+    ``InProcessState`` serves a single process; ``SQLiteState`` shares one
+    database file between all processes on the host. Values must be
+    JSON-serialisable; ``ttl`` is in seconds and applies from when a key is
+    (re)created.
+    """
+
+    @abstractmethod
+    def incr(self, key: str, amount: float = 1, ttl: float = None) -> float:
+        """Atomically add ``amount`` to a counter (created at 0) and return the new value"""
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value of a live key, or ``default``"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float = None):
+        """Store ``value`` under ``key``, replacing any previous value"""
+
+    @abstractmethod
+    def add(self, key: str, value: Any, ttl: float = None) -> bool:
+        """Set ``key`` only if it is absent or expired; True if this call set it"""
+
+    @abstractmethod
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Atomically remove ``key`` and return its value"""
+
+    @abstractmethod
+    def scan(self, prefix: str) -> Dict[str, Any]:
+        """Every live key starting with ``prefix``"""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every key"""
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Backend name and key counts for health reports"""
+
+class InProcessState(SharedState):
+    """``SharedState`` held in a dict; shared by threads, not processes"""
+
+    def __init__(self, purge_every: int = 1000):
+        self._data: Dict[str, list] = {}  # key -> [value, expires_at or None]
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.purge_every = purge_every
+
+    def _live(self, key: str, now: float) -> Optional[list]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def _written(self, now: float):
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            for key in [key for key, (_, expires_at) in self._data.items() if expires_at is not None and expires_at <= now]:
+                del self._data[key]
+
+    def incr(self, key: str, amount: float = 1, ttl: float = None) -> float:
+        now = time.time()
+        with self._lock:
+            entry = self._live(key, now)
+            if entry is None:
+                entry = self._data[key] = [0, now + ttl if ttl else None]
+            entry[0] += amount
+            self._written(now)
+            return entry[0]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._live(key, time.time())
+            return default if entry is None else entry[0]
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        now = time.time()
+        with self._lock:
+            self._data[key] = [value, now + ttl if ttl else None]
+            self._written(now)
+
+    def add(self, key: str, value: Any, ttl: float = None) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._live(key, now) is not None:
+                return False
+            self._data[key] = [value, now + ttl if ttl else None]
+            self._written(now)
+            return True
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._live(key, time.time())
+            if entry is None:
+                return default
+            del self._data[key]
+            return entry[0]
+
+    def scan(self, prefix: str) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            return {
+                key: value for key, (value, expires_at) in self._data.items()
+                if key.startswith(prefix) and (expires_at is None or expires_at > now)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "keys": len(self._data)}
+
+class SQLiteState(SharedState):
+    """
+    ``SharedState`` in a SQLite database that every worker on the host opens.
+
+    Each operation is a single statement in autocommit mode, so SQLite's
+    write lock makes counters and ``add`` atomic across processes; with WAL
+    journaling readers never wait for writers. A write can still wait on
+    another process's lock, so async callers run operations in the thread
+    pool rather than on the event loop.
+    Expired rows are deleted every ``purge_every`` writes. Connections are
+    per process and reopened after fork.
+    """
+
+    def __init__(self, path: str, purge_every: int = 1000):
+        self.path = path
+        self.purge_every = purge_every
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection inherited across fork must not be used by the child
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            # No declared type on value: counters stay numeric, other values are JSON text
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value, expires_at REAL) WITHOUT ROWID"
+            )
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _execute(self, sql: str, parameters=(), write: bool = False) -> list:
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute(sql, parameters).fetchall()
+            if write:
+                self._writes += 1
+                if self._writes % self.purge_every == 0:
+                    connection.execute("DELETE FROM state WHERE expires_at <= ?", (time.time(),))
+            return rows
+
+    @staticmethod
+    def _decode(value: Any) -> Any:
+        return json.loads(value) if isinstance(value, str) else value
+
+    def incr(self, key: str, amount: float = 1, ttl: float = None) -> float:
+        now = time.time()
+        rows = self._execute(
+            "INSERT INTO state (key, value, expires_at) VALUES (?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET"
+            " value = CASE WHEN state.expires_at <= ? THEN excluded.value ELSE state.value + excluded.value END,"
+            " expires_at = CASE WHEN state.expires_at <= ? THEN excluded.expires_at ELSE state.expires_at END"
+            " RETURNING value",
+            (key, amount, now + ttl if ttl else None, now, now),
+            write=True
+        )
+        return rows[0][0]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        rows = self._execute(
+            "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        )
+        return self._decode(rows[0][0]) if rows else default
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        self._execute(
+            "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, default=str), time.time() + ttl if ttl else None),
+            write=True
+        )
+
+    def add(self, key: str, value: Any, ttl: float = None) -> bool:
+        now = time.time()
+        rows = self._execute(
+            "INSERT INTO state (key, value, expires_at) VALUES (?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at"
+            " WHERE state.expires_at <= ?"
+            " RETURNING 1",
+            (key, json.dumps(value, default=str), now + ttl if ttl else None, now),
+            write=True
+        )
+        return bool(rows)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        rows = self._execute(
+            "DELETE FROM state WHERE key = ? RETURNING value, expires_at",
+            (key,),
+            write=True
+        )
+        if not rows or (rows[0][1] is not None and rows[0][1] <= time.time()):
+            return default
+        return self._decode(rows[0][0])
+
+    def scan(self, prefix: str) -> Dict[str, Any]:
+        rows = self._execute(
+            "SELECT key, value FROM state WHERE key >= ? AND key < ? AND (expires_at IS NULL OR expires_at > ?)",
+            (prefix, prefix + "\uffff", time.time())
+        )
+        return {key: self._decode(value) for key, value in rows}
+
+    def clear(self):
+        self._execute("DELETE FROM state", write=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        rows = self._execute("SELECT COUNT(*) FROM state")
+        return {"backend": "sqlite", "path": self.path, "keys": rows[0][0]}
+
+def create_shared_state(path: Optional[str] = None) -> SharedState:
+    """SQLite-backed state when a path is given, otherwise in-process"""
+    return SQLiteState(path) if path else InProcessState()
+
+# Global shared state; set SHARED_STATE_PATH (gunicorn_conf.py does) to share it between workers
+shared_state = create_shared_state(os.environ.get("SHARED_STATE_PATH") or None)
@@ -0,0 +1,185 @@
+"""
+Optional SQLite-backed time series for health and error history across restarts
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+# (resolution_seconds, retention_seconds): minute points for two days,
+# downsampled to hourly points kept for 90 days
+DEFAULT_TIERS = ((60, 2 * 86400), (3600, 90 * 86400))
+
+class TimeSeriesStore:
+    """
+    Compact on-disk store of aggregated numeric series.
+
+    Each recorded value is folded into one row per ``(series, resolution,
+    bucket)`` holding count/sum/min/max, for every resolution tier. Rows older
+    than a tier's retention are pruned, so the fine tier bounds recent detail
+    and the coarse tier keeps long-range trends in a few thousand rows.
+
+    Values are buffered in memory and written in one transaction per flush,
+    normally from a background task, so recording is a dict update. When no
+    path is configured the store is disabled and every call is a no-op.
+    """
+
+    def __init__(self, path: Optional[str] = None, tiers: Tuple[Tuple[int, int], ...] = DEFAULT_TIERS,
+                 flush_interval_seconds: float = 30.0):
+        self.path = path
+        self.tiers = tiers
+        self.flush_interval_seconds = flush_interval_seconds
+        self._pending: Dict[Tuple[str, int, int], List[float]] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"flushes": 0, "rows_written": 0, "rows_pruned": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS points ("
+                " series TEXT NOT NULL, resolution INTEGER NOT NULL, bucket INTEGER NOT NULL,"
+                " count INTEGER NOT NULL, sum REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL,"
+                " PRIMARY KEY (series, resolution, bucket)) WITHOUT ROWID"
+            )
+            self._connection = connection
+        return self._connection
+
+    def record(self, series: str, value: float = 1.0, timestamp: float = None):
+        """Buffer one observation of ``series``"""
+        if not self.enabled:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for resolution, _ in self.tiers:
+                self._merge((series, resolution, int(timestamp - timestamp % resolution)), 1, value, value, value)
+
+    def _merge(self, key: Tuple[str, int, int], count: int, total: float, minimum: float, maximum: float):
+        point = self._pending.get(key)
+        if point is None:
+            self._pending[key] = [count, total, minimum, maximum]
+        else:
+            point[0] += count
+            point[1] += total
+            point[2] = min(point[2], minimum)
+            point[3] = max(point[3], maximum)
+
+    def flush(self, now: float = None):
+        """Write buffered points and prune expired ones in one transaction"""
+        if not self.enabled:
+            return
+        # Swap the buffer out so recording never waits on disk I/O
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        now = time.time() if now is None else now
+
+        with self._db_lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO points (series, resolution, bucket, count, sum, min, max)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                        " ON CONFLICT (series, resolution, bucket) DO UPDATE SET"
+                        " count = count + excluded.count, sum = sum + excluded.sum,"
+                        " min = MIN(min, excluded.min), max = MAX(max, excluded.max)",
+                        [(*key, *point) for key, point in pending.items()]
+                    )
+                    pruned = 0
+                    for resolution, retention in self.tiers:
+                        pruned += connection.execute(
+                            "DELETE FROM points WHERE resolution = ? AND bucket < ?",
+                            (resolution, int(now - retention))
+                        ).rowcount
+            except sqlite3.Error:
+                self.stats["errors"] += 1
+                # Put the points back so the next flush retries them
+                with self._lock:
+                    for key, point in pending.items():
+                        self._merge(key, *point)
+                raise
+        self.stats["flushes"] += 1
+        self.stats["rows_written"] += len(pending)
+        self.stats["rows_pruned"] += pruned
+
+    def query(self, prefix: str, since: float, resolution: int) -> List[Tuple[str, int, int, float, float, float]]:
+        """Rows ``(series, bucket, count, sum, min, max)`` for series starting with ``prefix``"""
+        if not self.enabled:
+            return []
+        with self._db_lock:
+            cursor = self._connect().execute(
+                "SELECT series, bucket, count, sum, min, max FROM points"
+                " WHERE resolution = ? AND bucket >= ? AND series >= ? AND series < ?"
+                " ORDER BY bucket",
+                (resolution, int(since - since % resolution), prefix, prefix + "\uffff")
+            )
+            return cursor.fetchall()
+
+    def totals(self, prefix: str, since: float, resolution: int) -> Dict[str, Dict[str, float]]:
+        """Per-series count and sum since ``since``, including points not yet flushed"""
+        rows = [(series, count, total) for series, _, count, total, _, _ in self.query(prefix, since, resolution)]
+        start = int(since - since % resolution)
+        with self._lock:
+            rows.extend(
+                (series, point[0], point[1])
+                for (series, point_resolution, bucket), point in self._pending.items()
+                if point_resolution == resolution and bucket >= start and series.startswith(prefix)
+            )
+
+        totals = {}
+        for series, count, total in rows:
+            entry = totals.setdefault(series[len(prefix):], {"count": 0, "sum": 0.0})
+            entry["count"] += count
+            entry["sum"] += total
+        return totals
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await loop.run_in_executor(None, self.flush)
+            except Exception as e:
+                logging.getLogger("uspf-inventory").warning(f"Time series flush failed: {str(e)}")
+
+    def start(self):
+        """Start the periodic flush task on the running event loop"""
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write anything still buffered"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if self.enabled:
+            await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "path": self.path, "pending_points": len(self._pending), **self.stats}
+
+# Global time series store, disabled unless METRICS_DB_PATH is set
+timeseries_store = TimeSeriesStore(
+    path=os.environ.get("METRICS_DB_PATH") or None,
+    flush_interval_seconds=float(os.environ.get("METRICS_DB_FLUSH_SECONDS", "30"))
+)
@@ -438,10 +438,20 @@ class USPFInventoryAPITest(unittest.TestCase):
             self.skipTest(f"Health trends endpoint not accessible: {str(e)}")
             
     def test_17_metrics_endpoint(self):
-        """Test metrics endpoint"""
+        """Test metrics endpoints"""
         try:
+            # /metrics is Prometheus text exposition format
             response = requests.get(f"{BACKEND_URL}/metrics")
             
+            self.assertEqual(response.status_code, 200, f"Expected status code 200, got {response.status_code}")
+            self.assertTrue(response.headers.get("Content-Type", "").startswith("text/plain"),
+                            "Metrics should be served as text/plain")
+            self.assertIn("# TYPE ", response.text, "Metrics should include Prometheus TYPE lines")
+            self.assertIn("uspf_http_requests_total", response.text, "Metrics should include request counters")
+            
+            # The JSON summary moved to /metrics/json
+            response = requests.get(f"{BACKEND_URL}/metrics/json")
+            
             self.assertEqual(response.status_code, 200, f"Expected status code 200, got {response.status_code}")
             
             metrics_data = response.json()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Offline API benchmark suite with a local Supabase stand-in.
+
+Boots ``backend/server.py`` in-process and drives it through an ASGI
+transport, so no server, network or Supabase project is needed. Inventory,
+requisitions and BIN cards live in the app's own inventory store, reseeded
+for every run with an optional simulated storage round trip. The Supabase
+client is replaced by a stub whose queries return no rows after a
+configurable delay.
+
+Virtual users pick operations from a weighted mix: login, inventory list,
+BIN card, dashboard, and a requisition create followed by its approval.
+Each user runs for a fixed duration. The report gives throughput and
+p50/p95/p99 latency per route. ``--save-baseline`` stores the report;
+``--baseline`` compares against one and exits non-zero when throughput
+drops, or a route's p95 rises, by more than ``--tolerance``. Baselines are
+only comparable on the same machine with the same settings.
+
+Usage:
+    python benchmarks/api_suite.py --concurrency 32 --duration 15
+    python benchmarks/api_suite.py --save-baseline benchmarks/baselines/api_suite.json
+    python benchmarks/api_suite.py --baseline benchmarks/baselines/api_suite.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+# Read by server.py and utils at import; keep every run self-contained
+os.environ.update({
+    "SUPABASE_URL": "http://supabase.stub",
+    "SUPABASE_SERVICE_ROLE_KEY": "stub",
+    "JWT_SECRET_KEY": os.environ.get("JWT_SECRET_KEY") or "benchmark-secret-key-of-at-least-32-bytes",
+    "RATE_LIMIT_PER_MINUTE": "100000000",
+})
+for name in ("SHARED_STATE_PATH", "INVENTORY_DB_PATH", "METRICS_MULTIPROC_DIR", "METRICS_DB_PATH"):
+    os.environ.pop(name, None)
+
+import httpx
+
+import server
+from utils.database import db_manager
+from utils.inventory_store import RecordWrite, inventory_store
+from utils.logger import logger
+
+# (operation, weight)
+OPERATION_MIX = (
+    ("login", 1),
+    ("list_inventory", 5),
+    ("bin_card", 3),
+    ("dashboard", 2),
+    ("requisition_flow", 1),
+)
+
+LOGIN = {"username": "uspf", "password": "uspf"}
+
+class StubResponse:
+    def __init__(self, data):
+        self.data = data
+        self.count = len(data)
+
+class StubQuery:
+    """Chainable stand-in for a postgrest query; ``execute`` returns no rows after a round trip"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def __getattr__(self, name):
+        # select, eq, limit, order, ... all chain
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self.latency)
+        return StubResponse([])
+
+class StubSupabase:
+    """Supabase client stand-in answering every table query locally"""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+
+    def table(self, name: str) -> StubQuery:
+        return StubQuery(self.latency)
+
+def install_stub_database(latency_ms: float):
+    """Make startup connect ``db_manager`` to the stub instead of Supabase"""
+    async def initialize() -> bool:
+        db_manager.supabase = StubSupabase(latency_ms)
+        return await db_manager.health_check()
+
+    db_manager.initialize = initialize
+
+def add_storage_latency(store, latency_ms: float):
+    """Sleep before every inventory store round trip, like a remote database"""
+    if latency_ms <= 0:
+        return
+    latency = latency_ms / 1000
+
+    def delayed(method):
+        async def wrapper(*args, **kwargs):
+            await asyncio.sleep(latency)
+            return await method(*args, **kwargs)
+        return wrapper
+
+    for name in ("get_item", "list_items", "get_requisition", "list_requisitions",
+                 "get_many", "get_bin_card", "insert", "insert_many", "commit"):
+        setattr(store, name, delayed(getattr(type(store), name).__get__(store)))
+
+async def reseed(stock: int):
+    """Sample data with enough stock that approvals never run out"""
+    server.seed_inventory_store(replace=True)
+    for item in await inventory_store.list_items():
+        await inventory_store.commit([RecordWrite("inventory", {**item, "quantity": item["quantity"] + stock})])
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index] * 1000, 2)
+
+def summarise(latencies, elapsed: float):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "throughput_per_s": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99)
+    }
+
+async def drive(args) -> dict:
+    install_stub_database(args.db_latency_ms)
+    await reseed(args.stock)
+    await server.app.router.startup()
+
+    transport = httpx.ASGITransport(app=server.app, client=("127.0.0.1", 50000))
+    latencies = {}
+    errors = {}
+    recording = False
+
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30.0) as client:
+            async def call(route: str, method: str, path: str, **kwargs) -> httpx.Response:
+                started = time.perf_counter()
+                response = await client.request(method, path, **kwargs)
+                elapsed = time.perf_counter() - started
+                if recording:
+                    if response.status_code < 400:
+                        latencies.setdefault(route, []).append(elapsed)
+                    else:
+                        key = f"{route} {response.status_code}"
+                        errors[key] = errors.get(key, 0) + 1
+                return response
+
+            login = await client.post("/api/auth/login", json=LOGIN)
+            login.raise_for_status()
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            item_ids = [item["id"] for item in await inventory_store.list_items()]
+
+            async def run_operation(operation: str, rng: random.Random):
+                if operation == "login":
+                    await call("POST /api/auth/login", "POST", "/api/auth/login", json=LOGIN)
+                elif operation == "list_inventory":
+                    await call("GET /api/inventory", "GET", "/api/inventory", headers=headers)
+                elif operation == "bin_card":
+                    await call("GET /api/inventory/{item_id}/bin-card", "GET",
+                               f"/api/inventory/{rng.choice(item_ids)}/bin-card", headers=headers)
+                elif operation == "dashboard":
+                    await call("GET /api/dashboard/stats", "GET", "/api/dashboard/stats", headers=headers)
+                elif operation == "requisition_flow":
+                    created = await call("POST /api/requisitions", "POST", "/api/requisitions", headers=headers, json={
+                        "item_id": rng.choice(item_ids),
+                        "requested_quantity": 1,
+                        "purpose": "Benchmark",
+                        "requested_by": "bench"
+                    })
+                    if created.status_code == 200:
+                        await call("PUT /api/requisitions/{requisition_id}", "PUT",
+                                   f"/api/requisitions/{created.json()['id']}", headers=headers,
+                                   json={"status": "approved", "approved_by": "bench"})
+
+            operations = [operation for operation, _ in OPERATION_MIX]
+            weights = [weight for _, weight in OPERATION_MIX]
+
+            async def virtual_user(index: int, stop_at: float):
+                rng = random.Random(args.seed * 100003 + index)
+                while time.monotonic() < stop_at:
+                    await run_operation(rng.choices(operations, weights)[0], rng)
+
+            await asyncio.gather(*(virtual_user(index, time.monotonic() + args.warmup)
+                                   for index in range(args.concurrency)))
+
+            recording = True
+            started = time.monotonic()
+            await asyncio.gather(*(virtual_user(index, started + args.duration)
+                                   for index in range(args.concurrency)))
+            elapsed = time.monotonic() - started
+    finally:
+        await server.app.router.shutdown()
+
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "overall": summarise(everything, elapsed),
+        "errors": errors,
+        "routes": {route: summarise(values, elapsed) for route, values in sorted(latencies.items())}
+    }
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions of ``result`` against ``baseline`` beyond ``tolerance``"""
+    regressions = []
+    base_throughput = baseline["overall"]["throughput_per_s"]
+    throughput = result["overall"]["throughput_per_s"]
+    if base_throughput and throughput < base_throughput * (1 - tolerance):
+        regressions.append(f"throughput {throughput}/s vs baseline {base_throughput}/s")
+    for route, base in baseline["routes"].items():
+        current = result["routes"].get(route)
+        if current is None:
+            regressions.append(f"{route}: no successful requests")
+        elif base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {current['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+    return regressions
+
+def main(args) -> int:
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("baseline", "save_baseline")},
+        **asyncio.run(drive(args))
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        report["baseline"] = {"path": args.baseline, "tolerance": args.tolerance, "regressions": regressions}
+        status = 1 if regressions else 0
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    print(json.dumps(report, indent=2))
+    return status
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline API benchmark with a stub storage backend")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=15.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before measuring")
+    parser.add_argument("--storage-latency-ms", type=float, default=0.0,
+                        help="Simulated round trip added to every inventory store call")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="Latency of stub Supabase queries")
+    parser.add_argument("--stock", type=int, default=10_000_000, help="Stock added to every item so approvals succeed")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the operation mix")
+    parser.add_argument("--baseline", help="Baseline report to compare against; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="Write this run's report as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed fractional drop in throughput or rise in p95 before failing")
+    args = parser.parse_args()
+
+    logger.logger.setLevel(logging.WARNING)
+    add_storage_latency(inventory_store, args.storage_latency_ms)
+    sys.exit(main(args))
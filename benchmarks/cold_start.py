@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: time from process spawn to first response.
+
+Each run starts a fresh single-process uvicorn server for ``server:app`` and
+polls ``/health`` until it answers 200; the time from spawn to that first
+response is what a client waiting on a cold serverless instance sees. It
+also times ``import server`` on its own in a fresh interpreter, the part of
+cold start that lazy imports shorten.
+
+With ``--importtime`` it instead runs ``python -X importtime -c "import
+server"`` and prints the modules with the largest cumulative import time,
+the report kept in ``benchmarks/reports/import_time.txt``.
+
+Usage:
+    python benchmarks/cold_start.py --runs 10
+    python benchmarks/cold_start.py --importtime --top 30 > benchmarks/reports/import_time.txt
+"""
+
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+def server_env() -> dict:
+    env = dict(os.environ)
+    env.update({
+        "LOG_LEVEL": "warning",
+        "JWT_SECRET_KEY": env.get("JWT_SECRET_KEY") or "benchmark-secret",
+        "SUPABASE_URL": env.get("SUPABASE_URL") or "http://127.0.0.1:9",
+        "SUPABASE_SERVICE_ROLE_KEY": env.get("SUPABASE_SERVICE_ROLE_KEY") or "benchmark"
+    })
+    return env
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index] * 1000, 1)
+
+def summarise(durations):
+    durations = sorted(durations)
+    return {
+        "runs": len(durations),
+        "min_ms": percentile(durations, 0.0),
+        "p50_ms": percentile(durations, 0.50),
+        "p95_ms": percentile(durations, 0.95),
+        "max_ms": percentile(durations, 1.0),
+        "mean_ms": round(statistics.mean(durations) * 1000, 1) if durations else None
+    }
+
+def time_import() -> float:
+    """Seconds for ``import server`` in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c",
+         "import time; started = time.perf_counter(); import server; print(time.perf_counter() - started)"],
+        cwd=BACKEND_DIR, env=server_env(), capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+def time_first_response(port: int, timeout: float) -> float:
+    """Seconds from spawning the server to its first 200 on /health"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=server_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5.0) as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if client.get("/health").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                if process.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {process.returncode}")
+                time.sleep(0.005)
+        raise RuntimeError("Server did not answer /health in time")
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+def import_time_report(top: int) -> str:
+    """Largest cumulative import times from ``-X importtime``, as a text table"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR, env=server_env(), capture_output=True, text=True, check=True
+    ).stderr
+
+    rows = []
+    for line in stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative_us), int(self_us), depth, name.strip()))
+
+    total_us = sum(cumulative for cumulative, _, depth, _ in rows if depth == 0)
+    lines = [
+        f"# python -X importtime -c 'import server' (Python {sys.version.split()[0]})",
+        f"# top-level imports total: {total_us / 1000:.1f} ms",
+        f"{'cumulative ms':>14} {'self ms':>9}  module",
+    ]
+    for cumulative, self_us, depth, name in sorted(rows, reverse=True)[:top]:
+        lines.append(f"{cumulative / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{name}")
+    return "\n".join(lines)
+
+def main(args) -> dict:
+    imports = [time_import() for _ in range(args.runs)]
+    first_responses = [time_first_response(args.port, args.timeout) for _ in range(args.runs)]
+    return {
+        "config": vars(args),
+        "import_server": summarise(imports),
+        "time_to_first_response": summarise(first_responses)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start time-to-first-response benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh processes to start")
+    parser.add_argument("--port", type=int, default=8300)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for each server")
+    parser.add_argument("--importtime", action="store_true", help="Print an import-time report instead")
+    parser.add_argument("--top", type=int, default=30, help="Modules in the import-time report")
+    args = parser.parse_args()
+
+    if args.importtime:
+        print(import_time_report(args.top))
+    else:
+        print(json.dumps(main(args), indent=2))
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Contention benchmark for the requisition workflow.
+
+Fires hundreds of concurrent approvals (and optionally fulfilments) at a
+single inventory item and checks that optimistic concurrency never
+over-reserves stock. A configurable read latency simulates the round trip
+to a remote database so that reads and commits genuinely interleave.
+
+Usage:
+    python benchmarks/requisition_contention.py --requisitions 500 --stock 400
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from utils.logger import logger
+from utils.inventory_store import InProcessInventoryStore, VersionConflict
+from utils.requisition_workflow import RequisitionWorkflow, InsufficientStock
+
+class LatencyStore(InProcessInventoryStore):
+    """Inventory store that sleeps before every round trip, like a remote database"""
+
+    def __init__(self, latency_ms: float):
+        super().__init__()
+        self.latency = latency_ms / 1000
+
+    async def get_item(self, item_id):
+        await asyncio.sleep(self.latency)
+        return await super().get_item(item_id)
+
+    async def get_requisition(self, requisition_id):
+        await asyncio.sleep(self.latency)
+        return await super().get_requisition(requisition_id)
+
+    async def commit(self, writes, bin_card_entries=None):
+        # The conditional write is checked when it reaches the store
+        await asyncio.sleep(self.latency)
+        return await super().commit(writes, bin_card_entries)
+
+def build_store(args) -> LatencyStore:
+    store = LatencyStore(args.latency_ms)
+    store.seed(
+        items=[{
+            "id": "bench-item",
+            "name": "Benchmark Item",
+            "category": "Benchmark",
+            "quantity": args.stock,
+            "unit_cost": 1.0,
+            "reorder_level": 0,
+            "department": "Benchmark"
+        }],
+        requisitions=[
+            {
+                "id": f"bench-req-{index:05d}",
+                "item_id": "bench-item",
+                "department": "Benchmark",
+                "requested_quantity": 1,
+                "purpose": "Contention benchmark",
+                "status": "pending",
+                "requested_by": "bench"
+            }
+            for index in range(args.requisitions)
+        ]
+    )
+    return store
+
+async def run_phase(workflow: RequisitionWorkflow, requisition_ids, target_status: str):
+    outcomes = {"ok": 0, "insufficient_stock": 0, "conflict_exhausted": 0}
+
+    async def one(requisition_id):
+        try:
+            await workflow.transition(requisition_id, target_status, actor="bench")
+            outcomes["ok"] += 1
+        except InsufficientStock:
+            outcomes["insufficient_stock"] += 1
+        except VersionConflict:
+            outcomes["conflict_exhausted"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(requisition_id) for requisition_id in requisition_ids))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "status": target_status,
+        "operations": len(requisition_ids),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(requisition_ids) / elapsed, 1) if elapsed else None,
+        "outcomes": outcomes
+    }
+
+async def main(args):
+    store = build_store(args)
+    workflow = RequisitionWorkflow(store, max_attempts=args.max_attempts)
+    requisition_ids = list(store.requisitions)
+
+    phases = [await run_phase(workflow, requisition_ids, "approved")]
+    if args.fulfil:
+        approved = [rid for rid, req in store.requisitions.items() if req["status"] == "approved"]
+        phases.append(await run_phase(workflow, approved, "fulfilled"))
+
+    item = store.items["bench-item"]
+    approved_or_fulfilled = sum(
+        req["requested_quantity"] for req in store.requisitions.values()
+        if req["status"] in ("approved", "fulfilled")
+    )
+    fulfilled = sum(
+        req["requested_quantity"] for req in store.requisitions.values()
+        if req["status"] == "fulfilled"
+    )
+
+    report = {
+        "config": vars(args),
+        "phases": phases,
+        "workflow": workflow.get_stats(),
+        "store": store.get_stats(),
+        "final_item": {
+            "quantity": item["quantity"],
+            "reserved_quantity": item["reserved_quantity"],
+            "version": item["version"]
+        },
+        "invariants": {
+            "never_oversold": approved_or_fulfilled <= args.stock,
+            "reservations_balance": item["reserved_quantity"] == approved_or_fulfilled - fulfilled,
+            "stock_balance": item["quantity"] == args.stock - fulfilled,
+            "bin_card_issues": len(store.bin_cards.get("bench-item", [])) == fulfilled
+        }
+    }
+    print(json.dumps(report, indent=2))
+    return all(report["invariants"].values())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Requisition approval contention benchmark")
+    parser.add_argument("--requisitions", type=int, default=500, help="Concurrent approvals to fire")
+    parser.add_argument("--stock", type=int, default=400, help="Starting quantity of the contended item")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated storage round-trip latency")
+    parser.add_argument("--max-attempts", type=int, default=RequisitionWorkflow().max_attempts,
+                        help="Optimistic retry budget per transition (default: the production setting)")
+    parser.add_argument("--fulfil", action="store_true", help="Fulfil every approved requisition afterwards")
+    args = parser.parse_args()
+
+    logger.logger.setLevel(logging.WARNING)
+    ok = asyncio.run(main(args))
+    sys.exit(0 if ok else 1)
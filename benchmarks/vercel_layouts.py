@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Cold and warm latency: per-function Vercel layout vs single-app mode.
+
+The per-function layout (``vercel.json``) gives every route its own bundle
+and therefore its own cold start. Each of those functions is started here
+as a separate local process and timed from spawn to the first response on
+its route, followed by warm requests. Single-app mode
+(``vercel.single-app.json``) is one process serving ``api/index.py``. It is
+started with ASGI lifespan disabled, as on Vercel. The benchmark times its
+single cold start, the first hit on each route once it is up, and warm
+requests.
+
+The bin-card and create functions are left out: they use package-relative
+imports that only resolve inside Vercel's bundle.
+
+Usage:
+    python benchmarks/vercel_layouts.py --runs 5 --warm-requests 50
+"""
+
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(ROOT_DIR, "api")
+
+LOGIN = {"username": "uspf", "password": "uspf"}
+
+# (method, path, per-function file, auth for the per-function file)
+ROUTES = (
+    ("POST", "/api/auth/login", "auth/login.py", None),
+    ("GET", "/api/health", "health.py", None),
+    ("GET", "/api/auth/me", "auth/me.py", "jwt"),
+    ("GET", "/api/inventory", "inventory/index.py", "jwt"),
+    ("GET", "/api/dashboard/stats", "dashboard/stats.py", "jwt"),
+    ("GET", "/api/requisitions", "requisitions/index.py", "jwt"),
+    # Still on the static demo token
+    ("GET", "/api/reports/low-stock", "reports/low-stock.py", "uspf-token"),
+)
+
+# Serves one per-function file the way its runtime would
+FUNCTION_RUNNER = """
+import os, runpy, sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+path, port = sys.argv[1], int(sys.argv[2])
+sys.path.insert(0, os.path.dirname(path))
+module = runpy.run_path(path)
+handler = module.get("handler")
+if isinstance(handler, type) and issubclass(handler, BaseHTTPRequestHandler):
+    ThreadingHTTPServer(("127.0.0.1", port), handler).serve_forever()
+else:
+    import uvicorn
+    uvicorn.run(module["app"], host="127.0.0.1", port=port, log_level="warning")
+"""
+
+def server_env() -> dict:
+    env = dict(os.environ)
+    env.update({
+        "LOG_LEVEL": "warning",
+        "RATE_LIMIT_PER_MINUTE": "100000000",
+        "JWT_SECRET_KEY": env.get("JWT_SECRET_KEY") or "benchmark-secret",
+        "SUPABASE_URL": env.get("SUPABASE_URL") or "http://127.0.0.1:9",
+        "SUPABASE_SERVICE_ROLE_KEY": env.get("SUPABASE_SERVICE_ROLE_KEY") or "benchmark"
+    })
+    return env
+
+def summarise(durations):
+    durations = sorted(durations)
+    if not durations:
+        return {"requests": 0}
+    return {
+        "requests": len(durations),
+        "p50_ms": round(durations[len(durations) // 2] * 1000, 2),
+        "p95_ms": round(durations[min(len(durations) - 1, int(0.95 * len(durations)))] * 1000, 2),
+        "mean_ms": round(statistics.mean(durations) * 1000, 2)
+    }
+
+def stop(process: subprocess.Popen):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def request(client: httpx.Client, method: str, path: str, token: str = None) -> httpx.Response:
+    headers = {"Authorization": f"Bearer {token}"} if token else None
+    return client.request(method, path, json=LOGIN if method == "POST" else None, headers=headers)
+
+def first_response(process: subprocess.Popen, client: httpx.Client, method: str, path: str,
+                   token: str, started: float, timeout: float) -> httpx.Response:
+    """Poll until the freshly spawned server answers ``path``"""
+    while time.perf_counter() - started < timeout:
+        try:
+            return request(client, method, path, token)
+        except httpx.TransportError:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server for {path} exited with code {process.returncode}")
+            time.sleep(0.005)
+    raise RuntimeError(f"No response on {path} within {timeout}s")
+
+def warm(client: httpx.Client, method: str, path: str, token: str, count: int) -> list:
+    durations = []
+    for _ in range(count):
+        started = time.perf_counter()
+        request(client, method, path, token)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+def run_per_function(args, port: int) -> dict:
+    routes = {}
+    token = None
+    for method, path, filename, auth in ROUTES:
+        route_token = token if auth == "jwt" else auth
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-c", FUNCTION_RUNNER, os.path.join(API_DIR, filename), str(port)],
+            cwd=API_DIR, env=server_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30.0) as client:
+                response = first_response(process, client, method, path, route_token, started, args.timeout)
+                cold = time.perf_counter() - started
+                if path == "/api/auth/login":
+                    token = response.json()["access_token"]
+                routes[path] = {
+                    "status": response.status_code,
+                    "cold_ms": round(cold * 1000, 1),
+                    "warm": warm(client, method, path, route_token, args.warm_requests)
+                }
+        finally:
+            stop(process)
+    return routes
+
+def run_single_app(args, port: int) -> dict:
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "index:app", "--app-dir", API_DIR, "--host", "127.0.0.1",
+         "--port", str(port), "--lifespan", "off", "--log-level", "warning"],
+        cwd=ROOT_DIR, env=server_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    routes = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30.0) as client:
+            response = first_response(process, client, "POST", "/api/auth/login", None, started, args.timeout)
+            cold = time.perf_counter() - started
+            token = response.json()["access_token"]
+            for method, path, _, auth in ROUTES:
+                route_token = token if auth else None
+                hit_started = time.perf_counter()
+                response = request(client, method, path, route_token)
+                routes[path] = {
+                    "status": response.status_code,
+                    "first_hit_ms": round((time.perf_counter() - hit_started) * 1000, 1),
+                    "warm": warm(client, method, path, route_token, args.warm_requests)
+                }
+    finally:
+        stop(process)
+    return {"cold_ms": round(cold * 1000, 1), "routes": routes}
+
+def main(args) -> dict:
+    per_function_runs = [run_per_function(args, args.port) for _ in range(args.runs)]
+    single_app_runs = [run_single_app(args, args.port + 1) for _ in range(args.runs)]
+
+    paths = [path for _, path, _, _ in ROUTES]
+    per_function = {
+        path: {
+            "status": per_function_runs[-1][path]["status"],
+            "cold_p50_ms": round(statistics.median(run[path]["cold_ms"] for run in per_function_runs), 1),
+            "warm": summarise([value for run in per_function_runs for value in run[path]["warm"]])
+        }
+        for path in paths
+    }
+    single_app = {
+        path: {
+            "status": single_app_runs[-1]["routes"][path]["status"],
+            "first_hit_p50_ms": round(statistics.median(run["routes"][path]["first_hit_ms"] for run in single_app_runs), 1),
+            "warm": summarise([value for run in single_app_runs for value in run["routes"][path]["warm"]])
+        }
+        for path in paths
+    }
+    return {
+        "config": vars(args),
+        "per_function": {
+            "cold_starts_to_reach_every_route": len(paths),
+            "total_cold_p50_ms": round(sum(route["cold_p50_ms"] for route in per_function.values()), 1),
+            "routes": per_function
+        },
+        "single_app": {
+            "cold_starts_to_reach_every_route": 1,
+            "cold_p50_ms": round(statistics.median(run["cold_ms"] for run in single_app_runs), 1),
+            "routes": single_app
+        }
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-function vs single-app Vercel layout latency")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per layout")
+    parser.add_argument("--warm-requests", type=int, default=50, help="Sequential warm requests per route")
+    parser.add_argument("--port", type=int, default=8400, help="Port for per-function servers; single-app uses the next")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for each server")
+    args = parser.parse_args()
+
+    print(json.dumps(main(args), indent=2))
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: single-process vs multi-worker server.
+
+Starts ``backend/serve.py`` once per worker count on a local port, drives it
+with a fixed number of concurrent keep-alive clients over a mix of read
+routes for a fixed duration, and reports requests per second and latency
+percentiles for each configuration.
+
+The load generator runs on the same machine and competes for the same
+cores, so absolute numbers understate a dedicated server; the ratio between
+configurations is what this measures. Each run gets a fresh inventory
+database shared by its workers.
+
+Usage:
+    python benchmarks/worker_throughput.py --workers 1,4 --concurrency 64 --duration 15
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+# (path, weight, needs auth)
+ROUTE_MIX = (
+    ("/health", 3, False),
+    ("/api/inventory", 4, True),
+    ("/api/dashboard/stats", 2, True),
+    ("/api/reports/low-stock", 1, True),
+)
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index] * 1000, 2)
+
+def summarise(latencies):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99)
+    }
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "RATE_LIMIT_PER_MINUTE": "100000000",
+        "LOG_LEVEL": "warning",
+        "INVENTORY_DB_PATH": os.path.join(tempfile.mkdtemp(prefix="uspf-bench-inventory-"), "inventory.db"),
+        "METRICS_MULTIPROC_DIR": tempfile.mkdtemp(prefix="uspf-bench-metrics-"),
+        # Tokens must validate in every worker
+        "JWT_SECRET_KEY": env.get("JWT_SECRET_KEY") or "benchmark-secret",
+        "SUPABASE_URL": env.get("SUPABASE_URL") or "http://127.0.0.1:9",
+        "SUPABASE_SERVICE_ROLE_KEY": env.get("SUPABASE_SERVICE_ROLE_KEY") or "benchmark"
+    })
+    return subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "serve.py"), "--workers", str(workers),
+         "--host", "127.0.0.1", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+def stop_server(process: subprocess.Popen):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("Server did not become ready")
+
+async def drive(base_url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        await wait_ready(client)
+        login = await client.post("/api/auth/login", json={"username": args.username, "password": args.password})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        paths = [path for path, _, _ in ROUTE_MIX]
+        weights = [weight for _, weight, _ in ROUTE_MIX]
+        authenticated = {path for path, _, auth in ROUTE_MIX if auth}
+        latencies = {path: [] for path in paths}
+        errors = {}
+
+        async def client_loop(stop_at: float, record: bool):
+            rng = random.Random()
+            while time.monotonic() < stop_at:
+                path = rng.choices(paths, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, headers=headers if path in authenticated else None)
+                    status = response.status_code
+                except httpx.TransportError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - started
+                if not record:
+                    continue
+                if status == 200:
+                    latencies[path].append(elapsed)
+                else:
+                    errors[str(status)] = errors.get(str(status), 0) + 1
+
+        # Warm every worker's connections and caches before measuring
+        await asyncio.gather(*(client_loop(time.monotonic() + args.warmup, False) for _ in range(args.concurrency)))
+
+        started = time.monotonic()
+        await asyncio.gather(*(client_loop(started + args.duration, True) for _ in range(args.concurrency)))
+        elapsed = time.monotonic() - started
+
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_s": round(len(everything) / elapsed, 1),
+        "errors": errors,
+        "overall": summarise(everything),
+        "routes": {path: summarise(values) for path, values in latencies.items()}
+    }
+
+def main(args) -> dict:
+    results = []
+    for index, workers in enumerate(args.workers):
+        port = args.port + index
+        process = start_server(workers, port)
+        try:
+            result = asyncio.run(drive(f"http://127.0.0.1:{port}", args))
+        finally:
+            stop_server(process)
+        results.append({"workers": workers, **result})
+
+    baseline = results[0]["throughput_per_s"] or None
+    for result in results:
+        result["speedup"] = round(result["throughput_per_s"] / baseline, 2) if baseline else None
+
+    return {
+        "config": {**vars(args), "password": "***", "cpu_count": multiprocessing.cpu_count()},
+        "results": results
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single-process vs multi-worker throughput benchmark")
+    parser.add_argument("--workers", default=f"1,{max(2, multiprocessing.cpu_count())}",
+                        type=lambda value: [int(part) for part in value.split(",")],
+                        help="Comma-separated worker counts to compare; the first is the baseline")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent keep-alive clients")
+    parser.add_argument("--duration", type=float, default=15.0, help="Measured seconds per configuration")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before each run")
+    parser.add_argument("--port", type=int, default=8200, help="First port to bind; one per configuration")
+    parser.add_argument("--username", default="uspf")
+    parser.add_argument("--password", default="uspf")
+    args = parser.parse_args()
+
+    print(json.dumps(main(args), indent=2))
@@ -0,0 +1,65 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import server  # noqa: F401  configured from the real environment, before the suite's stubs
+
+SUITE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "api_suite.py")
+
+# The suite points the environment at its stubs on import; keep that out of this process
+with pytest.MonkeyPatch.context() as patch:
+    patch.setattr(os, "environ", os.environ.copy())
+    spec = importlib.util.spec_from_file_location("api_suite", SUITE)
+    api_suite = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(api_suite)
+
+def report(throughput, **p95s):
+    return {
+        "overall": {"throughput_per_s": throughput},
+        "routes": {route: {"p95_ms": p95} for route, p95 in p95s.items()}
+    }
+
+def test_summary_reports_latency_percentiles_in_milliseconds():
+    summary = api_suite.summarise([index / 1000 for index in range(100, 0, -1)], elapsed=2.0)
+
+    assert summary == {"requests": 100, "throughput_per_s": 50.0, "p50_ms": 51.0, "p95_ms": 95.0, "p99_ms": 99.0}
+    assert api_suite.summarise([], elapsed=1.0)["p95_ms"] is None
+
+def test_results_within_tolerance_are_not_regressions():
+    baseline = report(100.0, login=10.0)
+
+    assert api_suite.compare(report(80.0, login=12.5, extra=50.0), baseline, tolerance=0.25) == []
+
+def test_slower_routes_lower_throughput_and_missing_routes_are_regressions():
+    baseline = report(100.0, login=10.0, inventory=20.0, dashboard=5.0)
+
+    regressions = api_suite.compare(report(70.0, login=13.0, inventory=20.0), baseline, tolerance=0.25)
+
+    assert regressions == [
+        "throughput 70.0/s vs baseline 100.0/s",
+        "login: p95 13.0ms vs baseline 10.0ms",
+        "dashboard: no successful requests",
+    ]
+
+def test_a_short_run_exercises_every_route_and_fails_against_a_faster_baseline(tmp_path):
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text(json.dumps(report(10 ** 9)))
+
+    completed = subprocess.run(
+        [sys.executable, SUITE, "--concurrency", "2", "--duration", "0.5", "--warmup", "0",
+         "--db-latency-ms", "0", "--baseline", str(baseline_path)],
+        capture_output=True, text=True, timeout=120
+    )
+    result = json.loads(completed.stdout)
+
+    assert completed.returncode == 1
+    assert result["errors"] == {}
+    assert set(result["routes"]) == {
+        "POST /api/auth/login", "GET /api/inventory", "GET /api/inventory/{item_id}/bin-card",
+        "GET /api/dashboard/stats", "POST /api/requisitions", "PUT /api/requisitions/{requisition_id}",
+    }
+    assert result["baseline"]["regressions"][0].startswith("throughput")
@@ -0,0 +1,25 @@
+import os
+import runpy
+
+from utils.asset_snapshot import AssetSnapshot, qr_code_key
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api")
+
+def test_api_functions_key_qr_codes_like_the_backend():
+    api_qr_codes = runpy.run_path(os.path.join(API_DIR, "_qr_codes.py"))
+    for payload in [*api_qr_codes["SAMPLE_QR_DATA"].values(), {"id": "x", "name": "Ünïcode", "category": None}]:
+        assert api_qr_codes["qr_code_key"](payload) == qr_code_key(payload)
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "snapshot.json")
+    snapshot = AssetSnapshot(path)
+    snapshot.add_qr_code({"id": "inv-001", "name": "HP Laptop"}, "data:image/png;base64,AAAA")
+    snapshot.save()
+
+    loaded = AssetSnapshot(path)
+    assert loaded.load() == 1
+    # Keys ignore payload order
+    assert loaded.qr_code({"name": "HP Laptop", "id": "inv-001"}) == "data:image/png;base64,AAAA"
+    assert loaded.qr_code({"id": "inv-002", "name": "Office Chairs"}) is None
+    assert loaded.get_stats()["hits"] == 1
+    assert loaded.get_stats()["misses"] == 1
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from utils.error_handler import CircuitBreaker, CircuitOpenError, CircuitProbe
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_breaker(**config):
+    clock = FakeClock()
+    config = {"minimum_calls": 4, "failure_rate_threshold": 0.5, "open_seconds": 30.0, "clock": clock, **config}
+    return CircuitBreaker(name="test", **config), clock
+
+def trip(breaker):
+    for _ in range(breaker.minimum_calls):
+        assert breaker.can_execute() is True
+        breaker.record_failure(True)
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_stays_closed_below_minimum_calls():
+    breaker, _ = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_opens_at_the_failure_rate_threshold():
+    breaker, _ = make_breaker()
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.can_execute() is False
+    assert breaker.stats["rejected"] == 1
+
+def test_old_failures_leave_the_window():
+    breaker, clock = make_breaker(window_seconds=60.0, window_buckets=6)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 61
+    breaker.record_failure()
+    assert breaker.window_counts() == (0, 1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_half_open_admits_one_probe_and_closes_on_its_success():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.now += 30
+
+    probe = breaker.can_execute()
+    assert isinstance(probe, CircuitProbe)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.can_execute() is False
+
+    breaker.record_success(probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.window_counts() == (0, 0)
+
+def test_probe_failure_reopens():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.now += 30
+
+    probe = breaker.can_execute()
+    breaker.record_failure(probe)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats["opened"] == 2
+
+def test_late_success_from_a_closed_admission_does_not_close():
+    breaker, clock = make_breaker()
+    slow_call = breaker.can_execute()
+    trip(breaker)
+    clock.now += 30
+
+    probe = breaker.can_execute()
+    breaker.record_success(slow_call)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.probes_in_flight == 1
+
+    breaker.record_success(probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_probe_from_an_earlier_half_open_period_does_not_count():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.now += 30
+    stale = breaker.can_execute()
+    # Some other call fails and the breaker re-opens while ``stale`` is in flight
+    breaker.record_failure()
+    clock.now += 30
+
+    probe = breaker.can_execute()
+    breaker.record_success(stale)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success(probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_released_probe_frees_its_slot_without_closing():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.now += 30
+
+    probe = breaker.can_execute()
+    breaker.release(probe)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.probes_in_flight == 0
+
+    # A settled permit is spent
+    breaker.record_success(probe)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert isinstance(breaker.can_execute(), CircuitProbe)
+
+def test_probes_that_never_report_back_expire():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.now += 30
+    lost = breaker.can_execute()
+    assert breaker.can_execute() is False
+
+    clock.now += 30
+    probe = breaker.can_execute()
+    assert isinstance(probe, CircuitProbe)
+    breaker.record_success(lost)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+def test_call_records_outcomes_and_rejects_when_open():
+    breaker, _ = make_breaker(minimum_calls=1)
+
+    async def ok():
+        return "ok"
+
+    async def broken():
+        raise ConnectionError("down")
+
+    assert asyncio.run(breaker.call(ok)) == "ok"
+    with pytest.raises(ConnectionError):
+        asyncio.run(breaker.call(broken))
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(breaker.call(ok))
@@ -0,0 +1,103 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from utils import middleware
+from utils.middleware import CompressionMiddleware, CompressionStats, _accepted_encodings
+
+PAYLOAD = {"items": [{"id": f"item-{index}", "name": "Bond Paper", "quantity": index} for index in range(200)]}
+
+def make_client(minimum_size=1024):
+    app = FastAPI()
+    stats = CompressionStats()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size, stats=stats)
+
+    @app.get("/json")
+    def large_json():
+        return JSONResponse(PAYLOAD, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    def small_json():
+        return {"ok": True}
+
+    @app.get("/png")
+    def png():
+        return Response(b"\x89PNG" + b"\x00" * 4096, media_type="image/png")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"x" * 4096), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    def stream():
+        async def lines():
+            for item in PAYLOAD["items"]:
+                yield json.dumps(item) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return TestClient(app), stats
+
+def test_accept_encoding_parsing_reads_quality_values():
+    assert _accepted_encodings("gzip, br;q=0.5, identity;q=0, deflate;q=bad") == {
+        "gzip": 1.0, "br": 0.5, "identity": 0.0, "deflate": 0.0
+    }
+
+@pytest.mark.skipif(middleware.brotli is None, reason="brotli not installed")
+def test_brotli_is_preferred_when_accepted():
+    client, stats = make_client()
+    response = client.get("/json", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == PAYLOAD
+    assert stats.compressed["br"]["responses"] == 1
+
+def test_gzip_when_brotli_is_refused():
+    client, stats = make_client()
+    response = client.get("/json", headers={"Accept-Encoding": "br;q=0, gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(json.dumps(PAYLOAD))
+    assert response.json() == PAYLOAD
+    entry = stats.compressed["gzip"]
+    assert entry["bytes_out"] < entry["bytes_in"]
+
+def test_identity_when_nothing_is_accepted():
+    client, stats = make_client()
+    response = client.get("/json", headers={"Accept-Encoding": "gzip;q=0"})
+
+    assert "content-encoding" not in response.headers
+    assert stats.skipped["not_accepted"] == 1
+
+def test_compressed_response_gets_a_weak_etag():
+    client, _ = make_client()
+    response = client.get("/json", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["etag"] == 'W/"v1"'
+
+@pytest.mark.parametrize("path, reason", [
+    ("/small", "too_small"),
+    ("/png", "content_type"),
+    ("/encoded", "already_encoded"),
+])
+def test_responses_that_are_passed_through(path, reason):
+    client, stats = make_client()
+    response = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert stats.skipped[reason] == 1
+    assert stats.compressed == {}
+    if path != "/encoded":
+        assert "content-encoding" not in response.headers
+
+def test_streamed_response_is_compressed_chunk_by_chunk():
+    client, stats = make_client(minimum_size=10)
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert [json.loads(line) for line in response.text.splitlines()] == PAYLOAD["items"]
+    assert stats.compressed["gzip"]["bytes_in"] == sum(len(json.dumps(item)) + 1 for item in PAYLOAD["items"])
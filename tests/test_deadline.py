@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import server
+from utils.deadline import Deadline, DeadlineExceeded, current_deadline, deadline_work_skipped_total, get_deadline, run_in_executor
+from utils.middleware import TimeoutMiddleware
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def skipped(stage):
+    return dict(deadline_work_skipped_total.samples()).get((stage,), 0)
+
+def test_deadline_counts_down_and_can_be_cancelled():
+    clock = FakeClock()
+    deadline = Deadline(5.0, clock=clock)
+    clock.now += 2
+    assert deadline.remaining() == 3.0 and not deadline.expired
+
+    deadline.cancel()
+    assert deadline.remaining() == 0.0 and deadline.expired
+
+def test_check_raises_and_counts_the_skipped_stage():
+    clock = FakeClock()
+    deadline = Deadline(1.0, clock=clock)
+    deadline.check("test_stage")
+    before = skipped("test_stage")
+
+    clock.now += 1
+    with pytest.raises(DeadlineExceeded) as raised:
+        deadline.check("test_stage")
+    assert raised.value.stage == "test_stage"
+    assert skipped("test_stage") == before + 1
+
+def test_executor_work_is_skipped_once_the_request_is_answered():
+    calls = []
+
+    async def scenario(cancelled):
+        deadline = Deadline(10.0)
+        if cancelled:
+            deadline.cancel()
+        current_deadline.set(deadline)
+        return await run_in_executor(calls.append, "ran", stage="test_executor")
+
+    asyncio.run(scenario(cancelled=False))
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario(cancelled=True))
+    assert calls == ["ran"]
+
+def test_timeout_answers_408_and_cancels_the_handler_deadline():
+    app = FastAPI()
+    app.add_middleware(TimeoutMiddleware, timeout_seconds=0.05)
+    seen = {}
+
+    @app.get("/slow")
+    async def slow():
+        seen["deadline"] = get_deadline()
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    response = TestClient(app).get("/slow")
+
+    assert response.status_code == 408
+    assert seen["deadline"].cancelled is True
+
+def test_handlers_let_deadline_exceeded_reach_the_timeout_handler(monkeypatch):
+    async def expired(*args, **kwargs):
+        raise DeadlineExceeded("requisition_workflow")
+
+    monkeypatch.setattr(server.requisition_workflow, "transition", expired)
+    monkeypatch.setattr(server.inventory_store, "list_requisitions", expired)
+    client = TestClient(server.app)
+    token = client.post("/api/auth/login", json={"username": "uspf", "password": "uspf"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for response in (
+        client.put("/api/requisitions/req-001", json={"status": "approved"}, headers=headers),
+        client.get("/api/requisitions", headers=headers),
+    ):
+        assert response.status_code == 408
+        assert response.json()["error"] == "Request Timeout"
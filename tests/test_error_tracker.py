@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from utils.logger import ErrorTracker
+from utils.shared_state import InProcessState
+
+class RecordingLogger:
+    def __init__(self):
+        self.records = []
+
+    def error(self, message, **fields):
+        self.records.append(fields["error_details"])
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(time, "time", fake)
+    return fake
+
+def make_tracker(**config):
+    tracker = ErrorTracker(state=InProcessState(), **config)
+    tracker.logger = RecordingLogger()
+    return tracker
+
+def fail_lookup(key):
+    try:
+        {}[key]
+    except KeyError as e:
+        return e
+
+def fail_parse(text):
+    try:
+        int(text)
+    except ValueError as e:
+        return e
+
+def test_errors_from_one_call_site_share_a_fingerprint():
+    tracker = make_tracker()
+    first = tracker.track_error(fail_lookup("a"))
+    second = tracker.track_error(fail_lookup("b"))
+    other = tracker.track_error(fail_parse("x"))
+
+    assert first["fingerprint"] == second["fingerprint"] != other["fingerprint"]
+    assert second["count"] == 2
+    entry = tracker.fingerprints[first["fingerprint"]]
+    assert entry.message == "'b'"
+    assert entry.location[-1].endswith(":fail_lookup")
+
+def test_repeats_are_logged_once_per_interval_with_a_suppressed_count(clock):
+    tracker = make_tracker(log_interval_seconds=60)
+
+    first = tracker.track_error(fail_lookup("a"))
+    repeats = [tracker.track_error(fail_lookup("a")) for _ in range(3)]
+    clock.now += 60
+    later = tracker.track_error(fail_lookup("a"))
+
+    assert first["logged"] is True and "traceback" in first
+    assert [repeat["logged"] for repeat in repeats] == [False, False, False]
+    assert later["logged"] is True
+    assert later["suppressed_since_last_log"] == 3
+    assert len(tracker.logger.records) == 2
+
+def test_samples_drop_request_headers():
+    tracker = make_tracker()
+    result = tracker.track_error(fail_lookup("a"), context={"path": "/api/inventory", "headers": {"authorization": "Bearer x"}})
+
+    assert tracker.fingerprints[result["fingerprint"]].sample_context == {"path": "/api/inventory"}
+
+def test_least_recently_seen_fingerprint_is_evicted():
+    tracker = make_tracker(max_fingerprints=2)
+    lookup = tracker.track_error(fail_lookup("a"))["fingerprint"]
+    parse = tracker.track_error(fail_parse("x"))["fingerprint"]
+    tracker.track_error(fail_lookup("a"))
+    tracker.track_error(ZeroDivisionError("no traceback"))
+
+    assert list(tracker.fingerprints) == [lookup, tracker._fingerprint(ZeroDivisionError())[0]]
+    assert parse not in tracker.fingerprints
+    assert tracker.state.get(f"errors:fingerprint:{parse}") is None
+    assert tracker.evicted == 1
+
+def test_summary_orders_fingerprints_by_count():
+    tracker = make_tracker()
+    for _ in range(3):
+        tracker.track_error(fail_parse("x"))
+    tracker.track_error(fail_lookup("a"))
+
+    summary = tracker.get_fingerprint_summary(limit=1)
+    assert summary["total_errors"] == 4
+    assert summary["by_type"] == {"ValueError": 3, "KeyError": 1}
+    assert summary["distinct_fingerprints"] == 2
+    assert [(entry["type"], entry["count"]) for entry in summary["fingerprints"]] == [("ValueError", 3)]
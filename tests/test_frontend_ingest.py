@@ -0,0 +1,195 @@
+import asyncio
+import importlib
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from utils.frontend_ingest import FrontendErrorAggregator, FrontendIngestor, PayloadTooLarge, SessionRateLimiter
+
+frontend_ingest_module = importlib.import_module("utils.frontend_ingest")
+
+class RecordingLogger:
+    def __init__(self):
+        self.records = []
+
+    def __getattr__(self, level):
+        return lambda message, **fields: self.records.append((level, message, fields))
+
+def log_entries(count, **fields):
+    return [{"level": "info", "message": f"entry {index}", **fields} for index in range(count)]
+
+def test_read_body_stops_pulling_once_past_the_cap():
+    ingestor = FrontendIngestor(max_payload_bytes=100)
+    pulled = []
+
+    async def chunks():
+        for index in range(50):
+            pulled.append(index)
+            yield b"x" * 30
+
+    with pytest.raises(PayloadTooLarge):
+        asyncio.run(ingestor.read_body(chunks()))
+    assert len(pulled) == 4
+
+def test_read_body_accepts_a_body_at_the_cap():
+    ingestor = FrontendIngestor(max_payload_bytes=100)
+
+    async def chunks():
+        yield b'{"a": "'
+        yield b"x" * 91
+        yield b'"}'
+
+    body = asyncio.run(ingestor.read_body(chunks()))
+    assert len(body) == 100
+    assert ingestor.parse_body(body) == {"a": "x" * 91}
+
+def test_parse_body_rejects_oversized_bodies():
+    with pytest.raises(PayloadTooLarge):
+        FrontendIngestor(max_payload_bytes=10).parse_body(json.dumps(["x" * 20]).encode())
+
+def test_rate_limiter_allows_a_burst_then_refills_at_the_rate():
+    limiter = SessionRateLimiter(rate_per_minute=60, burst=5)
+
+    assert limiter.take("session-a", 8, now=0.0) == 5
+    assert limiter.take("session-a", 1, now=0.5) == 0
+    assert limiter.take("session-a", 5, now=3.0) == 3
+    # Buckets are per session
+    assert limiter.take("session-b", 5, now=3.0) == 5
+    # Refill never exceeds the burst
+    assert limiter.take("session-a", 10, now=1000.0) == 5
+
+def test_rate_limiter_keeps_a_bounded_number_of_sessions():
+    limiter = SessionRateLimiter(burst=1, max_sessions=2)
+    for session in ("a", "b", "c"):
+        limiter.take(session, 1, now=0.0)
+
+    assert list(limiter.buckets) == ["b", "c"]
+
+def test_entries_over_the_request_cap_or_malformed_are_dropped():
+    ingestor = FrontendIngestor(max_entries_per_request=3)
+
+    async def submit():
+        return ingestor.submit("log", "session", [*log_entries(5), "not an entry"])
+
+    assert asyncio.run(submit()) == (3, 3)
+    assert ingestor.stats["dropped_over_cap"] == 3
+    assert len(ingestor.queue) == 3
+
+def test_session_rate_limit_applies_across_requests():
+    ingestor = FrontendIngestor(rate_limiter=SessionRateLimiter(rate_per_minute=0, burst=4))
+
+    async def submit():
+        return [ingestor.submit("log", "session", log_entries(3)) for _ in range(2)]
+
+    assert asyncio.run(submit()) == [(3, 0), (1, 2)]
+    assert ingestor.stats["dropped_rate_limited"] == 2
+
+def test_full_queue_drops_new_entries():
+    ingestor = FrontendIngestor(max_queue=4)
+
+    async def submit():
+        return ingestor.submit("log", "session", log_entries(6))
+
+    assert asyncio.run(submit()) == (4, 2)
+    assert ingestor.stats["dropped_queue_full"] == 2
+
+def test_entries_are_trimmed():
+    ingestor = FrontendIngestor(max_message_chars=10, max_data_bytes=20)
+    entry = ingestor.clean_log({"message": "m" * 50, "data": {"blob": "x" * 50}, "level": "warn"})
+
+    assert entry["message"] == "m" * 10 + "...[truncated]"
+    assert entry["data"]["truncated"] is True
+    assert entry["level"] == "WARN"
+
+def test_flush_writes_one_record_per_level(monkeypatch):
+    recorder = RecordingLogger()
+    monkeypatch.setattr(frontend_ingest_module, "logger", recorder)
+    ingestor = FrontendIngestor()
+
+    async def submit_and_stop():
+        ingestor.submit("log", "session", log_entries(3) + [{"level": "error", "message": "bad"}])
+        await ingestor.stop()
+
+    asyncio.run(submit_and_stop())
+
+    assert [(level, fields["frontend_logs"]["count"]) for level, _, fields in recorder.records] == [("info", 3), ("error", 1)]
+    assert ingestor.stats["flushed"] == 4
+
+def test_oversized_request_is_answered_with_413():
+    response = TestClient(server.app).post(
+        "/api/logs/frontend",
+        content=b"[" + b'"x",' * (server.frontend_ingestor.max_payload_bytes // 4) + b'"x"]',
+        headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 413
+
+def error_report(message="Cannot read properties of undefined (reading 'id')", name="TypeError", stack=None):
+    return {
+        "error_name": name,
+        "error_message": message,
+        "error_stack": stack or (
+            f"{name}: {message}\n"
+            "    at renderItem (https://app.example.com/static/js/main.3f9a1c2b.chunk.js:1:2345)\n"
+            "    at List (https://app.example.com/static/js/main.3f9a1c2b.chunk.js?v=2:1:999)"
+        )
+    }
+
+def test_stacks_normalise_across_builds_and_hosts():
+    aggregator = FrontendErrorAggregator()
+    old_build = aggregator.normalize_stack(error_report()["error_stack"])
+    new_build = aggregator.normalize_stack(
+        "at renderItem (http://localhost:3000/static/js/main.77e0d1aa.chunk.js:3:10)\n"
+        "at List (http://localhost:3000/static/js/main.77e0d1aa.chunk.js:9:1)"
+    )
+
+    assert old_build == new_build == ["at renderItem (/static/js/main.<hash>.chunk.js)", "at List (/static/js/main.<hash>.chunk.js)"]
+    assert aggregator.normalize_message("Item 42 not found (id 9b1deb4d-3b7d-4bad-9bdd-2b0d7b3dcb6d)") == "Item <n> not found (id <n>)"
+
+def test_repeats_within_the_window_are_counted_not_forwarded():
+    aggregator = FrontendErrorAggregator(window_seconds=60)
+
+    first = aggregator.observe(error_report(), now=0.0)
+    duplicates = [aggregator.observe(error_report(message=f"Item {index} missing"), now=1.0) for index in range(2)]
+    same_site = [aggregator.observe(error_report(), now=10.0 + index) for index in range(3)]
+    next_window = aggregator.observe(error_report(), now=61.0)
+
+    assert first["occurrences"] == 1 and first["repeats_in_previous_window"] == 0
+    # A message differing only in numbers is a different fingerprint from the first, but the same as each other
+    assert duplicates[0] is not None and duplicates[1] is None
+    assert same_site == [None, None, None]
+    assert next_window["fingerprint"] == first["fingerprint"]
+    assert next_window["occurrences"] == 5
+    assert next_window["repeats_in_previous_window"] == 3
+    assert aggregator.stats["deduplicated"] == 4
+
+def test_forwarded_reports_are_sampled_per_error_name(monkeypatch):
+    aggregator = FrontendErrorAggregator(sample_rates={"ChunkLoadError": 0.25})
+    monkeypatch.setattr(frontend_ingest_module.random, "random", lambda: 0.5)
+
+    assert aggregator.observe(error_report(name="ChunkLoadError"), now=0.0) is None
+    assert aggregator.observe(error_report(name="TypeError"), now=0.0) is not None
+    assert aggregator.stats["sampled_out"] == 1
+    assert aggregator.summary()["total_reports"] == 2
+
+def test_error_groups_are_bounded():
+    aggregator = FrontendErrorAggregator(max_groups=2)
+    for name in ("TypeError", "RangeError", "SyntaxError"):
+        aggregator.observe(error_report(name=name), now=0.0)
+
+    summary = aggregator.summary()
+    assert (summary["distinct_errors"], summary["evicted_errors"]) == (2, 1)
+    assert {error["name"] for error in summary["errors"]} == {"RangeError", "SyntaxError"}
+
+def test_duplicate_error_reports_are_accepted_but_not_queued():
+    ingestor = FrontendIngestor()
+    report = {"error": {"name": "TypeError", "message": "boom", "stack": "at f (app.js:1:1)"}}
+
+    async def submit():
+        return ingestor.submit("error", "session", [report, report, report])
+
+    assert asyncio.run(submit()) == (3, 0)
+    assert len(ingestor.queue) == 1
+    assert ingestor.get_stats()["errors"]["deduplicated"] == 2
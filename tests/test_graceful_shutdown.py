@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import server
+from utils.error_handler import GracefulShutdown
+
+def test_shutdown_wakes_when_the_last_request_finishes():
+    shutdown = GracefulShutdown()
+
+    async def scenario():
+        for _ in range(2):
+            shutdown.request_started()
+
+        async def finish_later(delay):
+            await asyncio.sleep(delay)
+            shutdown.request_finished()
+
+        finishers = [asyncio.create_task(finish_later(delay)) for delay in (0.01, 0.05)]
+        started = time.monotonic()
+        await shutdown.shutdown(timeout=5)
+        await asyncio.gather(*finishers)
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(scenario())
+
+    assert elapsed < 1
+    assert shutdown.draining is True and shutdown.active_requests == 0
+
+def test_flush_callbacks_run_in_order_after_a_timeout_and_failures():
+    shutdown = GracefulShutdown()
+    shutdown.request_started()
+    flushed = []
+
+    async def failing():
+        flushed.append("logs")
+        raise RuntimeError("queue closed")
+
+    async def metrics():
+        flushed.append("metrics")
+
+    asyncio.run(shutdown.shutdown(timeout=0.01, flush=(failing, metrics)))
+
+    assert flushed == ["logs", "metrics"]
+    assert shutdown.active_requests == 1
+
+def test_finishing_more_requests_than_started_does_not_go_negative():
+    shutdown = GracefulShutdown()
+    shutdown.request_finished()
+
+    assert shutdown.active_requests == 0
+    assert asyncio.run(shutdown.wait_idle(timeout=0.01)) is True
+
+def test_health_reports_503_while_draining(monkeypatch):
+    client = TestClient(server.app)
+    assert client.get("/health").status_code == 200
+
+    monkeypatch.setattr(server.graceful_shutdown, "draining", True)
+    response = client.get("/health")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "draining"
+
+def test_drain_can_only_be_started_locally():
+    assert TestClient(server.app).post("/health/drain").status_code == 403
+    assert server.graceful_shutdown.draining is False
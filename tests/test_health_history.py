@@ -0,0 +1,86 @@
+from utils.health_history import HealthHistory, RingBuffer, Rollup
+
+NOW = 1_700_000_000.0 - 1_700_000_000.0 % 3600
+
+def report(status="healthy", database_ms=10.0, api_ms=2.0, database_status="healthy"):
+    return {
+        "status": status,
+        "checks": {
+            "database": {"status": database_status, "response_time_ms": database_ms},
+            "api": {"status": "healthy", "response_time_ms": api_ms},
+        }
+    }
+
+def test_ring_buffer_keeps_the_newest_samples_oldest_first():
+    ring = RingBuffer(3)
+    assert ring.latest() is None
+    for index in range(5):
+        ring.append(float(index), 0, index * 10.0)
+
+    assert len(ring) == 3
+    assert [timestamp for timestamp, _, _ in ring] == [2.0, 3.0, 4.0]
+    assert ring.latest() == (4.0, 0, 40.0)
+
+def test_rollup_evicts_buckets_past_retention():
+    rollup = Rollup(resolution_seconds=60, retention_seconds=180)
+    for minute in range(10):
+        rollup.add(NOW + minute * 60, 0, {})
+
+    assert list(rollup.buckets) == [NOW + minute * 60 for minute in range(6, 10)]
+
+def test_out_of_order_reports_keep_buckets_sorted():
+    rollup = Rollup(resolution_seconds=60, retention_seconds=3600)
+    for minute in (3, 1, 2):
+        rollup.add(NOW + minute * 60, 0, {})
+
+    assert list(rollup.buckets) == [NOW + 60, NOW + 120, NOW + 180]
+
+def test_trends_aggregate_status_and_response_times():
+    history = HealthHistory()
+    history.record(report(database_ms=10.0), timestamp=NOW)
+    history.record(report(database_ms=30.0), timestamp=NOW + 30)
+    history.record(report(status="warning", database_ms=50.0, database_status="warning"), timestamp=NOW + 90)
+    history.record(report(status="mystery"), timestamp=NOW + 150)
+
+    trends = history.trends(hours=1, now=NOW + 160)
+
+    assert trends["total_reports"] == 4
+    assert trends["status_distribution"] == {"healthy": 2, "warning": 1, "unhealthy": 1}
+    assert trends["uptime_percentage"] == 50.0
+    assert trends["resolution_seconds"] == 60
+    assert trends["average_response_times"]["database"] == {
+        "average_ms": 25.0, "min_ms": 10.0, "max_ms": 50.0, "samples": 4
+    }
+    assert trends["latest_status"] == "unhealthy"
+
+def test_trends_ignore_reports_older_than_the_period():
+    history = HealthHistory()
+    history.record(report(status="unhealthy"), timestamp=NOW - 7200)
+    history.record(report(), timestamp=NOW)
+
+    assert history.trends(hours=1, now=NOW + 60)["status_distribution"]["unhealthy"] == 0
+    assert history.trends(hours=3, now=NOW + 60)["total_reports"] == 2
+
+def test_long_periods_read_hourly_rollups():
+    history = HealthHistory(minute_retention_hours=1)
+    for hour in range(48):
+        history.record(report(), timestamp=NOW + hour * 3600)
+
+    # Reports at hours 23..47 fall within [now - 24h, now]
+    trends = history.trends(hours=24, now=NOW + 47 * 3600)
+    assert trends["resolution_seconds"] == 3600
+    assert trends["buckets"] == 25
+    assert trends["total_reports"] == 25
+
+def test_memory_stays_bounded():
+    history = HealthHistory(samples_per_check=10, minute_retention_hours=1)
+    for index in range(500):
+        history.record(report(), timestamp=NOW + index * 60)
+
+    stats = history.get_stats()
+    assert stats["samples"] == 10
+    assert stats["checks"] == 2
+    assert stats["minute_buckets"] <= 61
+
+def test_no_data_message():
+    assert HealthHistory().trends(hours=1) == {"message": "No recent health data available"}
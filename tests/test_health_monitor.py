@@ -0,0 +1,165 @@
+import asyncio
+import importlib
+import time
+
+from utils.health_monitor import ResourceSample, ResourceSampler, SystemHealthMonitor, check_system_resources
+from utils.shared_state import InProcessState
+
+# ``utils.health_monitor`` the attribute is the global instance, not the module
+health_monitor_module = importlib.import_module("utils.health_monitor")
+
+def make_monitor():
+    monitor = SystemHealthMonitor()
+    monitor.state = InProcessState()
+    monitor.runs = []
+
+    async def run_all_checks():
+        run = len(monitor.runs) + 1
+        release = asyncio.Event()
+        monitor.runs.append(release)
+        await release.wait()
+        return {"status": "healthy", "run": run}
+
+    monitor.run_all_checks = run_all_checks
+    return monitor
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_reports_are_cached_within_the_ttl():
+    async def scenario():
+        monitor = make_monitor()
+        first = asyncio.create_task(monitor.get_report())
+        await settle()
+        monitor.runs[0].set()
+        first = await first
+        second = await monitor.get_report()
+        return monitor, first, second
+
+    monitor, first, second = asyncio.run(scenario())
+
+    assert (first["run"], first["cache"]["hit"]) == (1, False)
+    assert (second["run"], second["cache"]["hit"]) == (1, True)
+    assert len(monitor.runs) == 1
+
+def test_concurrent_callers_share_one_run():
+    async def scenario():
+        monitor = make_monitor()
+        callers = [asyncio.create_task(monitor.get_report()) for _ in range(3)]
+        await settle()
+        monitor.runs[0].set()
+        return monitor, await asyncio.gather(*callers)
+
+    monitor, reports = asyncio.run(scenario())
+
+    assert [report["run"] for report in reports] == [1, 1, 1]
+    assert len(monitor.runs) == 1
+
+def test_fresh_starts_its_own_run_instead_of_joining_one_in_flight():
+    async def scenario():
+        monitor = make_monitor()
+        cached = asyncio.create_task(monitor.get_report())
+        await settle()
+        fresh = asyncio.create_task(monitor.get_report(fresh=True))
+        await settle()
+        assert len(monitor.runs) == 2
+
+        # The fresh run finishes first; the older one must not replace it
+        monitor.runs[1].set()
+        fresh = await fresh
+        monitor.runs[0].set()
+        await cached
+        return fresh, await monitor.get_report()
+
+    fresh, latest = asyncio.run(scenario())
+
+    assert (fresh["run"], fresh["cache"]["hit"]) == (2, False)
+    assert latest["run"] == 2
+
+def test_fresh_ignores_the_shared_cache():
+    async def scenario():
+        monitor = make_monitor()
+        monitor.state.set("health:report", {"report": {"status": "healthy", "run": "other worker"}, "generated_at": 0})
+        shared = await monitor.get_report()
+        fresh = asyncio.create_task(monitor.get_report(fresh=True))
+        await settle()
+        monitor.runs[0].set()
+        return shared, await fresh
+
+    shared, fresh = asyncio.run(scenario())
+
+    assert (shared["run"], shared["cache"]["hit"]) == ("other worker", True)
+    assert fresh["run"] == 1
+
+def make_sampler(monkeypatch, **config):
+    intervals = []
+
+    def cpu_percent(interval=0.0):
+        intervals.append(interval)
+        return 12.5
+
+    monkeypatch.setattr(health_monitor_module.psutil, "cpu_percent", cpu_percent)
+    sampler = ResourceSampler(**config)
+    return sampler, intervals
+
+def reading(timestamp=None, cpu=10.0, memory=40.0, disk=50.0):
+    return ResourceSample(
+        timestamp=time.time() if timestamp is None else timestamp,
+        cpu_percent=cpu,
+        memory_percent=memory,
+        memory_available_mb=1024.0,
+        disk_percent=disk,
+        disk_free_gb=10.0
+    )
+
+def test_samples_never_wait_for_a_cpu_interval(monkeypatch):
+    sampler, intervals = make_sampler(monkeypatch, window_size=3)
+    for _ in range(5):
+        sampler.sample()
+
+    assert set(intervals) == {None}
+    assert len(sampler.samples) == 3
+    assert sampler.samples[-1].cpu_percent == 12.5
+
+def test_latest_reuses_fresh_samples_and_replaces_stale_ones(monkeypatch):
+    sampler, _ = make_sampler(monkeypatch, interval_seconds=5.0)
+    sampler.samples.append(reading(cpu=1.0))
+    assert sampler.latest().cpu_percent == 1.0
+
+    sampler.samples.append(reading(timestamp=time.time() - 60, cpu=2.0))
+    assert sampler.latest().cpu_percent == 12.5
+    assert len(sampler.samples) == 3
+
+def test_averages_cover_the_window(monkeypatch):
+    sampler, _ = make_sampler(monkeypatch)
+    assert sampler.averages() == {"samples": 0}
+
+    sampler.samples.extend([reading(timestamp=100.0, cpu=10.0), reading(timestamp=110.0, cpu=30.0)])
+    averages = sampler.averages()
+    assert (averages["samples"], averages["window_seconds"]) == (2, 10.0)
+    assert (averages["cpu_percent"], averages["cpu_percent_max"]) == (20.0, 30.0)
+
+def test_background_sampling_fills_the_window(monkeypatch):
+    sampler, _ = make_sampler(monkeypatch, interval_seconds=0.01)
+
+    async def scenario():
+        sampler.start()
+        await asyncio.sleep(0.1)
+        await sampler.stop()
+
+    asyncio.run(scenario())
+    assert len(sampler.samples) >= 2
+    assert sampler.task is None
+
+def test_resource_check_reads_the_sampler_and_flags_high_usage(monkeypatch):
+    sampler, _ = make_sampler(monkeypatch)
+    sampler.samples.append(reading(memory=91.0, cpu=85.0))
+    monkeypatch.setattr(health_monitor_module, "resource_sampler", sampler)
+
+    result = asyncio.run(check_system_resources())
+
+    assert result["status"] == "warning"
+    assert len(result["issues"]) == 2
+    assert result["metrics"]["memory_percent"] == 91.0
+    assert result["rolling_averages"]["samples"] == 1
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from fastapi import Request, Response
+
+from utils.http_cache import PRIVATE_REVALIDATE, conditional_response, http_date, make_etag
+
+LAST_MODIFIED = datetime(2025, 3, 1, 12, 30, 15, 250000)
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/inventory",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    })
+
+def test_make_etag_is_weak_and_depends_on_every_part():
+    etag = make_etag("inventory", "epoch-a", 3)
+    assert etag.startswith('W/"')
+    assert etag == make_etag("inventory", "epoch-a", 3)
+    assert etag != make_etag("inventory", "epoch-a", 4)
+    assert etag != make_etag("inventory", "epoch-b", 3)
+
+def test_first_request_gets_validators_and_a_body():
+    response = Response()
+    etag = make_etag("inventory", 1)
+
+    assert conditional_response(make_request(), response, etag, LAST_MODIFIED) is None
+    assert response.headers["etag"] == etag
+    assert response.headers["last-modified"] == http_date(LAST_MODIFIED)
+    assert response.headers["cache-control"] == PRIVATE_REVALIDATE
+
+def test_matching_if_none_match_returns_304_with_the_same_etag():
+    etag = make_etag("inventory", 1)
+
+    not_modified = conditional_response(make_request(if_none_match=etag), Response(), etag, LAST_MODIFIED)
+
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["etag"] == etag
+
+def test_if_none_match_compares_weakly_and_accepts_lists():
+    etag = make_etag("inventory", 1)
+    opaque_tag = etag.removeprefix("W/")
+
+    for header in (opaque_tag, f'"other", {etag}', "*"):
+        assert conditional_response(make_request(if_none_match=header), Response(), etag).status_code == 304
+
+def test_changed_etag_returns_200():
+    response = Response()
+    old = make_etag("inventory", 1)
+    etag = make_etag("inventory", 2)
+
+    assert conditional_response(make_request(if_none_match=old), response, etag, LAST_MODIFIED) is None
+    assert response.headers["etag"] == etag
+
+def test_if_modified_since_uses_second_resolution():
+    etag = make_etag("inventory", 1)
+
+    same_second = make_request(if_modified_since=http_date(LAST_MODIFIED))
+    assert conditional_response(same_second, Response(), etag, LAST_MODIFIED).status_code == 304
+
+    earlier = make_request(if_modified_since=http_date(LAST_MODIFIED - timedelta(seconds=1)))
+    assert conditional_response(earlier, Response(), etag, LAST_MODIFIED) is None
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = make_request(
+        if_none_match=make_etag("inventory", 1),
+        if_modified_since=http_date(LAST_MODIFIED)
+    )
+    assert conditional_response(request, Response(), make_etag("inventory", 2), LAST_MODIFIED) is None
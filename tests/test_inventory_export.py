@@ -0,0 +1,88 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+
+from server import InventoryFilters
+from utils.inventory_export import (
+    EXPORT_WRITERS,
+    ExportFormatError,
+    ensure_export_format,
+    export_columns,
+    export_row,
+)
+from utils.inventory_store import InProcessInventoryStore
+
+ITEMS = [
+    {"id": "item-1", "name": "HP Laptop", "description": "EliteBook", "category": "Electronics",
+     "department": "IT", "quantity": 4, "reserved_quantity": 0, "reorder_level": 5, "unit_cost": 1000.0},
+    {"id": "item-2", "name": "Office Chair", "description": "Ergonomic", "category": "Furniture",
+     "department": "Admin", "quantity": 50, "reserved_quantity": 10, "reorder_level": 10, "unit_cost": 25.5},
+    {"id": "item-3", "name": "Laptop Bag", "description": None, "category": "Electronics",
+     "department": "Admin", "quantity": 12, "reserved_quantity": 10, "reorder_level": 5, "unit_cost": 12.0},
+]
+
+def export(file_format, matches=lambda item: True, include_qr=False):
+    store = InProcessInventoryStore()
+    store.seed(items=ITEMS)
+
+    async def collect():
+        body = EXPORT_WRITERS[file_format](store.iter_items(matches), export_columns(include_qr))
+        return [chunk async for chunk in body]
+
+    return asyncio.run(collect())
+
+def csv_rows(chunks):
+    return list(csv.DictReader(io.StringIO("".join(chunks))))
+
+def test_export_row_adds_valuation_and_serialises_dates():
+    item = {**ITEMS[1], "created_at": datetime(2025, 1, 2, 3, 4, 5)}
+    row = export_row(item, export_columns())
+
+    assert row["total_value"] == 1275.0
+    assert row["created_at"] == "2025-01-02T03:04:05"
+    assert row["updated_at"] is None
+
+def test_qr_column_only_when_requested():
+    assert "qr_code" not in export_columns()
+    assert export_columns(include_qr=True)[-1] == "qr_code"
+
+def test_csv_export_streams_every_row_under_one_header():
+    rows = csv_rows(export("csv"))
+
+    assert [row["id"] for row in rows] == ["item-1", "item-2", "item-3"]
+    assert rows[0]["total_value"] == "4000.0"
+
+def test_ndjson_export_has_one_object_per_line():
+    lines = "".join(export("ndjson")).splitlines()
+
+    assert [json.loads(line)["name"] for line in lines] == ["HP Laptop", "Office Chair", "Laptop Bag"]
+
+def test_xlsx_export_is_a_readable_workbook():
+    workbook = load_workbook(io.BytesIO(b"".join(export("xlsx"))), read_only=True)
+    rows = list(workbook.active.iter_rows(values_only=True))
+
+    assert list(rows[0]) == export_columns()
+    assert [row[0] for row in rows[1:]] == ["item-1", "item-2", "item-3"]
+
+def test_unsupported_format_fails_before_streaming():
+    with pytest.raises(ExportFormatError):
+        ensure_export_format("pdf")
+
+@pytest.mark.parametrize("filters, expected", [
+    ({"category": "Electronics"}, ["item-1", "item-3"]),
+    ({"department": "Admin"}, ["item-2", "item-3"]),
+    ({"search": "LAPTOP"}, ["item-1", "item-3"]),
+    ({"search": "ergonomic"}, ["item-2"]),
+    # Low stock compares available (quantity less reserved) stock to the reorder level
+    ({"low_stock": True}, ["item-1", "item-3"]),
+    ({"category": "Electronics", "department": "Admin", "low_stock": True}, ["item-3"]),
+])
+def test_export_applies_inventory_filters(filters, expected):
+    rows = csv_rows(export("csv", InventoryFilters(**filters).matches))
+
+    assert [row["id"] for row in rows] == expected
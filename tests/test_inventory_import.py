@@ -0,0 +1,105 @@
+import asyncio
+import io
+from typing import Optional
+
+from pydantic import BaseModel
+
+from utils.error_handler import CircuitBreaker
+from utils.inventory_import import ImportJobRegistry, InventoryImporter, QRCodeQueue, iter_csv_rows
+from utils.inventory_store import InProcessInventoryStore
+from utils.shared_state import InProcessState
+
+class ItemRow(BaseModel):
+    name: str
+    category: str = "Office"
+    quantity: int = 0
+    department: Optional[str] = None
+
+def validate(row):
+    return ItemRow(**row).model_dump()
+
+def csv_rows(text):
+    return iter_csv_rows(io.BytesIO(text.encode()))
+
+def make_importer(**config):
+    store = InProcessInventoryStore()
+    jobs = ImportJobRegistry(state=InProcessState())
+    qr_queue = QRCodeQueue(store=store, breaker=CircuitBreaker(name="test"), jobs=jobs)
+    qr_queue.generator = lambda payload: f"qr:{payload['id']}"
+    return InventoryImporter(store=store, qr_queue=qr_queue, jobs=jobs, **config)
+
+def run_import(importer, text):
+    async def run():
+        job = await importer.jobs.create("items.csv")
+        await importer.run(job, csv_rows(text), validate)
+        if importer.qr_queue.queue is not None:
+            await importer.qr_queue.queue.join()
+        await importer.qr_queue.stop()
+        return job
+
+    return asyncio.run(run())
+
+def test_invalid_rows_are_reported_by_line_and_field():
+    importer = make_importer()
+    job = run_import(importer, "name,quantity\nStapler,3\n,2\nPaper,lots\nPens,0\n")
+
+    assert (job.rows_processed, job.rows_imported, job.rows_failed) == (4, 2, 2)
+    assert [error["row"] for error in job.errors] == [3, 4]
+    assert job.errors[0]["errors"][0]["field"] == "name"
+    assert job.errors[1]["errors"][0]["field"] == "quantity"
+    assert job.status == "completed"
+    assert (job.qr_codes_generated, job.qr_codes_pending) == (2, 0)
+
+    items = asyncio.run(importer.store.list_items())
+    assert sorted(item["name"] for item in items) == ["Pens", "Stapler"]
+    assert all(item["qr_code"].startswith("qr:") for item in items)
+
+def test_error_report_is_capped():
+    importer = make_importer(max_reported_errors=2)
+    job = run_import(importer, "name,quantity\n" + ",1\n" * 5)
+
+    assert job.rows_failed == 5
+    assert len(job.errors) == 2
+    assert job.errors_truncated is True
+
+def test_rows_are_inserted_in_batches_with_a_bin_card_entry_for_stock():
+    importer = make_importer(batch_size=2)
+    batches = []
+    insert_many = importer.store.insert_many
+
+    async def record_batch(collection, records, entries=None):
+        batches.append(len(records))
+        return await insert_many(collection, records, entries)
+
+    importer.store.insert_many = record_batch
+    run_import(importer, "name,quantity\n" + "".join(f"Item {index},{index}\n" for index in range(5)))
+
+    assert batches == [2, 2, 1]
+    items = asyncio.run(importer.store.list_items())
+    assert len(items) == 5
+    # Item 0 has no opening stock, so no BIN card entry
+    assert [len(asyncio.run(importer.store.get_bin_card(item["id"]))) for item in items] == [0, 1, 1, 1, 1]
+
+def test_import_stops_at_max_rows():
+    importer = make_importer(batch_size=2, max_rows=3)
+    job = run_import(importer, "name\n" + "".join(f"Item {index}\n" for index in range(10)))
+
+    assert (job.rows_processed, job.rows_imported) == (3, 3)
+    assert job.message == "Stopped after 3 rows"
+
+def test_unreadable_file_fails_the_job():
+    job = run_import(make_importer(), "")
+
+    assert job.status == "failed"
+    assert job.message == "CSV file has no header row"
+
+def test_progress_is_visible_to_another_registry_on_the_same_state():
+    importer = make_importer()
+    job = run_import(importer, "name,quantity\nStapler,3\n,1\n")
+    other_worker = ImportJobRegistry(state=importer.jobs.state)
+
+    published = asyncio.run(other_worker.get(job.id))
+    assert published == job.to_dict()
+    assert published["status"] == "completed"
+    assert published["errors"][0]["row"] == 3
+    assert asyncio.run(other_worker.get("missing")) is None
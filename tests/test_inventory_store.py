@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from utils.inventory_store import (
+    InProcessInventoryStore,
+    RecordNotFound,
+    RecordWrite,
+    SQLiteInventoryStore,
+    VersionConflict,
+)
+from utils.requisition_workflow import InsufficientStock, RequisitionWorkflow
+
+ITEMS = [
+    {"id": "item-1", "name": "Bond Paper", "quantity": 10},
+    {"id": "item-2", "name": "Stapler", "quantity": 5},
+]
+REQUISITIONS = [
+    {"id": "req-1", "item_id": "item-1", "requested_quantity": 2, "status": "pending"},
+]
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = InProcessInventoryStore() if request.param == "memory" else SQLiteInventoryStore(str(tmp_path / "inventory.db"))
+    store.seed(items=ITEMS, requisitions=REQUISITIONS)
+    return store
+
+def get_item(store, item_id):
+    return asyncio.run(store.get_item(item_id))
+
+def test_commit_bumps_version_and_posts_bin_card(store):
+    item = get_item(store, "item-1")
+    item["quantity"] = 8
+
+    result = asyncio.run(store.commit(
+        [RecordWrite("inventory", item)],
+        [{"item_id": "item-1", "transaction_type": "issue", "quantity": 2, "balance": 8}]
+    ))
+
+    assert result.records["item-1"]["version"] == 2
+    assert result.bin_card_entries[0]["id"]
+    assert get_item(store, "item-1")["quantity"] == 8
+    assert [entry["quantity"] for entry in asyncio.run(store.get_bin_card("item-1"))] == [2]
+    assert asyncio.run(store.bin_card_state("item-1")) == (1, result.bin_card_entries[0]["id"])
+    assert store.stats["commits"] == 1
+
+def test_stale_version_is_rejected(store):
+    first = get_item(store, "item-1")
+    second = get_item(store, "item-1")
+
+    first["quantity"] = 9
+    asyncio.run(store.commit([RecordWrite("inventory", first)]))
+
+    second["quantity"] = 7
+    with pytest.raises(VersionConflict):
+        asyncio.run(store.commit([RecordWrite("inventory", second)]))
+
+    stored = get_item(store, "item-1")
+    assert (stored["quantity"], stored["version"]) == (9, 2)
+    assert store.stats["conflicts"] == 1
+
+def test_conflict_on_one_write_applies_none(store):
+    item = get_item(store, "item-1")
+    requisition = asyncio.run(store.get_requisition("req-1"))
+    requisition["version"] = 0
+    item["quantity"] = 1
+    before = asyncio.run(store.collection_state("inventory"))
+
+    with pytest.raises(VersionConflict):
+        asyncio.run(store.commit(
+            [RecordWrite("inventory", item), RecordWrite("requisitions", requisition)],
+            [{"item_id": "item-1", "transaction_type": "issue", "quantity": 9, "balance": 1}]
+        ))
+
+    stored = get_item(store, "item-1")
+    assert (stored["quantity"], stored["version"]) == (10, 1)
+    assert asyncio.run(store.get_bin_card("item-1")) == []
+    assert asyncio.run(store.collection_state("inventory")).version == before.version
+
+def test_commit_of_missing_record_raises_not_found(store):
+    with pytest.raises(RecordNotFound):
+        asyncio.run(store.commit([RecordWrite("inventory", {"id": "missing", "version": 1})]))
+
+def test_insert_of_existing_id_conflicts(store):
+    with pytest.raises(VersionConflict):
+        asyncio.run(store.insert("inventory", {"id": "item-2", "name": "Stapler"}))
+
+def test_insert_many_is_all_or_nothing(store):
+    with pytest.raises(VersionConflict):
+        asyncio.run(store.insert_many("inventory", [{"id": "item-3"}, {"id": "item-1"}]))
+
+    assert get_item(store, "item-3") is None
+    assert asyncio.run(store.insert_many("inventory", [{"id": "item-3"}, {"id": "item-4"}])) == 2
+    assert [item["id"] for item in asyncio.run(store.list_items())] == ["item-1", "item-2", "item-3", "item-4"]
+
+def test_reads_return_copies(store):
+    item = get_item(store, "item-1")
+    item["quantity"] = 0
+    assert get_item(store, "item-1")["quantity"] == 10
+
+def test_collection_state_changes_on_write_and_epoch_on_seed(store):
+    before = asyncio.run(store.collection_state("inventory"))
+    item = get_item(store, "item-1")
+    asyncio.run(store.commit([RecordWrite("inventory", item)]))
+    after = asyncio.run(store.collection_state("inventory"))
+
+    assert after.epoch == before.epoch
+    assert after.version == before.version + 1
+
+    store.seed(items=ITEMS)
+    assert asyncio.run(store.collection_state("inventory")).epoch != before.epoch
+
+def test_seed_without_replace_keeps_existing_data(store):
+    item = get_item(store, "item-1")
+    item["quantity"] = 3
+    asyncio.run(store.commit([RecordWrite("inventory", item)]))
+
+    assert store.seed(items=ITEMS, replace=False) is False
+    assert get_item(store, "item-1")["quantity"] == 3
+
+def test_iter_items_filters_across_pages(tmp_path):
+    store = SQLiteInventoryStore(str(tmp_path / "inventory.db"), page_size=2)
+    store.seed(items=[{"id": f"item-{index}", "quantity": index} for index in range(5)])
+
+    async def collect():
+        return [item["id"] async for item in store.iter_items(lambda item: item["quantity"] % 2 == 0)]
+
+    assert asyncio.run(collect()) == ["item-0", "item-2", "item-4"]
+
+def test_sqlite_data_survives_reopening(tmp_path):
+    path = str(tmp_path / "inventory.db")
+    store = SQLiteInventoryStore(path)
+    store.seed(items=ITEMS)
+    item = get_item(store, "item-1")
+    item["quantity"] = 4
+    asyncio.run(store.commit([RecordWrite("inventory", item)]))
+
+    reopened = SQLiteInventoryStore(path)
+    assert get_item(reopened, "item-1")["quantity"] == 4
+    assert asyncio.run(reopened.collection_state("inventory")) == asyncio.run(store.collection_state("inventory"))
+
+def test_sqlite_stores_sharing_a_file_never_over_reserve(tmp_path):
+    # Two stores on one file stand in for two worker processes
+    path = str(tmp_path / "inventory.db")
+    SQLiteInventoryStore(path).seed(
+        items=[{"id": "item-1", "name": "Bond Paper", "quantity": 10}],
+        requisitions=[
+            {"id": f"req-{index}", "item_id": "item-1", "requested_quantity": 3, "status": "pending"}
+            for index in range(6)
+        ]
+    )
+    workers = [RequisitionWorkflow(SQLiteInventoryStore(path), backoff_ms=1) for _ in range(2)]
+
+    async def approve_all():
+        return await asyncio.gather(
+            *(workers[index % 2].transition(f"req-{index}", "approved") for index in range(6)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(approve_all())
+
+    assert sum(isinstance(result, dict) for result in results) == 3
+    assert sum(isinstance(result, InsufficientStock) for result in results) == 3
+    assert get_item(SQLiteInventoryStore(path), "item-1")["reserved_quantity"] == 9
@@ -0,0 +1,91 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils.metrics import MetricsRegistry, http_requests_total, merge_snapshots
+from utils.middleware import MetricsMiddleware
+
+def sample_lines(text, name):
+    return [line for line in text.splitlines() if line.startswith(name) and not line.startswith("#")]
+
+def test_counter_renders_help_type_and_escaped_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs run", ("queue",))
+    counter.inc(queue='say "hi"\n')
+    counter.inc(2, queue="bulk")
+
+    text = registry.render()
+
+    assert "# HELP jobs_total Jobs run" in text
+    assert "# TYPE jobs_total counter" in text
+    assert sample_lines(text, "jobs_total") == [
+        'jobs_total{queue="bulk"} 2',
+        'jobs_total{queue="say \\"hi\\"\\n"} 1',
+    ]
+
+def test_registering_a_name_twice_returns_the_first_metric():
+    registry = MetricsRegistry()
+    first = registry.counter("jobs_total", "Jobs run")
+    assert registry.counter("jobs_total", "Other help") is first
+
+def test_histogram_buckets_are_cumulative_with_inf_sum_and_count():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route="/a")
+
+    assert sample_lines(registry.render(), "latency_seconds") == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+def test_gauge_callback_is_read_at_scrape_time():
+    registry = MetricsRegistry()
+    level = {"value": 1}
+    registry.gauge("queue_depth", "Queued jobs", callback=lambda: [({}, level["value"])])
+    level["value"] = 7
+
+    assert sample_lines(registry.render(), "queue_depth") == ["queue_depth 7"]
+
+def test_merged_snapshots_sum_counters_and_histograms_and_label_gauges_by_worker():
+    def worker_snapshot(requests, latency, depth):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests", ("route",)).inc(requests, route="/a")
+        registry.histogram("latency_seconds", "Latency", buckets=(1.0,)).observe(latency)
+        registry.gauge("queue_depth", "Queued jobs").set(depth)
+        return registry.snapshot()
+
+    merged = merge_snapshots([
+        ("101", worker_snapshot(2, 0.5, 3)),
+        ("102", worker_snapshot(5, 2.0, 4)),
+        (None, worker_snapshot(10, 0.2, 99)),
+    ]).render()
+
+    assert sample_lines(merged, "requests_total") == ['requests_total{route="/a"} 17']
+    assert 'latency_seconds_bucket{le="1"} 2' in merged
+    assert "latency_seconds_count 3" in merged
+    # Retired workers contribute no gauges
+    assert sample_lines(merged, "queue_depth") == ['queue_depth{worker="101"} 3', 'queue_depth{worker="102"} 4']
+
+def test_requests_are_labelled_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics-test/{item_id}")
+    def read(item_id: str):
+        return {"id": item_id}
+
+    def count(route, status):
+        key = ("GET", route, status)
+        return dict(http_requests_total.samples()).get(key, 0)
+
+    before = count("/metrics-test/{item_id}", "200"), count("unmatched", "404")
+    client = TestClient(app)
+    client.get("/metrics-test/1")
+    client.get("/metrics-test/2")
+    client.get("/no-such-route")
+
+    assert count("/metrics-test/{item_id}", "200") == before[0] + 2
+    assert count("unmatched", "404") == before[1] + 1
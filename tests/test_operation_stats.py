@@ -0,0 +1,91 @@
+import asyncio
+import random
+
+import pytest
+
+from utils.logger import PerformanceMonitor, monitor_performance
+from utils.metrics import OperationAggregator, operation_stats
+
+class RecordingLogger:
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, message, **fields):
+        self.warnings.append((message, fields))
+
+def test_summary_counts_errors_and_extremes():
+    stats = OperationAggregator()
+    for duration in (2.0, 4.0, 6.0):
+        stats.record("query", duration)
+    stats.record("query", 8.0, success=False)
+
+    summary = stats.snapshot()["query"]
+    assert (summary["count"], summary["errors"]) == (4, 1)
+    assert (summary["min_ms"], summary["max_ms"], summary["mean_ms"], summary["sum_ms"]) == (2.0, 8.0, 5.0, 20.0)
+
+def test_percentiles_stay_within_the_relative_error():
+    stats = OperationAggregator(relative_error=0.01)
+    rng = random.Random(7)
+    durations = [rng.uniform(1, 1000) for _ in range(20000)]
+    for duration in durations:
+        stats.record("render", duration)
+
+    summary = stats.snapshot()["render"]
+    ordered = sorted(durations)
+    for key, quantile in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+        exact = ordered[int(quantile * len(ordered)) - 1]
+        assert summary[key] == pytest.approx(exact, rel=0.03)
+
+def test_memory_is_bounded_by_the_dynamic_range():
+    stats = OperationAggregator(relative_error=0.01)
+    for index in range(50000):
+        stats.record("login", 1 + index % 100)
+
+    # 1ms..100ms at 2% bucket width is a few hundred buckets, not 50k samples
+    assert len(stats._operations["login"].buckets) < 300
+
+def test_percentiles_never_leave_the_observed_range():
+    stats = OperationAggregator()
+    stats.record("single", 42.0)
+
+    summary = stats.snapshot()["single"]
+    assert summary["p50_ms"] == summary["p99_ms"] == 42.0
+
+def test_decorator_records_sync_and_async_calls_and_failures():
+    @monitor_performance("test_sync_operation")
+    def sync_operation():
+        return "done"
+
+    @monitor_performance("test_async_operation")
+    async def async_operation(fail):
+        if fail:
+            raise ValueError("boom")
+        return "done"
+
+    before = operation_stats.snapshot()
+    assert sync_operation() == "done"
+    assert asyncio.run(async_operation(False)) == "done"
+    with pytest.raises(ValueError):
+        asyncio.run(async_operation(True))
+
+    after = operation_stats.snapshot()
+    count = lambda report, name: report.get(name, {}).get("count", 0)
+    assert count(after, "test_sync_operation") == count(before, "test_sync_operation") + 1
+    assert count(after, "test_async_operation") == count(before, "test_async_operation") + 2
+    assert after["test_async_operation"]["errors"] >= 1
+
+def test_only_slow_calls_are_logged(monkeypatch):
+    recorder = RecordingLogger()
+    with PerformanceMonitor("fast_operation", recorder):
+        pass
+    assert recorder.warnings == []
+
+    monkeypatch.setattr(PerformanceMonitor, "slow_threshold_ms", 0.0)
+    with pytest.raises(KeyError):
+        with PerformanceMonitor("slow_operation", recorder):
+            raise KeyError("missing")
+
+    message, fields = recorder.warnings[0]
+    assert "slow_operation" in message
+    assert fields["performance"]["success"] is False
+    assert fields["performance"]["error_type"] == "KeyError"
@@ -0,0 +1,207 @@
+import asyncio
+
+import pytest
+
+from utils.inventory_store import InProcessInventoryStore, RecordWrite, VersionConflict
+from utils.requisition_workflow import (
+    InsufficientStock,
+    InvalidTransition,
+    RequisitionWorkflow,
+    TransitionPlan,
+    apply_transition,
+)
+
+def make_item(quantity=10, reserved=0):
+    return {"id": "item-1", "name": "Bond Paper", "quantity": quantity, "reserved_quantity": reserved}
+
+def make_requisition(status="pending", quantity=4):
+    return {
+        "id": "req-1",
+        "item_id": "item-1",
+        "requested_quantity": quantity,
+        "status": status,
+        "department": "Supply",
+        "purpose": "Office use"
+    }
+
+def make_store(stock=10, requisitions=1, quantity=4):
+    store = InProcessInventoryStore()
+    store.seed(
+        items=[make_item(quantity=stock)],
+        requisitions=[
+            {**make_requisition(quantity=quantity), "id": f"req-{index}"}
+            for index in range(1, requisitions + 1)
+        ]
+    )
+    return store
+
+def test_approval_reserves_stock():
+    plan = TransitionPlan()
+    item = make_item()
+    requisition = make_requisition()
+
+    apply_transition(plan, requisition, item, "approved", "officer")
+
+    assert item["reserved_quantity"] == 4
+    assert item["quantity"] == 10
+    assert requisition["status"] == "approved"
+    assert requisition["approved_by"] == "officer"
+    assert plan.bin_card_entries == []
+    assert [write.collection for write in plan.writes()] == ["inventory", "requisitions"]
+
+def test_approval_beyond_available_stock_is_refused():
+    plan = TransitionPlan()
+    item = make_item(quantity=10, reserved=8)
+    requisition = make_requisition(quantity=4)
+
+    with pytest.raises(InsufficientStock):
+        apply_transition(plan, requisition, item, "approved")
+
+    assert item["reserved_quantity"] == 8
+    assert requisition["status"] == "pending"
+    assert not plan.requisitions
+
+def test_rejecting_an_approval_releases_the_reservation():
+    item = make_item(reserved=4)
+    requisition = make_requisition(status="approved")
+
+    apply_transition(TransitionPlan(), requisition, item, "rejected")
+
+    assert item["reserved_quantity"] == 0
+    assert requisition["status"] == "rejected"
+
+def test_fulfilment_issues_stock_and_posts_bin_card():
+    plan = TransitionPlan()
+    item = make_item(reserved=4)
+    requisition = make_requisition(status="approved")
+
+    apply_transition(plan, requisition, item, "fulfilled", "clerk")
+
+    assert item["quantity"] == 6
+    assert item["reserved_quantity"] == 0
+    assert plan.bin_card_entries == [{
+        "item_id": "item-1",
+        "transaction_type": "issue",
+        "quantity": 4,
+        "balance": 6,
+        "reference_number": "REQ-req-1",
+        "department": "Supply",
+        "remarks": "Office use"
+    }]
+
+@pytest.mark.parametrize("current, target", [
+    ("pending", "fulfilled"),
+    ("rejected", "approved"),
+    ("fulfilled", "rejected"),
+])
+def test_disallowed_transitions_raise(current, target):
+    item = make_item()
+    requisition = make_requisition(status=current)
+
+    with pytest.raises(InvalidTransition):
+        apply_transition(TransitionPlan(), requisition, item, target)
+
+    assert requisition["status"] == current
+
+def test_transition_commits_requisition_and_item():
+    store = make_store()
+    workflow = RequisitionWorkflow(store)
+
+    stored = asyncio.run(workflow.transition("req-1", "approved", "officer"))
+
+    assert stored["status"] == "approved"
+    assert stored["version"] == 2
+    assert store.items["item-1"]["reserved_quantity"] == 4
+    assert workflow.get_stats()["transitions"] == 1
+
+def test_concurrent_approvals_never_over_reserve():
+    store = make_store(stock=10, requisitions=5, quantity=3)
+    workflow = RequisitionWorkflow(store)
+
+    async def approve_all():
+        return await asyncio.gather(
+            *(workflow.transition(f"req-{index}", "approved") for index in range(1, 6)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(approve_all())
+
+    approved = [result for result in results if isinstance(result, dict)]
+    refused = [result for result in results if isinstance(result, InsufficientStock)]
+    assert len(approved) == 3
+    assert len(refused) == 2
+    assert store.items["item-1"]["reserved_quantity"] == 9
+    assert workflow.get_stats()["exhausted"] == 0
+
+def test_exhausted_retries_raise_version_conflict():
+    store = make_store()
+
+    async def always_conflict(writes, bin_card_entries=None):
+        raise VersionConflict("stale")
+
+    store.commit = always_conflict
+    workflow = RequisitionWorkflow(store, max_attempts=3, backoff_ms=0)
+
+    with pytest.raises(VersionConflict):
+        asyncio.run(workflow.transition("req-1", "approved"))
+
+    assert workflow.get_stats() == {"transitions": 0, "conflicts": 3, "exhausted": 1}
+
+def test_bulk_transition_validates_in_request_order():
+    store = make_store(stock=10, requisitions=3, quantity=4)
+    workflow = RequisitionWorkflow(store)
+
+    results = asyncio.run(workflow.bulk_transition([
+        ("req-1", "approved", "officer"),
+        ("req-2", "approved", "officer"),
+        ("req-3", "approved", "officer"),
+        ("req-missing", "approved", "officer"),
+    ]))
+
+    assert [result["outcome"] for result in results] == ["applied", "applied", "failed", "failed"]
+    assert [result["error_type"] for result in results] == [None, None, "insufficient_stock", "not_found"]
+    assert results[0]["requisition"]["status"] == "approved"
+    assert store.items["item-1"]["reserved_quantity"] == 8
+    assert store.stats["commits"] == 1
+
+def test_atomic_bulk_transition_writes_nothing_on_failure():
+    store = make_store(stock=10, requisitions=3, quantity=4)
+    workflow = RequisitionWorkflow(store)
+
+    results = asyncio.run(workflow.bulk_transition([
+        ("req-1", "approved", None),
+        ("req-2", "fulfilled", None),
+        ("req-3", "approved", None),
+    ], atomic=True))
+
+    assert [result["outcome"] for result in results] == ["skipped", "failed", "skipped"]
+    assert results[1]["error_type"] == "invalid_transition"
+    assert store.items["item-1"]["reserved_quantity"] == 0
+    assert all(req["status"] == "pending" for req in store.requisitions.values())
+    assert store.stats["commits"] == 0
+
+def test_bulk_transition_replans_after_a_conflict():
+    store = make_store(stock=10, requisitions=2, quantity=4)
+    workflow = RequisitionWorkflow(store, backoff_ms=0)
+    commit = store.commit
+    calls = []
+
+    async def conflict_once(writes, bin_card_entries=None):
+        calls.append(len(writes))
+        if len(calls) == 1:
+            # Another writer takes most of the stock between read and commit
+            item = await store.get_item("item-1")
+            item["reserved_quantity"] = 5
+            await commit([RecordWrite("inventory", item)])
+        return await commit(writes, bin_card_entries)
+
+    store.commit = conflict_once
+
+    results = asyncio.run(workflow.bulk_transition([
+        ("req-1", "approved", None),
+        ("req-2", "approved", None),
+    ]))
+
+    assert [result["outcome"] for result in results] == ["applied", "failed"]
+    assert store.items["item-1"]["reserved_quantity"] == 9
+    assert workflow.get_stats()["conflicts"] == 1
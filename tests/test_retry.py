@@ -0,0 +1,135 @@
+import asyncio
+import importlib
+
+import pytest
+
+from utils.database import DatabaseManager
+from utils.deadline import Deadline, DeadlineExceeded, current_deadline
+from utils.error_handler import CircuitBreaker, CircuitProbe
+from utils.retry import RetryPolicy
+
+retry_module = importlib.import_module("utils.retry")
+database_module = importlib.import_module("utils.database")
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class Flaky:
+    """Operation failing with ``errors`` in turn, then returning ``"ok"``"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", sleep)
+    return delays
+
+def run_with_deadline(coroutine_factory, deadline):
+    async def scenario():
+        current_deadline.set(deadline)
+        return await coroutine_factory()
+
+    return asyncio.run(scenario())
+
+def test_backoff_is_full_jitter_within_the_capped_exponential_bound():
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+    for attempt, bound in ((1, 0.1), (2, 0.2), (3, 0.4), (4, 0.8), (5, 1.0), (8, 1.0)):
+        delays = [policy.backoff(attempt) for _ in range(500)]
+        assert all(0 <= delay <= bound for delay in delays)
+        # Spread over the whole range rather than clustered at the bound
+        assert min(delays) < bound * 0.1 and max(delays) > bound * 0.9
+
+def test_retryable_errors_are_retried_until_success(sleeps):
+    operation = Flaky(ConnectionError("reset"), TimeoutError("slow"))
+    retried = []
+
+    async def on_retry(attempt, error):
+        retried.append((attempt, type(error).__name__))
+
+    result = asyncio.run(RetryPolicy(max_attempts=3).run(operation, on_retry=on_retry))
+
+    assert result == "ok"
+    assert operation.calls == 3
+    assert retried == [(1, "ConnectionError"), (2, "TimeoutError")]
+    assert len(sleeps) == 2
+
+@pytest.mark.parametrize("error", [
+    ValueError("bad input"),
+    type("APIError", (Exception,), {"code": "23505"})("duplicate key"),
+    type("APIError", (Exception,), {"code": "PGRST116"})("no rows"),
+    DeadlineExceeded("query"),
+])
+def test_final_errors_are_not_retried(error, sleeps):
+    operation = Flaky(error)
+
+    with pytest.raises(type(error)):
+        asyncio.run(RetryPolicy().run(operation))
+    assert operation.calls == 1
+    assert sleeps == []
+
+def test_attempts_are_capped(sleeps):
+    operation = Flaky(*[ConnectionError("down")] * 5)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(RetryPolicy(max_attempts=3).run(operation))
+    assert operation.calls == 3
+
+def test_no_retry_when_the_deadline_cannot_cover_another_attempt(sleeps):
+    clock = FakeClock()
+    operation = Flaky(ConnectionError("down"))
+    policy = RetryPolicy(base_delay=0.01, min_attempt_seconds=0.5)
+
+    with pytest.raises(ConnectionError):
+        run_with_deadline(lambda: policy.run(operation), Deadline(0.4, clock=clock))
+    assert operation.calls == 1
+    assert sleeps == []
+
+def test_no_attempt_starts_after_the_deadline():
+    clock = FakeClock()
+    deadline = Deadline(1.0, clock=clock)
+    clock.now += 2
+    operation = Flaky()
+
+    with pytest.raises(DeadlineExceeded):
+        run_with_deadline(lambda: RetryPolicy().run(operation, name="inventory_query"), deadline)
+    assert operation.calls == 0
+
+def test_deadline_frees_a_half_open_probe_slot(monkeypatch):
+    clock = FakeClock()
+    breaker = CircuitBreaker(name="test", minimum_calls=1, open_seconds=30.0, clock=clock)
+    breaker.record_failure(breaker.can_execute())
+    clock.now += 30
+    monkeypatch.setattr(database_module, "database_circuit_breaker", breaker)
+
+    manager = DatabaseManager()
+
+    async def initialized():
+        return True
+
+    manager.ensure_initialized = initialized
+    expired = Deadline(1.0, clock=clock)
+    expired.cancel()
+
+    with pytest.raises(DeadlineExceeded):
+        run_with_deadline(lambda: manager.execute_with_retry(Flaky()), expired)
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.probes_in_flight == 0
+    assert isinstance(breaker.can_execute(), CircuitProbe)
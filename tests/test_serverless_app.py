@@ -0,0 +1,99 @@
+import asyncio
+import importlib.util
+import os
+
+import pytest
+from fastapi import FastAPI
+
+INDEX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api", "index.py")
+
+spec = importlib.util.spec_from_file_location("serverless_index", INDEX)
+serverless_index = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(serverless_index)
+ServerlessApp = serverless_index.ServerlessApp
+
+def make_app(failures=0):
+    """App whose startup fails ``failures`` times, then succeeds"""
+    async def startup():
+        app.state.startups += 1
+        await asyncio.sleep(0.01)
+        if app.state.startups <= failures:
+            raise RuntimeError("database unreachable")
+
+    app = FastAPI(on_startup=[startup])
+    app.state.startups = 0
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+async def get(app, path):
+    """Send one GET through the ASGI interface, returning the status code"""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [], "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+def test_startup_runs_once_before_the_first_requests():
+    backend = make_app()
+    serverless = ServerlessApp(backend)
+
+    async def scenario():
+        return await asyncio.gather(*(get(serverless, "/health") for _ in range(3)))
+
+    assert asyncio.run(scenario()) == [200, 200, 200]
+    assert backend.state.startups == 1
+
+def test_a_failed_startup_fails_waiting_requests_and_is_retried():
+    backend = make_app(failures=1)
+    serverless = ServerlessApp(backend)
+
+    async def scenario():
+        first = await asyncio.gather(*(get(serverless, "/health") for _ in range(2)), return_exceptions=True)
+        return first, await get(serverless, "/health")
+
+    first, retried = asyncio.run(scenario())
+
+    assert [str(error) for error in first] == ["database unreachable"] * 2
+    assert retried == 200
+    assert backend.state.startups == 2
+
+def test_a_lifespan_startup_is_not_repeated():
+    backend = make_app()
+    serverless = ServerlessApp(backend)
+
+    async def scenario():
+        events = asyncio.Queue()
+        await events.put({"type": "lifespan.startup"})
+        sent = []
+
+        async def send(message):
+            sent.append(message["type"])
+            if message["type"] == "lifespan.startup.complete":
+                await events.put({"type": "lifespan.shutdown"})
+
+        await serverless({"type": "lifespan", "asgi": {"version": "3.0"}}, events.get, send)
+        return sent, await get(serverless, "/health")
+
+    sent, status = asyncio.run(scenario())
+
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert status == 200
+    assert backend.state.startups == 1
+
+@pytest.mark.parametrize("path, status", [("/api/health", 200), ("/health", 200), ("/api/missing", 404)])
+def test_health_routes_are_served_under_api(path, status):
+    assert asyncio.run(get(ServerlessApp(make_app()), path)) == status
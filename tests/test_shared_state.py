@@ -0,0 +1,126 @@
+import importlib
+import multiprocessing
+import threading
+
+import pytest
+
+from utils.logger import ErrorTracker
+from utils.shared_state import InProcessState, SQLiteState
+
+# ``utils.shared_state`` the attribute is the global instance, not the module
+shared_state_module = importlib.import_module("utils.shared_state")
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(shared_state_module.time, "time", fake)
+    return fake
+
+@pytest.fixture(params=["memory", "sqlite"])
+def state(request, tmp_path):
+    if request.param == "memory":
+        return InProcessState()
+    return SQLiteState(str(tmp_path / "state.db"))
+
+def increment(path, key, times):
+    state = SQLiteState(path)
+    for _ in range(times):
+        state.incr(key)
+
+def test_incr_creates_and_adds(state):
+    assert state.incr("hits") == 1
+    assert state.incr("hits", 2.5) == 3.5
+    assert state.get("hits") == 3.5
+
+def test_sqlite_incr_is_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "state.db")
+    SQLiteState(path).clear()
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=increment, args=(path, "hits", 200)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    assert SQLiteState(path).get("hits") == 800
+
+def test_incr_is_atomic_across_threads(state):
+    threads = [threading.Thread(target=lambda: [state.incr("hits") for _ in range(500)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert state.get("hits") == 2000
+
+def test_incr_ttl_runs_from_creation(state, clock):
+    state.incr("window", ttl=10)
+    clock.now += 9
+    assert state.incr("window", ttl=10) == 2
+
+    # Further increments do not extend the key's life
+    clock.now += 1
+    assert state.get("window") is None
+    assert state.incr("window", ttl=10) == 1
+
+def test_set_get_and_expiry(state, clock):
+    state.set("report", {"status": "healthy"}, ttl=5)
+    state.set("forever", [1, 2])
+    assert state.get("report") == {"status": "healthy"}
+
+    clock.now += 5
+    assert state.get("report", "gone") == "gone"
+    assert state.get("forever") == [1, 2]
+
+def test_add_only_claims_absent_or_expired_keys(state, clock):
+    assert state.add("lock", "a", ttl=60) is True
+    assert state.add("lock", "b", ttl=60) is False
+    assert state.get("lock") == "a"
+
+    clock.now += 60
+    assert state.add("lock", "c", ttl=60) is True
+    assert state.get("lock") == "c"
+
+def test_pop_removes_and_ignores_expired(state, clock):
+    state.incr("suppressed", 3)
+    assert state.pop("suppressed") == 3
+    assert state.pop("suppressed", 0) == 0
+
+    state.set("stale", "x", ttl=1)
+    clock.now += 2
+    assert state.pop("stale", "missing") == "missing"
+
+def test_scan_returns_live_keys_with_prefix(state, clock):
+    state.incr("errors:type:ValueError")
+    state.incr("errors:type:KeyError", ttl=1)
+    state.incr("errors:typo")
+    state.set("other", 1)
+    clock.now += 1
+
+    assert state.scan("errors:type:") == {"errors:type:ValueError": 1}
+
+def test_error_tracker_keeps_shared_keys_bounded(state):
+    tracker = ErrorTracker(max_fingerprints=2, state=state)
+    tracker.logger = type("Silent", (), {"error": lambda *args, **kwargs: None})()
+
+    for index in range(5):
+        namespace = {}
+        exec(f"def fail_{index}():\n    raise ValueError('boom')", namespace)
+        for _ in range(2):
+            try:
+                namespace[f"fail_{index}"]()
+            except ValueError as e:
+                tracker.track_error(e)
+
+    summary = tracker.get_fingerprint_summary()
+    assert summary["distinct_fingerprints"] == 2
+    assert summary["evicted_fingerprints"] == 3
+    assert summary["by_type"] == {"ValueError": 10}
+    assert len(state.scan("errors:suppressed:")) <= 2
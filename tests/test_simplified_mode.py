@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+# Runs in a fresh interpreter: hiding ``utils`` would otherwise break the
+# full-mode server already imported by other tests
+SCRIPT = textwrap.dedent("""
+    import json
+    import sys
+
+    sys.modules["utils"] = None
+    import server
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app) as client:
+        login = client.post("/api/auth/login", json={"username": "uspf", "password": "uspf"})
+        headers = {"Authorization": "Bearer " + login.json().get("access_token", "")}
+        results = {"utils_available": server.UTILS_AVAILABLE, "login": login.status_code}
+        for method, path in json.loads(sys.argv[1]):
+            response = client.request(method, path, headers=headers)
+            results[f"{method} {path}"] = [response.status_code, response.json().get("error")]
+    print(json.dumps(results))
+""")
+
+STORE_ROUTES = [
+    ("GET", "/api/inventory"),
+    ("GET", "/api/inventory/export"),
+    ("GET", "/api/inventory/item-1/bin-card"),
+    ("GET", "/api/requisitions"),
+    ("GET", "/api/reports/low-stock"),
+]
+
+def run_simplified(routes):
+    completed = subprocess.run(
+        [sys.executable, "-c", SCRIPT, json.dumps(routes)],
+        cwd=BACKEND, capture_output=True, text=True, timeout=60
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def test_simplified_mode_logs_in_and_answers_503_on_store_routes():
+    results = run_simplified(STORE_ROUTES + [("GET", "/health")])
+
+    assert results["utils_available"] is False
+    assert results["login"] == 200
+    for method, path in STORE_ROUTES:
+        assert results[f"{method} {path}"] == [503, "Inventory storage not available in simplified mode"]
+    assert results["GET /health"][0] == 200
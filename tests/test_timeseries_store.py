@@ -0,0 +1,77 @@
+from utils.health_history import HealthHistory
+from utils.timeseries_store import TimeSeriesStore
+
+NOW = 1_700_000_000.0 - 1_700_000_000.0 % 3600
+TIERS = ((60, 3600), (3600, 86400))
+
+def make_store(tmp_path, name="metrics.db"):
+    return TimeSeriesStore(str(tmp_path / name), tiers=TIERS)
+
+def test_disabled_store_is_a_no_op():
+    store = TimeSeriesStore()
+    store.record("errors", 1, NOW)
+    store.flush()
+
+    assert store.enabled is False
+    assert store.query("errors", NOW - 60, 60) == []
+    assert store.get_stats()["pending_points"] == 0
+
+def test_points_are_aggregated_per_bucket_and_tier(tmp_path):
+    store = make_store(tmp_path)
+    for offset, value in ((0, 5.0), (10, 1.0), (70, 3.0)):
+        store.record("health.check.database", value, NOW + offset)
+    store.flush(now=NOW + 80)
+
+    assert store.query("health.", NOW, 60) == [
+        ("health.check.database", int(NOW), 2, 6.0, 1.0, 5.0),
+        ("health.check.database", int(NOW) + 60, 1, 3.0, 3.0, 3.0),
+    ]
+    assert store.query("health.", NOW, 3600) == [("health.check.database", int(NOW), 3, 9.0, 1.0, 5.0)]
+
+def test_repeated_flushes_merge_into_existing_rows(tmp_path):
+    store = make_store(tmp_path)
+    store.record("errors.type.ValueError", 1, NOW)
+    store.flush(now=NOW)
+    store.record("errors.type.ValueError", 1, NOW + 5)
+    store.flush(now=NOW + 5)
+
+    assert store.query("errors.", NOW, 60)[0][2] == 2
+    assert store.stats["flushes"] == 2
+
+def test_expired_rows_are_pruned_per_tier(tmp_path):
+    store = make_store(tmp_path)
+    store.record("errors", 1, NOW)
+    store.flush(now=NOW)
+    store.flush(now=NOW + 2 * 3600)
+
+    assert store.query("errors", NOW - 3600, 60) == []
+    assert len(store.query("errors", NOW - 3600, 3600)) == 1
+
+def test_totals_include_points_not_yet_flushed(tmp_path):
+    store = make_store(tmp_path)
+    store.record("errors.type.KeyError", 1, NOW)
+    store.flush(now=NOW)
+    store.record("errors.type.KeyError", 1, NOW + 1)
+    store.record("errors.type.ValueError", 1, NOW + 2)
+
+    assert store.totals("errors.type.", NOW, 3600) == {
+        "KeyError": {"count": 2, "sum": 2.0},
+        "ValueError": {"count": 1, "sum": 1.0},
+    }
+
+def test_health_trends_survive_a_restart(tmp_path):
+    history = HealthHistory(store=make_store(tmp_path))
+    for minute in range(3):
+        history.record({
+            "status": "healthy" if minute else "warning",
+            "checks": {"database": {"status": "healthy", "response_time_ms": 10.0 * (minute + 1)}}
+        }, timestamp=NOW + minute * 60)
+    history.store.flush(now=NOW + 180)
+
+    restarted = HealthHistory(store=make_store(tmp_path))
+    assert restarted.load(now=NOW + 180) > 0
+
+    trends = restarted.trends(hours=1, now=NOW + 180)
+    assert trends["status_distribution"] == {"healthy": 2, "warning": 1, "unhealthy": 0}
+    assert trends["average_response_times"]["database"]["average_ms"] == 20.0
+    assert trends["persisted"] is True
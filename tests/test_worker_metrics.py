@@ -0,0 +1,112 @@
+import importlib.util
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from utils.metrics import MetricsRegistry, WorkerMetricsExporter, merge_snapshots
+
+GUNICORN_CONF = os.path.join(os.path.dirname(__file__), "..", "backend", "gunicorn_conf.py")
+
+def worker_registry(requests):
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests").inc(requests)
+    registry.gauge("queue_depth", "Queued jobs").set(requests)
+    return registry
+
+def write_worker(directory, pid, requests):
+    with open(os.path.join(directory, f"worker-{pid}.json"), "w") as handle:
+        json.dump(worker_registry(requests).snapshot(), handle)
+
+def merged_render(exporter):
+    return merge_snapshots(exporter.collect()).render()
+
+def total(text):
+    return [line for line in text.splitlines() if line.startswith("requests_total")]
+
+def test_disabled_exporter_renders_only_this_worker(tmp_path):
+    exporter = WorkerMetricsExporter(worker_registry(3))
+    exporter.write()
+
+    assert exporter.enabled is False
+    assert total(exporter.render()) == ["requests_total 3"]
+    assert os.listdir(tmp_path) == []
+
+def test_render_merges_every_live_worker(tmp_path):
+    write_worker(tmp_path, 101, 5)
+    exporter = WorkerMetricsExporter(worker_registry(2), directory=str(tmp_path))
+
+    text = exporter.render()
+
+    assert total(text) == ["requests_total 7"]
+    assert 'queue_depth{worker="101"} 5' in text
+    assert f'queue_depth{{worker="{os.getpid()}"}} 2' in text
+
+def test_retired_workers_keep_their_counters(tmp_path):
+    write_worker(tmp_path, 101, 5)
+    write_worker(tmp_path, 102, 4)
+    exporter = WorkerMetricsExporter(MetricsRegistry(), directory=str(tmp_path))
+
+    exporter.retire(101)
+    exporter.retire(102)
+    exporter.retire(103)
+
+    assert sorted(os.listdir(tmp_path)) == [WorkerMetricsExporter.RETIRED]
+    text = merged_render(exporter)
+    assert total(text) == ["requests_total 9"]
+    # Gauges of exited workers are dropped
+    assert "queue_depth{" not in text
+
+def test_a_worker_file_already_retired_is_not_counted_twice(tmp_path):
+    write_worker(tmp_path, 101, 5)
+    exporter = WorkerMetricsExporter(MetricsRegistry(), directory=str(tmp_path))
+    exporter.retire(101)
+    # The worker wrote once more between being read and being removed
+    write_worker(tmp_path, 101, 5)
+
+    assert total(merged_render(exporter)) == ["requests_total 5"]
+
+def test_clear_removes_snapshots_from_a_previous_run(tmp_path):
+    write_worker(tmp_path, 101, 5)
+    (tmp_path / "worker-102.json.99.tmp").write_text("{")
+    (tmp_path / "notes.txt").write_text("kept")
+
+    WorkerMetricsExporter(MetricsRegistry(), directory=str(tmp_path)).clear()
+
+    assert os.listdir(tmp_path) == ["notes.txt"]
+
+def load_gunicorn_conf(monkeypatch, tmp_path, **env):
+    for name in ("METRICS_MULTIPROC_DIR", "SHARED_STATE_PATH", "INVENTORY_DB_PATH"):
+        monkeypatch.setenv(name, str(tmp_path / name.lower()))
+    for name in ("WEB_CONCURRENCY", "PORT", "MAX_REQUESTS", "PRELOAD_APP"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    spec = importlib.util.spec_from_file_location("gunicorn_conf_under_test", GUNICORN_CONF)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_gunicorn_defaults_to_one_async_worker_per_core(monkeypatch, tmp_path):
+    monkeypatch.setattr(multiprocessing, "cpu_count", lambda: 6)
+
+    conf = load_gunicorn_conf(monkeypatch, tmp_path)
+
+    assert conf.workers == 6
+    assert conf.worker_class == "uvicorn.workers.UvicornWorker"
+    assert conf.bind == "0.0.0.0:8001"
+    assert conf.preload_app is True
+    # Workers are recycled, and only stuck ones are killed
+    assert conf.max_requests > 0 and conf.max_requests_jitter > 0
+    assert conf.timeout > 25 and conf.keepalive > 60
+
+@pytest.mark.parametrize("env, expected", [
+    ({"WEB_CONCURRENCY": "3"}, {"workers": 3}),
+    ({"PORT": "9000", "MAX_REQUESTS": "50"}, {"bind": "0.0.0.0:9000", "max_requests": 50}),
+    ({"PRELOAD_APP": "false"}, {"preload_app": False}),
+])
+def test_gunicorn_settings_come_from_the_environment(monkeypatch, tmp_path, env, expected):
+    conf = load_gunicorn_conf(monkeypatch, tmp_path, **env)
+
+    assert {name: getattr(conf, name) for name in expected} == expected